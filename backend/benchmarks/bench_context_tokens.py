@@ -0,0 +1,134 @@
+"""
+Benchmark: prompt tokens per turn with the full vs. the compact context history.
+
+Replays recorded interviews turn by turn through ContextManager, as the live
+/api/interview/message endpoint does, and counts the tokens of every prompt
+(system prompt + history window + candidate message) with modules/tokens.py.
+In compact mode, display-only <codigo> payloads are replaced by a short
+reference in the history; everything else is identical.
+
+Usage:
+    python benchmarks/bench_context_tokens.py [transcripts.jsonl | transcripts.db] [--window N] [--per-turn]
+
+The input is a transcripts export (/api/transcripts/export), the SQLite
+transcript archive, or defaults to benchmarks/data/interviews.jsonl.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from modules.context_manager import ContextManager  # noqa: E402
+from modules.evaluation import OPENING_MESSAGE, candidate_turn_text  # noqa: E402
+from modules.profiles import get_system_prompt  # noqa: E402
+from modules.tokens import count_message_tokens, tiktoken  # noqa: E402
+
+DEFAULT_INPUT = Path(__file__).parent / "data" / "interviews.jsonl"
+
+
+def iter_sessions(path: Path) -> Iterator[Dict]:
+    if path.suffix in (".db", ".sqlite", ".sqlite3"):
+        from modules.transcript_store import read_archive
+
+        yield from read_archive(path)
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def replay(session: Dict, window: int, compact: bool) -> List[int]:
+    """
+    Prompt tokens of every interviewer turn of a session.
+
+    Returns:
+        One token count per assistant message
+    """
+    system_prompt = get_system_prompt(session["profile"], session["stack"])
+    context = ContextManager(max_exchanges=window, compact=compact)
+    user_message = OPENING_MESSAGE
+    first_turn = True
+    tokens = []
+
+    for message in session.get("messages", []):
+        if message.get("role") == "user":
+            user_message = candidate_turn_text(message.get("text", ""), message.get("execution"))
+            continue
+        if message.get("role") != "assistant":
+            continue
+
+        # Same message layout as LLMService.generate_response (the opening has no history)
+        messages = [{"role": "system", "content": system_prompt}]
+        messages.extend([] if first_turn else context.get_messages())
+        messages.append({"role": "user", "content": user_message})
+        tokens.append(count_message_tokens(messages))
+
+        response = f"<falar>{message.get('falar') or ''}</falar>"
+        if message.get("codigo"):
+            response += f"\n<codigo>{message['codigo']}</codigo>"
+        context.add_exchange(user_message, response)
+        first_turn = False
+
+    return tokens
+
+
+def describe(values: List[int]) -> str:
+    ordered = sorted(values)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return (
+        f"mean {statistics.mean(values):7.1f} | median {statistics.median(values):7.1f} | "
+        f"p95 {p95:6d} | max {max(values):6d} | total {sum(values):8d}"
+    )
+
+
+def main():
+    with open(BACKEND_DIR / "config.json", "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", nargs="?", type=Path, default=DEFAULT_INPUT)
+    parser.add_argument("--window", type=int, default=config["llm"]["context_window"],
+                        help="Exchanges kept in context (llm.context_window)")
+    parser.add_argument("--per-turn", action="store_true", help="Print the token count of every turn")
+    args = parser.parse_args()
+
+    results = {"full": [], "compact": []}
+    sessions = 0
+    for session in iter_sessions(args.input):
+        if not session.get("messages"):
+            continue
+        sessions += 1
+        full = replay(session, args.window, compact=False)
+        compact = replay(session, args.window, compact=True)
+        results["full"].extend(full)
+        results["compact"].extend(compact)
+
+        if args.per_turn:
+            print(f"{session['session_id']} ({session['profile']}/{session['stack']})")
+            for turn, (before, after) in enumerate(zip(full, compact), 1):
+                print(f"  turn {turn:3d}: {before:6d} -> {after:6d} tokens ({after - before:+d})")
+
+    if not results["full"]:
+        print(f"No interview with messages in {args.input}")
+        return
+
+    counter = "tiktoken o200k_base" if tiktoken is not None else "~4 chars/token estimate (install tiktoken for exact counts)"
+    print(f"Corpus: {sessions} interviews, {len(results['full'])} turns, window {args.window} | {counter}")
+    for name, values in results.items():
+        print(f"{name:>8}: {describe(values)}")
+
+    saved = sum(results["full"]) - sum(results["compact"])
+    print(f"Compact history saves {saved} prompt tokens ({saved / sum(results['full']) * 100:.1f}%), "
+          f"{saved / len(results['full']):.1f} per turn")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Startup benchmark: import time of main.py and cold start to first served request.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs N] [--port PORT] [--path /api/profiles]
+
+Each run uses a fresh interpreter, so numbers include module imports, config
+loading, service construction in the lifespan and the first request.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import main; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def measure_import() -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def measure_cold_start(port: int, path: str, timeout: float) -> float:
+    """Seconds from spawning uvicorn until the first successful response."""
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "--factory", "main:create_app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR
+    )
+    try:
+        url = f"http://127.0.0.1:{port}{path}"
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"No response from {url} after {timeout}s")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def report(name: str, samples):
+    print(
+        f"{name:>22}: median {statistics.median(samples) * 1000:8.1f} ms | "
+        f"min {min(samples) * 1000:8.1f} ms | max {max(samples) * 1000:8.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--path", default="/api/profiles")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    report("import main", [measure_import() for _ in range(args.runs)])
+    report("cold start to 1st req", [
+        measure_cold_start(args.port, args.path, args.timeout) for _ in range(args.runs)
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Micro-benchmark: legacy two-regex tag parsing vs. the single-pass tag scanner.
+
+Usage:
+    python benchmarks/bench_tag_parser.py [corpus.jsonl] [--repeat N]
+
+The corpus is a JSONL file with one {"response": "..."} object per line
+(defaults to benchmarks/data/responses.jsonl).
+"""
+
+import argparse
+import json
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from modules.tag_parser import scan_tags  # noqa: E402
+
+DEFAULT_CORPUS = Path(__file__).parent / "data" / "responses.jsonl"
+
+
+def legacy_parse(response: str):
+    """Parser used before the tag scanner (two independent DOTALL searches)."""
+    falar_match = re.search(r'<falar>(.*?)</falar>', response, re.DOTALL)
+    codigo_match = re.search(r'<codigo>(.*?)</codigo>', response, re.DOTALL)
+    return (
+        falar_match.group(1).strip() if falar_match else "",
+        codigo_match.group(1).strip() if codigo_match else ""
+    )
+
+
+def scanner_parse(response: str):
+    parsed = scan_tags(response)
+    return parsed.get("falar"), parsed.get("codigo")
+
+
+def load_corpus(path: Path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line)["response"] for line in f if line.strip()]
+
+
+def quoted_tags_response(quoted: int) -> str:
+    body = "\n".join(f"```html\n<codigo>exemplo {i}</codigo>\n```\ntexto" for i in range(quoted))
+    return f"<falar>Veja o exemplo.</falar>\n<codigo>{body}</codigo>"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", nargs="?", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    total_chars = sum(len(r) for r in corpus)
+    print(f"Corpus: {len(corpus)} responses, {total_chars} characters")
+
+    for name, parse in (("legacy", legacy_parse), ("scanner", scanner_parse)):
+        seconds = min(timeit.repeat(
+            lambda: [parse(r) for r in corpus],
+            number=args.repeat,
+            repeat=5
+        ))
+        per_response = seconds / (args.repeat * len(corpus)) * 1e6
+        empty_falar = sum(1 for r in corpus if not parse(r)[0])
+        empty_codigo = sum(1 for r in corpus if not parse(r)[1])
+        print(
+            f"{name:>8}: {per_response:7.2f} us/response | "
+            f"empty falar: {empty_falar:2d} | empty codigo: {empty_codigo:2d}"
+        )
+
+    repairable = sum(1 for r in corpus if scan_tags(r).missing and scan_tags(r).untagged)
+    print(f"Responses with missing tags recoverable from untagged text: {repairable}")
+
+    # Long <codigo> quoting many tags inside ``` fences (every quoted tag is skipped)
+    for quoted in (50, 500, 2000):
+        response = quoted_tags_response(quoted)
+        number = max(1, 2000 // quoted)
+        seconds = min(timeit.repeat(lambda: scan_tags(response), number=number, repeat=5)) / number
+        print(f"{quoted:5d} fenced quoted tags ({len(response):6d} chars): scanner {seconds * 1e3:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,37 @@
 """
 AI Interviewer - FastAPI Backend
 Main application with all endpoints for the interview system.
+
+Run with:
+    uvicorn --factory main:create_app
 """
 
 import os
+import hmac
 import json
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Dict, Optional
 from datetime import datetime
 import uuid
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
-
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form
+from fastapi import APIRouter, Depends, FastAPI, File, UploadFile, HTTPException, Form, Header, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
-from modules.stt import STTService
-from modules.tts import TTSService
-from modules.llm import LLMService
-from modules.profiles import get_profile, get_all_profiles, get_system_prompt
+from modules.profiles import get_all_profiles, get_system_prompt
 from modules.context_manager import ContextManager
+from modules.services import OPENING_MESSAGE, Services
+from modules.evaluation import build_evaluation_messages, candidate_turn_text
+from modules.cancellation import CancelToken, TurnCancelled
+from modules.diagnostics import DiagnosticsBusy, session_storage
+from modules.lifecycle import DrainController, DrainMiddleware, load_sessions, save_sessions, snapshot_path
+from modules.static_assets import StaticBundle
 
 # Configure logging
 logging.basicConfig(
@@ -33,58 +40,140 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize FastAPI
-app = FastAPI(
-    title="AI Interviewer",
-    description="Sistema de entrevistas técnicas com IA",
-    version="1.0.0"
-)
+BASE_DIR = Path(__file__).parent
+DEFAULT_CONFIG_PATH = BASE_DIR / "config.json"
 
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+router = APIRouter()
 
-# Load configuration
-config_path = Path(__file__).parent / "config.json"
-with open(config_path, 'r', encoding='utf-8') as f:
-    config = json.load(f)
 
-# Initialize services
-stt_service = STTService(
-    model_size=config["stt"]["model_size"],
-    device=config["stt"]["device"],
-    compute_type=config["stt"]["compute_type"]
-)
+def load_config(config_path: Path = DEFAULT_CONFIG_PATH) -> Dict:
+    """Load config.json."""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
 
-# Get API keys from environment or config
-elevenlabs_key = os.getenv("ELEVENLABS_API_KEY") or config["api_keys"]["elevenlabs"]
-openrouter_key = os.getenv("OPENROUTER_API_KEY") or config["api_keys"]["openrouter"]
-voice_id = os.getenv("ELEVENLABS_VOICE_ID") or config["tts"]["voice_id"]
-
-tts_service = TTSService(
-    api_key=elevenlabs_key,
-    voice_id=voice_id,
-    model_id=config["tts"]["model_id"],
-    stability=config["tts"]["stability"],
-    similarity_boost=config["tts"]["similarity_boost"],
-    style=config["tts"]["style"],
-    use_speaker_boost=config["tts"]["use_speaker_boost"]
-)
 
-llm_service = LLMService(
-    api_key=openrouter_key,
-    model=config["llm"]["model"],
-    temperature=config["llm"]["temperature"],
-    max_tokens=config["llm"]["max_tokens"]
-)
+def create_app(config_path: Optional[Path] = None) -> FastAPI:
+    """
+    Build the FastAPI application.
+    
+    Services are constructed in the lifespan handler, so creating the app
+    (and importing this module) stays cheap; heavy SDKs are imported on first use.
+    
+    Args:
+        config_path: Path to config.json (defaults to the one next to main.py)
+    
+    Returns:
+        Configured FastAPI app
+    """
+    # Load environment variables
+    load_dotenv()
+    config = load_config(config_path or DEFAULT_CONFIG_PATH)
+    lifecycle_config = config.get("lifecycle", {})
+    drain = DrainController()
+    
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        services = Services(config, BASE_DIR)
+        app.state.services = services
+        logger.info("Services initialized")
+        
+        # Pick up the interviews a previous process of this worker left running
+        snapshot_file = None
+        if lifecycle_config.get("persist_sessions", False):
+            snapshot_file = snapshot_path(BASE_DIR / lifecycle_config.get("snapshot_dir", "data"))
+            services.sessions.update(load_sessions(snapshot_file, max_age=lifecycle_config.get("snapshot_max_age", 3600)))
+        try:
+            yield
+        finally:
+            drain.begin("shutdown")
+            if not await drain.wait_idle(lifecycle_config.get("drain_timeout", 30)):
+                logger.warning(f"Drain deadline expired, cancelled {services.turns.cancel_all('shutdown')} turn(s)")
+            if snapshot_file is not None and services.sessions:
+                try:
+                    save_sessions(services.sessions, snapshot_file)
+                except Exception as e:
+                    logger.error(f"Could not save session snapshot: {e}")
+            services.close()
+    
+    # Initialize FastAPI
+    app = FastAPI(
+        title="AI Interviewer",
+        description="Sistema de entrevistas técnicas com IA",
+        version="1.0.0",
+        lifespan=lifespan
+    )
+    app.state.config = config
+    app.state.drain = drain
+    
+    app.add_middleware(DrainMiddleware, controller=drain)
+    
+    # CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    
+    app.include_router(router)
+    
+    # Serve the frontend same-origin (no CORS preflights, cached assets)
+    frontend_config = config.get("frontend", {})
+    if frontend_config.get("enabled", False):
+        bundle = StaticBundle(
+            directory=BASE_DIR / frontend_config.get("directory", "../frontend"),
+            api_base=frontend_config.get("api_base", ""),
+            use_brotli=frontend_config.get("brotli", True)
+        )
+        app.mount(frontend_config.get("mount_path", "/ui"), bundle, name="frontend")
+    return app
+
+
+def get_services(request: Request) -> Services:
+    """Dependency returning the app's service container."""
+    return request.app.state.services
 
-# Session management
-sessions: Dict[str, Dict] = {}
+
+def get_drain(request: Request) -> DrainController:
+    """Dependency returning the app's drain controller."""
+    return request.app.state.drain
+
+
+def require_admin(
+    x_admin_token: Optional[str] = Header(None),
+    services: Services = Depends(get_services)
+):
+    """Dependency guarding admin endpoints with the X-Admin-Token header."""
+    if not services.admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, services.admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+AUDIO_EXTENSIONS = {"audio/mpeg": "mp3", "audio/wav": "wav", "audio/ogg": "ogg"}
+
+# How often a running turn checks whether its client went away
+DISCONNECT_POLL_INTERVAL = 0.1
+
+
+async def run_cancellable(http_request: Request, token: CancelToken, func, *args, **kwargs):
+    """
+    Run blocking work in the threadpool, cancelling its turn if the client disconnects.
+    
+    The work itself must honour the token (streaming LLM/TTS calls do), so the
+    thread is released as soon as the turn is abandoned.
+    
+    Raises:
+        TurnCancelled: If the turn was cancelled (disconnect, cancel endpoint or a newer turn)
+    """
+    task = asyncio.ensure_future(run_in_threadpool(func, *args, **kwargs))
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+        if done:
+            return task.result()
+        if not token.cancelled and await http_request.is_disconnected():
+            token.cancel("client disconnected")
 
 # Pydantic models
 class InterviewRequest(BaseModel):
@@ -96,6 +185,11 @@ class MessageRequest(BaseModel):
     session_id: str
     text: str
     is_code: bool = False
+    turn_id: Optional[str] = None
+
+class CancelRequest(BaseModel):
+    session_id: str
+    turn_id: Optional[str] = None
 
 class EvaluationRequest(BaseModel):
     session_id: str
@@ -103,7 +197,7 @@ class EvaluationRequest(BaseModel):
 
 # ============= ENDPOINTS =============
 
-@app.get("/")
+@router.get("/")
 async def root():
     """Health check endpoint."""
     return {
@@ -112,46 +206,89 @@ async def root():
         "version": "1.0.0"
     }
 
-@app.get("/api/profiles")
+@router.get("/api/ready")
+async def readiness(drain: DrainController = Depends(get_drain), services: Services = Depends(get_services)):
+    """Readiness probe for load balancers: 503 while draining."""
+    status = {**drain.status(), "sessions": len(services.sessions)}
+    return JSONResponse(status, status_code=200 if drain.ready else 503)
+
+@router.get("/api/profiles")
 async def get_profiles():
     """Get all available interviewer profiles."""
     return {
         "profiles": get_all_profiles()
     }
 
-@app.post("/api/interview/start")
-async def start_interview(request: InterviewRequest):
-    """Start a new interview session."""
+@router.get("/api/profiles/{profile_name}/prompt")
+async def get_profile_prompt(profile_name: str, stack: Optional[str] = None, services: Services = Depends(get_services)):
+    """Get the compiled system prompt of a profile and its token count."""
+    if not services.profile_registry.has_profile(profile_name):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return {
+        "profile": profile_name,
+        "stack": stack,
+        "system_prompt": get_system_prompt(profile_name, stack),
+        "tokens": services.profile_registry.get_prompt_tokens(profile_name, stack)
+    }
+
+@router.post("/api/interview/start")
+async def start_interview(
+    request: InterviewRequest,
+    http_request: Request,
+    services: Services = Depends(get_services),
+    drain: DrainController = Depends(get_drain)
+):
+    """Start a new interview session (refused while the worker drains)."""
+    if drain.draining:
+        raise HTTPException(
+            status_code=503,
+            detail="Servidor reiniciando, tente novamente em instantes",
+            headers={"Retry-After": str(http_request.app.state.config.get("lifecycle", {}).get("retry_after", 10))}
+        )
+    
     try:
         session_id = request.session_id or str(uuid.uuid4())
         
         # Create new session
-        sessions[session_id] = {
+        services.sessions[session_id] = {
             "profile": request.profile,
             "stack": request.stack,
-            "context": ContextManager(max_exchanges=config["llm"]["context_window"]),
+            "context": ContextManager(
+                max_exchanges=services.config["llm"]["context_window"],
+                compact=services.config["llm"].get("compact_context", True)
+            ),
             "created_at": datetime.now().isoformat(),
-            "messages": []
+            "messages": [],
+            "asked_questions": [],
+            "current_question": None,
+            "speech_analytics": []
         }
+        if services.transcript_store:
+            services.transcript_store.record_session(
+                session_id,
+                request.profile,
+                request.stack,
+                services.sessions[session_id]["created_at"]
+            )
         
         # Generate initial greeting
-        system_prompt = get_system_prompt(request.profile, request.stack)
-        initial_message = "Olá! Estou pronto para começar a entrevista."
-        
-        response = llm_service.generate_response(
-            system_prompt=system_prompt,
-            messages=[],
-            user_message=initial_message
+        initial_message = OPENING_MESSAGE
+        turn_id, token = services.turns.begin(session_id)
+        turn = await run_cancellable(
+            http_request, token, services.generate_turn,
+            session_id, initial_message, first_turn=True, cancel_token=token
         )
-        
-        falar_content, codigo_content = llm_service.parse_response(response)
+        # A turn cancelled while finishing must not reach the session history
+        token.raise_if_cancelled()
+        falar_content, codigo_content = turn["falar"], turn["codigo"]
         
         # Add to context
-        sessions[session_id]["context"].add_exchange(initial_message, response)
-        sessions[session_id]["messages"].append({
+        services.sessions[session_id]["context"].add_exchange(initial_message, turn["response"])
+        services.append_message(session_id, {
             "role": "assistant",
             "falar": falar_content,
             "codigo": codigo_content,
+            "question_id": turn["question_id"],
             "timestamp": datetime.now().isoformat()
         })
         
@@ -161,20 +298,31 @@ async def start_interview(request: InterviewRequest):
             "session_id": session_id,
             "profile": request.profile,
             "stack": request.stack,
+            "turn_id": turn_id,
             "falar": falar_content,
             "codigo": codigo_content
         }
     
+    except TurnCancelled:
+        raise HTTPException(status_code=409, detail="Turno cancelado")
+    
     except Exception as e:
         logger.error(f"Error starting interview: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/transcribe")
+@router.post("/api/transcribe")
 async def transcribe_audio(
     session_id: str = Form(...),
-    audio: UploadFile = File(...)
+    audio: UploadFile = File(...),
+    analytics: bool = Form(False),
+    services: Services = Depends(get_services)
 ):
-    """Transcribe audio to text using Fast Whisper."""
+    """
+    Transcribe audio to text using Fast Whisper.
+    
+    With analytics, word timings come from the same decode pass and speech
+    metrics for the answer are computed and stored on the session.
+    """
     try:
         # Save uploaded audio temporarily
         temp_path = f"temp_{session_id}_{datetime.now().timestamp()}.wav"
@@ -184,10 +332,20 @@ async def transcribe_audio(
             f.write(content)
         
         # Transcribe
-        transcription = stt_service.transcribe(
-            temp_path,
-            language=config["stt"]["language"]
-        )
+        result = {"session_id": session_id}
+        if analytics:
+            detailed = services.stt_service.transcribe_with_timestamps(
+                temp_path,
+                language=services.config["stt"]["language"]
+            )
+            transcription = detailed["text"]
+            result["words"] = detailed["words"]
+            result["analytics"] = services.analyze_speech(session_id, detailed["words"])
+        else:
+            transcription = services.stt_service.transcribe(
+                temp_path,
+                language=services.config["stt"]["language"]
+            )
         
         # Clean up
         os.remove(temp_path)
@@ -196,7 +354,7 @@ async def transcribe_audio(
         
         return {
             "transcription": transcription,
-            "session_id": session_id
+            **result
         }
     
     except Exception as e:
@@ -205,101 +363,131 @@ async def transcribe_audio(
             os.remove(temp_path)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/interview/message")
-async def send_message(request: MessageRequest):
-    """Send a message (transcribed or typed) and get LLM response."""
+@router.post("/api/interview/message")
+async def send_message(request: MessageRequest, http_request: Request, services: Services = Depends(get_services)):
+    """
+    Send a message (transcribed or typed) and get LLM response.
+    
+    Starts a new turn, cancelling the session's previous one if it is still
+    running (barge-in). The turn is cancelled if the client disconnects.
+    """
     try:
-        if request.session_id not in sessions:
+        if request.session_id not in services.sessions:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        session = sessions[request.session_id]
-        
-        # Get system prompt
-        system_prompt = get_system_prompt(session["profile"], session["stack"])
+        session = services.sessions[request.session_id]
+        turn_id, token = services.turns.begin(request.session_id)
         
-        # Get context messages
-        context_messages = session["context"].get_messages()
+        # Run code answers so the LLM gets real test results instead of guessing
+        execution = None
+        if request.is_code:
+            execution = await run_in_threadpool(services.run_code, request.session_id, request.text)
+        user_message = candidate_turn_text(request.text, execution)
         
-        # Generate response
-        response = llm_service.generate_response(
-            system_prompt=system_prompt,
-            messages=context_messages,
-            user_message=request.text
+        # Generate and parse response
+        turn = await run_cancellable(
+            http_request, token, services.generate_turn,
+            request.session_id, user_message, cancel_token=token
         )
-        
-        # Parse response
-        falar_content, codigo_content = llm_service.parse_response(response)
+        # A turn cancelled while finishing must not reach the session history
+        token.raise_if_cancelled()
+        falar_content, codigo_content = turn["falar"], turn["codigo"]
         
         # Update context
-        session["context"].add_exchange(request.text, response)
+        session["context"].add_exchange(user_message, turn["response"])
         
         # Store messages
-        session["messages"].append({
+        services.append_message(request.session_id, {
             "role": "user",
             "text": request.text,
             "is_code": request.is_code,
+            "execution": execution,
             "timestamp": datetime.now().isoformat()
         })
         
-        session["messages"].append({
+        services.append_message(request.session_id, {
             "role": "assistant",
             "falar": falar_content,
             "codigo": codigo_content,
+            "question_id": turn["question_id"],
             "timestamp": datetime.now().isoformat()
         })
         
         logger.info(f"Processed message for session {request.session_id}")
         
         return {
+            "turn_id": turn_id,
             "falar": falar_content,
             "codigo": codigo_content,
+            "execution": execution,
             "context_size": session["context"].get_exchange_count()
         }
     
+    except TurnCancelled:
+        raise HTTPException(status_code=409, detail="Turno cancelado")
+    
     except Exception as e:
         logger.error(f"Error processing message: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/synthesize")
-async def synthesize_speech(request: MessageRequest):
-    """Convert text to speech using ElevenLabs."""
+@router.post("/api/synthesize")
+async def synthesize_speech(request: MessageRequest, http_request: Request, services: Services = Depends(get_services)):
+    """Convert text to speech with the configured TTS backend, as part of the given turn."""
     try:
-        # Generate audio
-        audio_bytes = tts_service.synthesize(request.text)
+        # A stale turn_id is rejected before any TTS work
+        token = services.turns.token_for(request.session_id, request.turn_id)
+        audio_bytes, media_type = await run_cancellable(
+            http_request, token, services.tts_service.synthesize_audio,
+            request.text, cancel_token=token
+        )
         
-        logger.info(f"Synthesized speech: {len(audio_bytes)} bytes")
+        logger.info(f"Synthesized speech: {len(audio_bytes)} bytes ({media_type})")
         
+        extension = AUDIO_EXTENSIONS.get(media_type.split(";")[0], "pcm")
         return StreamingResponse(
             iter([audio_bytes]),
-            media_type="audio/mpeg",
+            media_type=media_type,
             headers={
-                "Content-Disposition": "attachment; filename=speech.mp3"
+                "Content-Disposition": f"attachment; filename=speech.{extension}"
             }
         )
     
+    except TurnCancelled:
+        raise HTTPException(status_code=409, detail="Turno cancelado")
+    
     except Exception as e:
         logger.error(f"Error synthesizing speech: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/interview/evaluate")
-async def evaluate_interview(request: EvaluationRequest):
+@router.post("/api/interview/cancel")
+async def cancel_turn(request: CancelRequest, services: Services = Depends(get_services)):
+    """Cancel the session's turn in progress (e.g. the candidate started talking)."""
+    cancelled = services.turns.cancel(request.session_id, request.turn_id, reason="client request")
+    
+    return {
+        "session_id": request.session_id,
+        "turn_id": request.turn_id,
+        "cancelled": cancelled
+    }
+
+@router.post("/api/interview/evaluate")
+async def evaluate_interview(request: EvaluationRequest, services: Services = Depends(get_services)):
     """Generate final interview evaluation."""
     try:
-        if request.session_id not in sessions:
+        if request.session_id not in services.sessions:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        session = sessions[request.session_id]
+        session = services.sessions[request.session_id]
         
-        # Get all messages for evaluation
-        system_prompt = get_system_prompt(session["profile"], session["stack"])
-        all_messages = [{"role": "system", "content": system_prompt}]
-        all_messages.extend(session["context"].get_messages())
+        # Full session messages (questions as shown), not the compact turn context
+        all_messages = build_evaluation_messages(session, services.config["llm"]["context_window"])
         
         # Generate evaluation
-        evaluation = llm_service.generate_evaluation(
+        evaluation = services.llm_service.generate_evaluation(
             messages=all_messages,
             profile=session["profile"],
-            stack=session["stack"]
+            stack=session["stack"],
+            speech_metrics=services.speech_summary(request.session_id)
         )
         
         logger.info(f"Generated evaluation for session {request.session_id}")
@@ -310,13 +498,13 @@ async def evaluate_interview(request: EvaluationRequest):
         logger.error(f"Error generating evaluation: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/session/{session_id}")
-async def get_session(session_id: str):
+@router.get("/api/session/{session_id}")
+async def get_session(session_id: str, services: Services = Depends(get_services)):
     """Get session information."""
-    if session_id not in sessions:
+    if session_id not in services.sessions:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    session = sessions[session_id]
+    session = services.sessions[session_id]
     
     return {
         "session_id": session_id,
@@ -327,24 +515,146 @@ async def get_session(session_id: str):
         "context_size": session["context"].get_exchange_count()
     }
 
-@app.delete("/api/session/{session_id}")
-async def delete_session(session_id: str):
+@router.delete("/api/session/{session_id}")
+async def delete_session(session_id: str, services: Services = Depends(get_services)):
     """Delete a session."""
-    if session_id not in sessions:
+    if session_id not in services.sessions:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    del sessions[session_id]
+    del services.sessions[session_id]
+    services.turns.discard(session_id)
+    if services.transcript_store:
+        services.transcript_store.close_session(session_id, datetime.now().isoformat())
     logger.info(f"Deleted session: {session_id}")
     
     return {"status": "deleted", "session_id": session_id}
 
-@app.get("/api/config")
-async def get_config():
+@router.get("/api/transcripts/export", dependencies=[Depends(require_admin)])
+async def export_transcripts(
+    profile: Optional[str] = None,
+    since: Optional[str] = None,
+    page_size: int = Query(200, ge=1, le=1000),
+    services: Services = Depends(get_services)
+):
+    """Stream all archived interviews as JSON Lines (admin only: contains candidate data)."""
+    if not services.transcript_store:
+        raise HTTPException(status_code=404, detail="Transcript archive disabled")
+    
+    return StreamingResponse(
+        services.transcript_store.export_jsonl(profile=profile, since=since, page_size=page_size),
+        media_type="application/x-ndjson",
+        headers={
+            "Content-Disposition": "attachment; filename=transcripts.jsonl"
+        }
+    )
+
+@router.get("/api/llm/cache")
+async def get_llm_cache_stats(services: Services = Depends(get_services)):
+    """Get response cache hit-rate metrics."""
+    if not services.llm_cache:
+        return {"enabled": False}
+    
+    return {"enabled": True, **services.llm_cache.stats()}
+
+@router.get("/api/sandbox/stats")
+async def get_sandbox_stats(services: Services = Depends(get_services)):
+    """Get code sandbox warm-up and per-run latency metrics."""
+    if not services.sandbox:
+        return {"enabled": False}
+    
+    return {"enabled": True, **services.sandbox.stats()}
+
+@router.get("/api/admin/profile", dependencies=[Depends(require_admin)])
+async def profile_process(
+    seconds: float = 10.0,
+    interval_ms: float = 5.0,
+    idle: bool = False,
+    services: Services = Depends(get_services)
+):
+    """Sample the live process and return collapsed stacks (flamegraph.pl / speedscope input)."""
+    if not 0 < seconds <= 120:
+        raise HTTPException(status_code=400, detail="seconds must be in (0, 120]")
+    
+    try:
+        # In the threadpool: requests keep being served (and sampled) meanwhile
+        collapsed, stats = await run_in_threadpool(
+            services.profiler.profile, seconds, max(interval_ms, 1.0) / 1000, idle
+        )
+    except DiagnosticsBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    filename = f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}.collapsed"
+    return PlainTextResponse(
+        collapsed,
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "X-Profile-Samples": str(stats["samples"]),
+            "X-Profile-Overhead": str(stats["sampling_overhead"])
+        }
+    )
+
+@router.post("/api/admin/memory/snapshot", dependencies=[Depends(require_admin)])
+async def take_memory_snapshot(top: int = 15, services: Services = Depends(get_services)):
+    """Take a tracemalloc snapshot (starting tracing on first use)."""
+    snapshot = await run_in_threadpool(services.memory.snapshot, top)
+    # Snapshot the session list on the event loop, where it is mutated
+    snapshot["session_storage"] = await run_in_threadpool(session_storage, list(services.sessions.items()))
+    return snapshot
+
+@router.get("/api/admin/memory/diff", dependencies=[Depends(require_admin)])
+async def diff_memory_snapshots(
+    from_id: str,
+    to_id: Optional[str] = None,
+    top: int = 15,
+    services: Services = Depends(get_services)
+):
+    """Compare two snapshots (or a snapshot and now), grouped by module."""
+    try:
+        diff = await run_in_threadpool(services.memory.diff, from_id, to_id, top)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Unknown snapshot: {e}")
+    # Snapshot the session list on the event loop, where it is mutated
+    diff["session_storage"] = await run_in_threadpool(session_storage, list(services.sessions.items()))
+    return diff
+
+@router.delete("/api/admin/memory", dependencies=[Depends(require_admin)])
+async def stop_memory_tracing(services: Services = Depends(get_services)):
+    """Stop tracemalloc and drop stored snapshots."""
+    services.memory.stop()
+    return {"tracing": False}
+
+@router.post("/api/admin/drain", dependencies=[Depends(require_admin)])
+async def start_drain(
+    wait: float = 0.0,
+    drain: DrainController = Depends(get_drain),
+    services: Services = Depends(get_services)
+):
+    """
+    Put the worker in drain mode before a restart.
+    
+    Sessions in progress keep working; new interviews get 503. With wait,
+    blocks up to that many seconds for the other requests in flight to finish.
+    """
+    drain.begin("admin")
+    idle = await drain.wait_idle(wait) if wait > 0 else None
+    return {**drain.status(), "idle": idle, "sessions": len(services.sessions)}
+
+@router.delete("/api/admin/drain", dependencies=[Depends(require_admin)])
+async def stop_drain(drain: DrainController = Depends(get_drain)):
+    """Leave drain mode."""
+    drain.resume()
+    return drain.status()
+
+@router.get("/api/config")
+async def get_config(request: Request):
     """Get current configuration (without API keys)."""
+    config = request.app.state.config
     safe_config = {
         "stt": config["stt"],
         "llm": {
             "model": config["llm"]["model"],
+            "backend": config["llm"].get("backend", "openrouter"),
+            "profile_backends": config["llm"].get("profile_backends", {}),
             "temperature": config["llm"]["temperature"],
             "max_tokens": config["llm"]["max_tokens"],
             "context_window": config["llm"]["context_window"]
@@ -356,4 +666,11 @@ async def get_config():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(
+        "main:create_app",
+        factory=True,
+        host="0.0.0.0",
+        port=8000,
+        # Let running turns finish on SIGTERM before the lifespan snapshots the sessions
+        timeout_graceful_shutdown=load_config().get("lifecycle", {}).get("drain_timeout", 30)
+    )
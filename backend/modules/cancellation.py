@@ -0,0 +1,161 @@
+"""
+Per-session turn tracking and cooperative cancellation.
+Every interviewer turn gets an ID and a cancel token. Starting a new turn
+(barge-in), an explicit cancel or a client disconnect cancels the token, and
+the streaming LLM/TTS loops holding it stop and close their streams.
+"""
+
+import threading
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TurnCancelled(Exception):
+    """Raised inside work whose turn was cancelled."""
+
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self.reason = ""
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled") -> bool:
+        """
+        Cancel the token and run its callbacks.
+
+        Returns:
+            False if it was already cancelled
+        """
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.debug(f"Cancel callback failed: {e}")
+        return True
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Register a callback (e.g. closing a stream) run on cancellation,
+        immediately if already cancelled.
+
+        Returns:
+            Function unregistering the callback
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove(callback)
+        callback()
+        return lambda: None
+
+    def _remove(self, callback: Callable[[], None]):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise TurnCancelled(self.reason)
+
+    def wait(self, timeout: float) -> bool:
+        """Sleep up to timeout; returns True as soon as the token is cancelled."""
+        return self._event.wait(timeout)
+
+
+def check(token: Optional[CancelToken]):
+    """raise_if_cancelled for an optional token."""
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+class TurnRegistry:
+    def __init__(self):
+        """Track the current turn of every session."""
+        self._lock = threading.Lock()
+        self._turns: Dict[str, Tuple[str, CancelToken]] = {}
+
+    def begin(self, session_id: str) -> Tuple[str, CancelToken]:
+        """
+        Start a new turn for a session, cancelling the one in progress.
+
+        Returns:
+            Tuple of (turn_id, cancel token)
+        """
+        turn_id = uuid.uuid4().hex[:12]
+        token = CancelToken()
+        with self._lock:
+            previous = self._turns.get(session_id)
+            self._turns[session_id] = (turn_id, token)
+
+        if previous and previous[1].cancel("superseded"):
+            logger.info(f"Turn {previous[0]} of session {session_id} superseded by {turn_id}")
+        return turn_id, token
+
+    def token_for(self, session_id: str, turn_id: Optional[str] = None) -> CancelToken:
+        """
+        Get the token of a session's turn.
+
+        A stale turn_id gets an already-cancelled token, so follow-up work for
+        an abandoned turn (e.g. its TTS) is rejected right away.
+        """
+        with self._lock:
+            current = self._turns.get(session_id)
+
+        if current and (turn_id is None or current[0] == turn_id):
+            return current[1]
+        if turn_id is None:
+            return CancelToken()
+        token = CancelToken()
+        token.cancel("stale turn")
+        return token
+
+    def cancel(self, session_id: str, turn_id: Optional[str] = None, reason: str = "cancelled") -> bool:
+        """
+        Cancel the session's current turn (only if it matches turn_id, when given).
+
+        Returns:
+            True if a running turn was cancelled
+        """
+        with self._lock:
+            current = self._turns.get(session_id)
+        if not current or (turn_id is not None and current[0] != turn_id):
+            return False
+
+        cancelled = current[1].cancel(reason)
+        if cancelled:
+            logger.info(f"Turn {current[0]} of session {session_id} cancelled: {reason}")
+        return cancelled
+
+    def cancel_all(self, reason: str = "shutdown") -> int:
+        """
+        Cancel every running turn (e.g. drain deadline expired).
+
+        Returns:
+            Number of turns cancelled
+        """
+        with self._lock:
+            current = list(self._turns.values())
+        return sum(1 for _, token in current if token.cancel(reason))
+
+    def discard(self, session_id: str):
+        """Cancel and forget a session's turn (session deleted)."""
+        with self._lock:
+            current = self._turns.pop(session_id, None)
+        if current:
+            current[1].cancel("session deleted")
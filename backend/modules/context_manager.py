@@ -3,26 +3,72 @@ Context management for interview conversations.
 Keeps a rolling window of the last N exchanges to optimize token usage.
 """
 
+import hashlib
 from typing import List, Dict
 from collections import deque
 
+from .tag_parser import scan_tags
+
+# <codigo> blocks up to this size are kept verbatim in compact mode
+COMPACT_CODIGO_MAX_CHARS = 240
+# Characters of the displayed content kept as a preview in the reference
+COMPACT_PREVIEW_CHARS = 120
+
+
+def compact_response(response: str, max_chars: int = COMPACT_CODIGO_MAX_CHARS) -> str:
+    """
+    Compact form of an interviewer response for the context.
+    
+    The spoken <falar> text is kept; a <codigo> block (shown on screen only) longer
+    than max_chars is replaced by a reference: a short digest, its size and a
+    preview made of its non-empty lines joined with " - ", cut at
+    COMPACT_PREVIEW_CHARS. The full content stays in the session messages and
+    the transcript archive.
+    
+    Args:
+        response: Raw tagged LLM response
+        max_chars: Largest <codigo> content kept as is
+    
+    Returns:
+        Tagged response to store in the context
+    """
+    parsed = scan_tags(response)
+    codigo = parsed.get("codigo")
+    if len(codigo) <= max_chars:
+        return response
+    
+    # First lines (usually the question heading and statement) tell the LLM what was shown
+    lines = [line.strip("#*` ").strip() for line in codigo.splitlines()]
+    preview = " - ".join(line for line in lines if line)[:COMPACT_PREVIEW_CHARS]
+    digest = hashlib.sha1(codigo.encode("utf-8")).hexdigest()[:8]
+    reference = f"[exibido na tela, ref {digest}, {len(codigo)} caracteres] {preview}".rstrip()
+    
+    parts = [parsed.untagged] if parsed.untagged else []
+    if parsed.get("falar"):
+        parts.append(f"<falar>{parsed.get('falar')}</falar>")
+    parts.append(f"<codigo>{reference}</codigo>")
+    return "\n".join(parts)
+
 
 class ContextManager:
-    def __init__(self, max_exchanges: int = 6):
+    def __init__(self, max_exchanges: int = 6, compact: bool = False):
         """
         Initialize context manager.
         
         Args:
             max_exchanges: Maximum number of exchanges to keep in context
+            compact: Store interviewer responses without their display-only
+                <codigo> payloads (see compact_response)
         """
         self.max_exchanges = max_exchanges
+        self.compact = compact
         self.context = deque(maxlen=max_exchanges)
     
     def add_exchange(self, user_message: str, assistant_message: str):
         """Add a user-assistant exchange to the context."""
         self.context.append({
             "user": user_message,
-            "assistant": assistant_message
+            "assistant": compact_response(assistant_message) if self.compact else assistant_message
         })
     
     def get_messages(self) -> List[Dict[str, str]]:
@@ -58,3 +104,18 @@ class ContextManager:
     def get_exchange_count(self) -> int:
         """Get the number of exchanges in context."""
         return len(self.context)
+    
+    def to_dict(self) -> Dict:
+        """Serialize the context (for session snapshots)."""
+        return {
+            "max_exchanges": self.max_exchanges,
+            "compact": self.compact,
+            "exchanges": list(self.context)
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ContextManager":
+        """Rebuild a context serialized with to_dict."""
+        manager = cls(max_exchanges=data.get("max_exchanges", 6), compact=data.get("compact", False))
+        manager.context.extend(data.get("exchanges", []))
+        return manager
@@ -0,0 +1,310 @@
+"""
+Live-process diagnostics for admins: a sampling CPU profiler producing
+collapsed stacks (flamegraph input) and tracemalloc snapshots diffed by module.
+Both are off until requested, so they cost nothing in normal operation.
+"""
+
+import os
+import sys
+import sysconfig
+import threading
+import time
+import tracemalloc
+from collections import Counter, OrderedDict, deque
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Leaf frames of threads that are blocked waiting, not using CPU
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("connection.py", "_poll"),
+    ("socket.py", "accept"),
+}
+
+MAX_SNAPSHOTS = 5
+
+
+class DiagnosticsBusy(Exception):
+    """Raised when a profile is already running."""
+
+
+class _ModuleNamer:
+    """Map source file paths to short module labels, caching the result."""
+
+    def __init__(self, base_dir: Path):
+        self.base_dir = str(Path(base_dir).resolve())
+        self.stdlib = sysconfig.get_paths()["stdlib"]
+        self._cache: Dict[str, str] = {}
+
+    def __call__(self, filename: str) -> str:
+        label = self._cache.get(filename)
+        if label is None:
+            label = self._cache[filename] = self._label(filename)
+        return label
+
+    def _label(self, filename: str) -> str:
+        if filename.startswith("<"):
+            return filename
+        path = os.path.abspath(filename)
+        if path.startswith(self.base_dir + os.sep):
+            return os.path.relpath(path, self.base_dir).replace(os.sep, "/")
+        for marker in ("site-packages", "dist-packages"):
+            index = path.find(marker + os.sep)
+            if index != -1:
+                # Group third-party code by top-level package
+                return path[index + len(marker) + 1:].split(os.sep, 1)[0].split(".", 1)[0]
+        if path.startswith(self.stdlib):
+            return "stdlib/" + os.path.relpath(path, self.stdlib).replace(os.sep, "/")
+        return path
+
+
+class SamplingProfiler:
+    def __init__(self, base_dir: Path):
+        """
+        Statistical profiler sampling every thread's stack via sys._current_frames().
+
+        Args:
+            base_dir: Backend directory, used to label project frames (modules/llm.py)
+        """
+        self.module_name = _ModuleNamer(base_dir)
+        self._lock = threading.Lock()
+
+    def _frame_label(self, frame) -> str:
+        code = frame.f_code
+        return f"{self.module_name(code.co_filename)}:{code.co_name}:{frame.f_lineno}"
+
+    def _is_idle(self, frame) -> bool:
+        return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_FRAMES
+
+    def profile(self, duration: float, interval: float = 0.005, include_idle: bool = False) -> Tuple[str, Dict]:
+        """
+        Sample all threads of the process for a while.
+
+        Args:
+            duration: Seconds to sample
+            interval: Seconds between samples
+            include_idle: Keep stacks of threads blocked in waits/selects
+
+        Returns:
+            Tuple of (collapsed stacks text, stats dict). Each collapsed line is
+            "thread;outer;...;leaf count", the input format of flamegraph.pl and speedscope.
+
+        Raises:
+            DiagnosticsBusy: If another profile is running
+        """
+        if not self._lock.acquire(blocking=False):
+            raise DiagnosticsBusy("A profile is already running")
+
+        try:
+            own_thread = threading.get_ident()
+            stacks: Counter = Counter()
+            samples = 0
+            overhead = 0.0
+            started = time.perf_counter()
+            deadline = started + duration
+
+            while time.perf_counter() < deadline:
+                tick = time.perf_counter()
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread or (not include_idle and self._is_idle(frame)):
+                        continue
+                    labels = []
+                    while frame is not None:
+                        labels.append(self._frame_label(frame))
+                        frame = frame.f_back
+                    labels.append(names.get(thread_id, f"thread-{thread_id}"))
+                    stacks[";".join(reversed(labels))] += 1
+                samples += 1
+                elapsed = time.perf_counter() - tick
+                overhead += elapsed
+                time.sleep(max(0.0, interval - elapsed))
+
+            wall = time.perf_counter() - started
+        finally:
+            self._lock.release()
+
+        collapsed = "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+        stats = {
+            "duration": round(wall, 3),
+            "samples": samples,
+            "stacks": len(stacks),
+            "sampling_overhead": round(overhead / wall, 4) if wall else 0.0
+        }
+        logger.info(f"Profiled {samples} samples in {wall:.1f}s ({len(stacks)} unique stacks)")
+        return collapsed + "\n", stats
+
+
+class MemoryTracker:
+    def __init__(self, base_dir: Path, frames: int = 1):
+        """
+        tracemalloc snapshots of the live process, diffed and grouped by module.
+
+        Tracing starts with the first snapshot (tracemalloc slows allocations
+        while enabled) and stops with stop().
+
+        Args:
+            base_dir: Backend directory, used to label project files
+            frames: Frames stored per allocation traceback
+        """
+        self.module_name = _ModuleNamer(base_dir)
+        self.frames = frames
+        self._snapshots: "OrderedDict[str, Tuple[str, tracemalloc.Snapshot]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counter = 0
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def _take(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+
+    def _group(self, stats: List[tracemalloc.StatisticDiff]) -> List[Dict]:
+        groups: Dict[str, Dict] = {}
+        for stat in stats:
+            module = self.module_name(stat.traceback[0].filename)
+            group = groups.setdefault(module, {"module": module, "size": 0, "size_diff": 0, "count": 0, "count_diff": 0})
+            group["size"] += stat.size
+            group["size_diff"] += stat.size_diff
+            group["count"] += stat.count
+            group["count_diff"] += stat.count_diff
+        return list(groups.values())
+
+    def snapshot(self, top: int = 15) -> Dict:
+        """
+        Take a snapshot, starting tracing if needed.
+
+        Returns:
+            Snapshot id, traced memory and the modules holding the most memory
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+                logger.info("tracemalloc started")
+
+            snapshot = self._take()
+            self._counter += 1
+            snapshot_id = str(self._counter)
+            self._snapshots[snapshot_id] = (datetime.now().isoformat(), snapshot)
+            while len(self._snapshots) > MAX_SNAPSHOTS:
+                self._snapshots.popitem(last=False)
+
+        groups: Dict[str, Dict] = {}
+        for stat in snapshot.statistics("filename"):
+            module = self.module_name(stat.traceback[0].filename)
+            group = groups.setdefault(module, {"module": module, "size": 0, "count": 0})
+            group["size"] += stat.size
+            group["count"] += stat.count
+        modules = sorted(groups.values(), key=lambda group: group["size"], reverse=True)
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "id": snapshot_id,
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "modules": modules[:top]
+        }
+
+    def diff(self, from_id: str, to_id: Optional[str] = None, top: int = 15) -> Dict:
+        """
+        Compare two snapshots (or a snapshot and now), grouped by module.
+
+        Args:
+            from_id: Earlier snapshot id
+            to_id: Later snapshot id (None = take a new snapshot now)
+            top: Modules returned, by absolute size change
+
+        Raises:
+            KeyError: If a snapshot id is unknown
+        """
+        with self._lock:
+            taken_at, old = self._snapshots[from_id]
+            if to_id is None:
+                if not tracemalloc.is_tracing():
+                    raise KeyError("tracing stopped")
+                new_taken_at, new = datetime.now().isoformat(), self._take()
+            else:
+                new_taken_at, new = self._snapshots[to_id]
+
+        modules = self._group(new.compare_to(old, "filename"))
+        modules.sort(key=lambda group: abs(group["size_diff"]), reverse=True)
+        lines = new.compare_to(old, "lineno")[:top]
+        return {
+            "from": {"id": from_id, "taken_at": taken_at},
+            "to": {"id": to_id or "now", "taken_at": new_taken_at},
+            "size_diff": sum(group["size_diff"] for group in modules),
+            "modules": modules[:top],
+            "lines": [
+                {
+                    "location": f"{self.module_name(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                    "size_diff": stat.size_diff,
+                    "count_diff": stat.count_diff
+                }
+                for stat in lines
+            ]
+        }
+
+    def stop(self):
+        """Stop tracing and drop stored snapshots."""
+        with self._lock:
+            self._snapshots.clear()
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+                logger.info("tracemalloc stopped")
+
+
+def deep_size(obj, _seen: Optional[set] = None) -> int:
+    """Approximate memory held by a container tree (dicts, lists, objects with __dict__)."""
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(deep_size(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_size(vars(obj), seen)
+    return size
+
+
+def session_storage(sessions: List[Tuple[str, Dict]]) -> Dict:
+    """
+    Size of the in-memory session storage.
+
+    Runs in a worker thread while the event loop keeps changing the sessions,
+    so it takes a list(sessions.items()) snapshot made on the loop, and a
+    session that changes size while being measured is counted as skipped.
+    """
+    seen = {id(sessions)}
+    total = sys.getsizeof(sessions)
+    messages = 0
+    skipped = 0
+    for session_id, session in sessions:
+        messages += len(session.get("messages", []))
+        try:
+            total += deep_size(session_id, seen) + deep_size(session, seen)
+        except RuntimeError:
+            # "dictionary changed size during iteration": a turn updated the session
+            skipped += 1
+
+    return {
+        "sessions": len(sessions),
+        "messages": messages,
+        "approx_bytes": total,
+        "skipped": skipped
+    }
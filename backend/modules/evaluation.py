@@ -0,0 +1,79 @@
+"""
+Final-evaluation prompt building.
+Shared by the live /api/interview/evaluate endpoint and the offline re-scoring
+CLI, so a session is evaluated from the same messages in both paths. The
+prompt is rebuilt from the full session messages (questions exactly as shown
+on screen), never from the compact turn-generation context.
+"""
+
+from typing import Dict, List, Optional
+
+from .context_manager import compact_response
+from .profiles import get_system_prompt
+from .sandbox import format_result
+
+# User side of the first exchange, sent to the LLM to open the interview
+OPENING_MESSAGE = "Olá! Estou pronto para começar a entrevista."
+
+# Transcript-only records holding the speech metrics of one spoken answer
+SPEECH_ANALYTICS_ROLE = "speech_analytics"
+
+
+def candidate_turn_text(text: str, execution: Optional[Dict] = None) -> str:
+    """Candidate message as sent to the LLM: the answer plus the sandbox result of code answers."""
+    if execution:
+        return f"{text}\n\n[Execução automática] {format_result(execution)}"
+    return text
+
+
+def build_evaluation_messages(session: Dict, max_exchanges: int, compact: bool = False) -> List[Dict[str, str]]:
+    """
+    Build the message list for the evaluation of a session.
+
+    Args:
+        session: Live session or archived one (profile, stack and "messages")
+        max_exchanges: Last exchanges included, as in the live context window
+        compact: Replace displayed <codigo> payloads by short references, as the
+            compact turn context does (only to measure its effect on scores)
+
+    Returns:
+        System prompt followed by alternating user/assistant messages
+    """
+    exchanges = []
+    user_text = OPENING_MESSAGE
+    for message in session.get("messages", []):
+        if message.get("role") == "user":
+            user_text = candidate_turn_text(message.get("text", ""), message.get("execution"))
+        elif message.get("role") == "assistant":
+            response = f"<falar>{message.get('falar') or ''}</falar>"
+            if message.get("codigo"):
+                response += f"\n<codigo>{message['codigo']}</codigo>"
+            exchanges.append((user_text, compact_response(response) if compact else response))
+
+    messages = [{"role": "system", "content": get_system_prompt(session["profile"], session["stack"])}]
+    for user_text, response in exchanges[-max_exchanges:] if max_exchanges > 0 else []:
+        messages.append({"role": "user", "content": user_text})
+        messages.append({"role": "assistant", "content": response})
+    return messages
+
+
+def speech_answers(session: Dict) -> List[Dict]:
+    """Per-answer speech metrics of a live session, or of an archived one (from its transcript records)."""
+    if "speech_analytics" in session:
+        return session["speech_analytics"] or []
+    return [
+        message["metrics"] for message in session.get("messages", [])
+        if message.get("role") == SPEECH_ANALYTICS_ROLE and message.get("metrics")
+    ]
+
+
+def speech_metrics_text(answers: List[Dict]) -> Optional[str]:
+    """Interview-level speech metrics as text for the evaluation prompt, if any were collected."""
+    if not answers:
+        return None
+
+    # Imported here: NumPy is only needed when analytics were collected
+    from .speech_analytics import format_for_prompt, summarize
+
+    summary = summarize(answers)
+    return format_for_prompt(summary) if summary else None
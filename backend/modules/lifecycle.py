@@ -0,0 +1,199 @@
+"""
+Graceful drain and session persistence across restarts.
+A draining worker reports not-ready, refuses new interviews and waits for the
+requests in flight to finish; on shutdown the live sessions are written to a
+snapshot file that the next process loads on startup, so a redeploy does not
+end the interviews in progress.
+"""
+
+import asyncio
+import json
+import os
+import time
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from .context_manager import ContextManager
+
+logger = logging.getLogger(__name__)
+
+# Paths that never count as in-flight work: probes and the drain call itself
+UNTRACKED_PATHS = ("/api/ready", "/api/admin/drain")
+
+SNAPSHOT_VERSION = 1
+
+
+class DrainController:
+    def __init__(self):
+        """Readiness flag and counter of HTTP requests in flight."""
+        self.draining = False
+        self.reason = ""
+        self.draining_since: Optional[float] = None
+        self.in_flight = 0
+        self._idle: Optional[asyncio.Event] = None
+
+    def _idle_event(self) -> asyncio.Event:
+        # Created lazily, inside the server's event loop
+        if self._idle is None:
+            self._idle = asyncio.Event()
+            if self.in_flight == 0:
+                self._idle.set()
+        return self._idle
+
+    @property
+    def ready(self) -> bool:
+        return not self.draining
+
+    def begin(self, reason: str = "drain"):
+        """Stop admitting new interviews (idempotent)."""
+        if not self.draining:
+            self.draining = True
+            self.reason = reason
+            self.draining_since = time.monotonic()
+            logger.info(f"Draining ({reason}), {self.in_flight} request(s) in flight")
+
+    def resume(self):
+        """Leave drain mode and admit new interviews again."""
+        if self.draining:
+            logger.info("Drain cancelled, accepting new interviews")
+        self.draining = False
+        self.reason = ""
+        self.draining_since = None
+
+    def enter(self):
+        self.in_flight += 1
+        self._idle_event().clear()
+
+    def exit(self):
+        self.in_flight -= 1
+        if self.in_flight == 0:
+            self._idle_event().set()
+
+    async def wait_idle(self, timeout: float) -> bool:
+        """
+        Wait until no request is in flight.
+
+        Returns:
+            False if requests were still running when the timeout expired
+        """
+        try:
+            await asyncio.wait_for(self._idle_event().wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def status(self) -> Dict:
+        return {
+            "ready": self.ready,
+            "draining": self.draining,
+            "reason": self.reason or None,
+            "draining_for": round(time.monotonic() - self.draining_since, 1) if self.draining_since else None,
+            "in_flight": self.in_flight
+        }
+
+
+class DrainMiddleware:
+    def __init__(self, app, controller: DrainController):
+        """
+        ASGI middleware counting API requests in flight, streamed bodies included.
+
+        Pure ASGI (not BaseHTTPMiddleware) so client disconnects still reach the
+        endpoints that cancel their turn on disconnect.
+        """
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not path.startswith("/api/") or path in UNTRACKED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        self.controller.enter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.exit()
+
+
+def snapshot_path(directory: Path, worker_id: Optional[str] = None) -> Path:
+    """Per-worker snapshot file: workers restore only the sessions they own."""
+    worker_id = worker_id if worker_id is not None else os.getenv("ENTREVISTADOR_WORKER_ID", "0")
+    return Path(directory) / f"sessions-{worker_id}.json"
+
+
+def save_sessions(sessions: Dict[str, Dict], path: Path) -> int:
+    """
+    Write the live sessions to a snapshot file (atomically, via a temp file).
+
+    Returns:
+        Number of sessions written
+    """
+    payload = {
+        "version": SNAPSHOT_VERSION,
+        "saved_at": datetime.now().isoformat(),
+        "saved_ts": time.time(),
+        "sessions": {
+            session_id: {**session, "context": session["context"].to_dict()}
+            for session_id, session in list(sessions.items())
+        }
+    }
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + ".tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+    logger.info(f"Saved {len(payload['sessions'])} session(s) to {path}")
+    return len(payload["sessions"])
+
+
+def load_sessions(path: Path, max_age: float = 3600) -> Dict[str, Dict]:
+    """
+    Load and consume a snapshot written by save_sessions.
+
+    The file is removed once read, so an older snapshot is never restored
+    over sessions that changed after it.
+
+    Args:
+        path: Snapshot file
+        max_age: Snapshots older than this (seconds) are discarded (0 = no limit)
+
+    Returns:
+        Sessions by ID (empty when there is no usable snapshot)
+    """
+    path = Path(path)
+    if not path.exists():
+        return {}
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.error(f"Unreadable session snapshot {path}: {e}")
+        return {}
+    finally:
+        path.unlink(missing_ok=True)
+
+    if payload.get("version") != SNAPSHOT_VERSION:
+        logger.warning(f"Ignoring session snapshot {path} (version {payload.get('version')})")
+        return {}
+
+    age = time.time() - payload.get("saved_ts", 0)
+    if max_age and age > max_age:
+        logger.warning(f"Ignoring session snapshot {path} saved {age:.0f}s ago")
+        return {}
+
+    sessions = {}
+    for session_id, session in payload.get("sessions", {}).items():
+        session["context"] = ContextManager.from_dict(session.get("context", {}))
+        sessions[session_id] = session
+
+    logger.info(f"Restored {len(sessions)} session(s) from {path}")
+    return sessions
@@ -1,14 +1,269 @@
 """
-LLM integration using OpenRouter for GPT-4o with custom tag parsing.
+LLM integration with pluggable backends (OpenRouter or any OpenAI-compatible
+server, and an in-process llama.cpp runner) and custom tag parsing.
 """
 
-import re
-from openai import OpenAI
-from typing import Dict, List, Tuple
+import hashlib
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
 import logging
 
+from .cancellation import CancelToken, TurnCancelled, check
+from .llm_cache import ResponseCache, make_cache_key
+from .tag_parser import DEFAULT_TAGS, ParsedResponse, scan_tags
+
 logger = logging.getLogger(__name__)
 
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+
+class LLMBackend:
+    """Interface of a chat completion backend."""
+    
+    name = "base"
+    model = ""
+    
+    def complete(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        session_id: Optional[str] = None,
+        cancel_token: Optional[CancelToken] = None
+    ) -> str:
+        """
+        Run a chat completion.
+        
+        Args:
+            messages: Full message list in OpenAI format
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens in response
+            session_id: Interview session, for backends that keep per-session state
+            cancel_token: When given, the completion is streamed and aborted on cancellation
+        
+        Returns:
+            Response content
+        
+        Raises:
+            TurnCancelled: If the token was cancelled
+        """
+        raise NotImplementedError
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    def __init__(
+        self,
+        name: str,
+        model: str,
+        api_key: str,
+        base_url: str = OPENROUTER_BASE_URL,
+        extra_headers: Optional[Dict[str, str]] = None,
+        cache_prompt: bool = False,
+        slots: int = 0
+    ):
+        """
+        Backend for OpenRouter or any OpenAI-compatible server (e.g. llama.cpp server).
+        
+        Args:
+            name: Backend name used in config.json
+            model: Model to use
+            api_key: API key
+            base_url: API base URL
+            extra_headers: Extra HTTP headers sent with every request
+            cache_prompt: Ask a llama.cpp server to reuse the cached prompt prefix
+            slots: Number of llama.cpp server slots; pins each session to one slot
+        """
+        self.name = name
+        self.model = model
+        self.base_url = base_url
+        self.api_key = api_key
+        self._client = None
+        self._client_lock = threading.Lock()
+        self.extra_headers = extra_headers or {}
+        self.cache_prompt = cache_prompt
+        self.slots = slots
+    
+    @property
+    def client(self):
+        """OpenAI client, created (and the SDK imported) on first use."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from openai import OpenAI
+                    
+                    self._client = OpenAI(base_url=self.base_url, api_key=self.api_key)
+        return self._client
+    
+    def complete(self, messages, temperature, max_tokens, session_id=None, cancel_token=None) -> str:
+        extra_body = {}
+        if self.cache_prompt:
+            extra_body["cache_prompt"] = True
+        if self.slots and session_id:
+            # Same slot every turn, so the session's KV cache is still there
+            digest = hashlib.blake2b(session_id.encode("utf-8"), digest_size=4).digest()
+            extra_body["id_slot"] = int.from_bytes(digest, "big") % self.slots
+        
+        request = dict(
+            extra_headers=self.extra_headers,
+            extra_body=extra_body or None,
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        if cancel_token is None:
+            response = self.client.chat.completions.create(**request)
+            return response.choices[0].message.content
+        
+        # Stream, so a cancelled turn stops generation (and billing) mid-response
+        check(cancel_token)
+        stream = self.client.chat.completions.create(stream=True, **request)
+        unregister = cancel_token.on_cancel(stream.close)
+        parts = []
+        try:
+            for chunk in stream:
+                cancel_token.raise_if_cancelled()
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+        except Exception:
+            # Closing the stream from the cancel callback surfaces as a read error
+            cancel_token.raise_if_cancelled()
+            raise
+        finally:
+            unregister()
+            stream.close()
+        cancel_token.raise_if_cancelled()
+        return "".join(parts)
+
+
+class LlamaCppBackend(LLMBackend):
+    def __init__(
+        self,
+        name: str,
+        model_path: str,
+        n_ctx: int = 8192,
+        n_threads: int = 0,
+        cache_mb: int = 1024
+    ):
+        """
+        In-process CPU backend running a GGUF model with llama-cpp-python.
+        
+        Evaluated prompt states are kept in a RAM cache keyed by token prefix,
+        so the system prompt and earlier turns of a session are not
+        re-evaluated on every turn.
+        
+        Args:
+            name: Backend name used in config.json
+            model_path: Path to the GGUF model file
+            n_ctx: Context window size
+            n_threads: CPU threads (0 = all cores)
+            cache_mb: Size of the prompt state cache in MB
+        """
+        try:
+            from llama_cpp import Llama, LlamaRAMCache
+        except ImportError as e:
+            raise RuntimeError(
+                f"Backend '{name}' requires llama-cpp-python (pip install llama-cpp-python)"
+            ) from e
+        
+        self.name = name
+        self.model = os.path.basename(model_path)
+        self.llama = Llama(
+            model_path=model_path,
+            n_ctx=n_ctx,
+            n_threads=n_threads or os.cpu_count(),
+            verbose=False
+        )
+        self.llama.set_cache(LlamaRAMCache(capacity_bytes=cache_mb * 1024 * 1024))
+        # A llama.cpp context is not thread-safe
+        self._lock = threading.Lock()
+        
+        logger.info(f"Loaded local model {self.model} (n_ctx={n_ctx})")
+    
+    def complete(self, messages, temperature, max_tokens, session_id=None, cancel_token=None) -> str:
+        with self._lock:
+            if cancel_token is None:
+                response = self.llama.create_chat_completion(
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens
+                )
+                return response["choices"][0]["message"]["content"]
+            
+            # Token-by-token, so a cancelled turn frees the model right away
+            check(cancel_token)
+            stream = self.llama.create_chat_completion(
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+            parts = []
+            try:
+                for chunk in stream:
+                    if cancel_token.cancelled:
+                        break
+                    content = chunk["choices"][0]["delta"].get("content")
+                    if content:
+                        parts.append(content)
+            finally:
+                stream.close()
+        cancel_token.raise_if_cancelled()
+        return "".join(parts)
+
+
+def build_backends(llm_config: Dict, openrouter_key: str) -> Dict[str, LLMBackend]:
+    """
+    Create the LLM backends described in config.json["llm"].
+    
+    The "openrouter" backend always exists and uses llm.model; additional
+    backends are declared under llm.backends with a "type" of "openai"
+    (OpenAI-compatible server) or "llama_cpp" (in-process GGUF model).
+    
+    Args:
+        llm_config: The "llm" section of config.json
+        openrouter_key: OpenRouter API key
+    
+    Returns:
+        Dict of backend name to backend
+    """
+    backends: Dict[str, LLMBackend] = {
+        "openrouter": OpenAICompatibleBackend(
+            name="openrouter",
+            model=llm_config["model"],
+            api_key=openrouter_key,
+            extra_headers={
+                "HTTP-Referer": "http://localhost:8000",
+                "X-Title": "Entrevistador IA"
+            }
+        )
+    }
+    
+    for name, options in llm_config.get("backends", {}).items():
+        backend_type = options.get("type", "openai")
+        if backend_type == "llama_cpp":
+            backends[name] = LlamaCppBackend(
+                name=name,
+                model_path=options["model_path"],
+                n_ctx=options.get("n_ctx", 8192),
+                n_threads=options.get("n_threads", 0),
+                cache_mb=options.get("cache_mb", 1024)
+            )
+        elif backend_type == "openai":
+            backends[name] = OpenAICompatibleBackend(
+                name=name,
+                model=options["model"],
+                api_key=options.get("api_key") or "none",
+                base_url=options["base_url"],
+                cache_prompt=options.get("cache_prompt", False),
+                slots=options.get("slots", 0)
+            )
+        else:
+            raise ValueError(f"Unknown LLM backend type for '{name}': {backend_type}")
+    
+    return backends
+
 
 class LLMService:
     def __init__(
@@ -16,32 +271,122 @@ class LLMService:
         api_key: str,
         model: str = "openai/gpt-5.1-chat",
         temperature: float = 0.7,
-        max_tokens: int = 1000
+        max_tokens: int = 1000,
+        cache: Optional[ResponseCache] = None,
+        backends: Optional[Dict[str, LLMBackend]] = None,
+        default_backend: str = "openrouter",
+        profile_backends: Optional[Dict[str, str]] = None
     ):
         """
-        Initialize LLM service with OpenRouter.
+        Initialize LLM service.
         
         Args:
-            api_key: OpenRouter API key
+            api_key: OpenRouter API key (used when no backends are given)
             model: Model to use (e.g., openai/gpt-5.1-chat)
             temperature: Sampling temperature
             max_tokens: Maximum tokens in response
+            cache: Optional response cache for repeatable requests
+            backends: Available backends by name (defaults to OpenRouter only)
+            default_backend: Backend used when a profile has no override
+            profile_backends: Interviewer profile to backend name overrides
         """
-        self.client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=api_key
-        )
+        if backends is None:
+            backends = build_backends({"model": model}, api_key)
+        self.backends = backends
+        self.default_backend = default_backend
+        self.profile_backends = profile_backends or {}
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self.cache = cache
+        
+        for profile, backend_name in self.profile_backends.items():
+            if backend_name not in self.backends:
+                raise ValueError(f"Profile '{profile}' uses unknown LLM backend '{backend_name}'")
+        
+        logger.info(f"LLM service initialized with backends: {', '.join(backends)} (default: {default_backend})")
+    
+    def get_backend(self, profile: Optional[str] = None) -> LLMBackend:
+        """Get the backend configured for an interviewer profile."""
+        name = self.profile_backends.get((profile or "").lower(), self.default_backend)
+        return self.backends[name]
+    
+    def _complete(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        use_cache: bool = False,
+        profile: Optional[str] = None,
+        session_id: Optional[str] = None,
+        cancel_token: Optional[CancelToken] = None
+    ) -> str:
+        """
+        Run a chat completion, going through the response cache when allowed.
+        
+        Args:
+            messages: Full message list in OpenAI format
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens in response
+            use_cache: Whether this request may be served from the cache
+            profile: Interviewer profile, selects the backend
+            session_id: Interview session, for per-session backend state
+            cancel_token: Aborts the completion when the turn is cancelled
+        
+        Returns:
+            Response content
+        """
+        backend = self.get_backend(profile)
+        check(cancel_token)
         
-        logger.info(f"LLM service initialized with model: {model}")
+        if not (use_cache and self.cache):
+            return backend.complete(messages, temperature, max_tokens, session_id=session_id, cancel_token=cancel_token)
+        
+        # A cached completion may be shared with coalesced callers, so it is
+        # never aborted for one of them; the result stays useful in the cache
+        def request() -> str:
+            return backend.complete(messages, temperature, max_tokens, session_id=session_id)
+        
+        key = make_cache_key(
+            f"{backend.name}:{backend.model}",
+            {"temperature": temperature, "max_tokens": max_tokens},
+            messages
+        )
+        return self.cache.get_or_compute(key, request)
+    
+    def complete(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> str:
+        """
+        Run a plain chat completion (used by offline tools).
+        
+        Args:
+            messages: Full message list in OpenAI format
+            temperature: Sampling temperature (defaults to the service's)
+            max_tokens: Maximum tokens in response (defaults to the service's)
+        
+        Returns:
+            Response content
+        """
+        return self._complete(
+            messages,
+            temperature=self.temperature if temperature is None else temperature,
+            max_tokens=max_tokens or self.max_tokens
+        )
     
     def generate_response(
         self,
         system_prompt: str,
         messages: List[Dict[str, str]],
-        user_message: str
+        user_message: str,
+        use_cache: bool = False,
+        max_tokens: Optional[int] = None,
+        profile: Optional[str] = None,
+        session_id: Optional[str] = None,
+        cancel_token: Optional[CancelToken] = None
     ) -> str:
         """
         Generate response from LLM.
@@ -50,6 +395,11 @@ class LLMService:
             system_prompt: System prompt with interviewer instructions
             messages: Previous conversation messages
             user_message: Current user message
+            use_cache: Allow serving an identical earlier request from the cache
+            max_tokens: Override the configured response length for this turn
+            profile: Interviewer profile, selects the backend
+            session_id: Interview session, for per-session backend state
+            cancel_token: Aborts the completion when the turn is cancelled
         
         Returns:
             Raw LLM response with tags
@@ -62,22 +412,23 @@ class LLMService:
             
             logger.info(f"Sending request to LLM with {len(full_messages)} messages")
             
-            response = self.client.chat.completions.create(
-                extra_headers={
-                    "HTTP-Referer": "http://localhost:8000",
-                    "X-Title": "Entrevistador IA"
-                },
-                model=self.model,
-                messages=full_messages,
+            content = self._complete(
+                full_messages,
                 temperature=self.temperature,
-                max_tokens=self.max_tokens
+                max_tokens=max_tokens or self.max_tokens,
+                use_cache=use_cache,
+                profile=profile,
+                session_id=session_id,
+                cancel_token=cancel_token
             )
-            
-            content = response.choices[0].message.content
             logger.info(f"Received response: {len(content)} characters")
             
             return content
         
+        except TurnCancelled:
+            logger.info("LLM request cancelled")
+            raise
+        
         except Exception as e:
             logger.error(f"Error generating LLM response: {e}")
             raise
@@ -92,23 +443,109 @@ class LLMService:
         Returns:
             Tuple of (falar_content, codigo_content)
         """
-        # Extract <falar> content
-        falar_match = re.search(r'<falar>(.*?)</falar>', response, re.DOTALL)
-        falar_content = falar_match.group(1).strip() if falar_match else ""
-        
-        # Extract <codigo> content
-        codigo_match = re.search(r'<codigo>(.*?)</codigo>', response, re.DOTALL)
-        codigo_content = codigo_match.group(1).strip() if codigo_match else ""
+        parsed = scan_tags(response)
+        falar_content = parsed.get("falar")
+        codigo_content = parsed.get("codigo")
         
         logger.debug(f"Parsed - Falar: {len(falar_content)} chars, Codigo: {len(codigo_content)} chars")
         
         return falar_content, codigo_content
     
+    def repair_response(
+        self,
+        response: str,
+        parsed: ParsedResponse,
+        repair_tags: Tuple[str, ...] = ("falar",),
+        cancel_token: Optional[CancelToken] = None
+    ) -> ParsedResponse:
+        """
+        Fill in missing tags of a parsed response.
+        
+        Text outside of any tag is used as <falar> when that tag is missing.
+        Remaining missing tags in repair_tags are requested with a short
+        completion that only produces the missing part.
+        
+        Args:
+            response: Raw LLM response
+            parsed: Result of scan_tags on the response
+            repair_tags: Tags worth an extra completion when missing
+            cancel_token: Aborts the repair completions when the turn is cancelled
+        
+        Returns:
+            ParsedResponse with the recovered sections
+        
+        Raises:
+            TurnCancelled: If the turn was cancelled
+        """
+        sections = dict(parsed.sections)
+        if "falar" in parsed.missing and parsed.untagged:
+            sections["falar"] = parsed.untagged
+        
+        for tag in repair_tags:
+            if sections.get(tag):
+                continue
+            
+            logger.warning(f"Response missing <{tag}>, requesting repair")
+            repair_prompt = (
+                f"A resposta abaixo deveria conter a tag <{tag}>, mas ela está ausente.\n"
+                f"Escreva SOMENTE o conteúdo que falta, no formato <{tag}>...</{tag}>, "
+                f"em no máximo duas frases, coerente com a resposta.\n\n"
+                f"RESPOSTA:\n{response}"
+            )
+            try:
+                content = self._complete(
+                    [{"role": "user", "content": repair_prompt}],
+                    temperature=0.3,
+                    max_tokens=150,
+                    cancel_token=cancel_token
+                )
+                repaired = scan_tags(content, (tag,))
+                sections[tag] = repaired.get(tag) or repaired.untagged
+            except TurnCancelled:
+                logger.info(f"Repair of <{tag}> cancelled")
+                raise
+            except Exception as e:
+                logger.error(f"Error repairing <{tag}>: {e}")
+        
+        return ParsedResponse(
+            sections=sections,
+            missing=[tag for tag in parsed.missing if not sections.get(tag)],
+            untagged=parsed.untagged
+        )
+    
+    def parse_and_repair(
+        self,
+        response: str,
+        repair_tags: Tuple[str, ...] = ("falar",),
+        tags: Tuple[str, ...] = DEFAULT_TAGS,
+        cancel_token: Optional[CancelToken] = None
+    ) -> ParsedResponse:
+        """
+        Parse a response and repair it only if tags are missing.
+        
+        Args:
+            response: Raw LLM response
+            repair_tags: Tags worth an extra completion when missing
+            tags: Tags to extract
+            cancel_token: Aborts the repair completions when the turn is cancelled
+        
+        Returns:
+            ParsedResponse with the extracted sections
+        
+        Raises:
+            TurnCancelled: If the turn was cancelled during a repair
+        """
+        parsed = scan_tags(response, tags)
+        if any(tag in parsed.missing for tag in ("falar",) + tuple(repair_tags)):
+            parsed = self.repair_response(response, parsed, repair_tags, cancel_token=cancel_token)
+        return parsed
+    
     def generate_evaluation(
         self,
         messages: List[Dict[str, str]],
         profile: str,
-        stack: str
+        stack: str,
+        speech_metrics: Optional[str] = None
     ) -> Dict[str, any]:
         """
         Generate final interview evaluation.
@@ -117,11 +554,19 @@ class LLMService:
             messages: All conversation messages
             profile: Interviewer profile used
             stack: Technology stack
+            speech_metrics: Speech analytics summary of the spoken answers, if collected
         
         Returns:
             Evaluation dict with strengths, weaknesses, suggestions, and score
         """
-        evaluation_prompt = f"""Baseado na entrevista completa para a vaga de {profile} em {stack}, gere uma avaliação final do candidato.
+        metrics_section = ""
+        if speech_metrics:
+            metrics_section = f"""
+
+MÉTRICAS DE FALA (medidas no áudio das respostas; use para avaliar a comunicação, sem penalizar pausas curtas para pensar):
+{speech_metrics}"""
+        
+        evaluation_prompt = f"""Baseado na entrevista completa para a vaga de {profile} em {stack}, gere uma avaliação final do candidato.{metrics_section}
 
 FORMATO DE RESPOSTA:
 <codigo>
@@ -143,18 +588,13 @@ FORMATO DE RESPOSTA:
         try:
             eval_messages = messages + [{"role": "user", "content": evaluation_prompt}]
             
-            response = self.client.chat.completions.create(
-                extra_headers={
-                    "HTTP-Referer": "http://localhost:8000",
-                    "X-Title": "Entrevistador IA"
-                },
-                model=self.model,
-                messages=eval_messages,
+            # Evaluations always run on the default backend, whatever the profile uses
+            content = self._complete(
+                eval_messages,
                 temperature=0.3,  # Lower temperature for more consistent evaluation
-                max_tokens=1500
+                max_tokens=1500,
+                use_cache=True  # Retries and double-clicks resend the same transcript
             )
-            
-            content = response.choices[0].message.content
             _, codigo_content = self.parse_response(content)
             
             return {
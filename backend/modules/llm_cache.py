@@ -0,0 +1,160 @@
+"""
+Response cache for deterministic LLM calls.
+Entries are keyed by a hash of the model, sampling parameters and normalized
+messages, bounded by TTL and size, with single-flight deduplication so that
+concurrent identical requests only reach the provider once.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_content(content: str) -> str:
+    """Normalize line endings and surrounding whitespace of a message."""
+    lines = content.replace("\r\n", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+
+def make_cache_key(model: str, params: Dict, messages: List[Dict[str, str]]) -> str:
+    """
+    Build a stable cache key for a completion request.
+
+    Args:
+        model: Model identifier
+        params: Sampling parameters (temperature, max_tokens, ...)
+        messages: Message list in OpenAI format
+
+    Returns:
+        Hex digest identifying the request
+    """
+    payload = {
+        "model": model,
+        "params": params,
+        "messages": [
+            {"role": m["role"], "content": normalize_content(m["content"])}
+            for m in messages
+        ]
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class _InFlight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.value: Optional[str] = None
+        self.error: Optional[BaseException] = None
+
+
+class ResponseCache:
+    def __init__(self, ttl_seconds: float = 600.0, max_entries: int = 256):
+        """
+        Initialize the response cache.
+
+        Args:
+            ttl_seconds: Time an entry stays valid
+            max_entries: Maximum number of cached responses (LRU eviction)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._in_flight: Dict[str, _InFlight] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def _lookup(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key: str, value: str):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_compute(self, key: str, compute: Callable[[], str]) -> str:
+        """
+        Return the cached response for key, computing it at most once.
+
+        Concurrent callers with the same key wait for the first caller's
+        result instead of issuing their own request.
+
+        Args:
+            key: Cache key from make_cache_key
+            compute: Function performing the actual completion
+
+        Returns:
+            Response content
+        """
+        with self._lock:
+            value = self._lookup(key)
+            if value is not None:
+                self.hits += 1
+                return value
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                in_flight = _InFlight()
+                self._in_flight[key] = in_flight
+                self.misses += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            in_flight.event.wait()
+            if in_flight.error is not None:
+                raise in_flight.error
+            return in_flight.value
+
+        try:
+            value = compute()
+            in_flight.value = value
+            with self._lock:
+                self._store(key, value)
+            return value
+        except BaseException as e:
+            in_flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            in_flight.event.set()
+
+    def clear(self):
+        """Drop all cached entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Get hit-rate metrics."""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0
+            }
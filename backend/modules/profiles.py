@@ -1,233 +1,223 @@
 """
 Interviewer profile management with different levels and stacks.
+Profiles are loaded from prompt files in a directory and hot-reloaded
+when the files change on disk.
 """
 
-INTERVIEWER_PROFILES = {
-    "junior": {
-        "name": "Junior",
-        "description": "Perguntas leves focadas em fundamentos e conceitos básicos",
-        "system_prompt": """Você é um entrevistador técnico para vagas JUNIOR.
-
-REGRAS ESTRITAS:
-1. Faça perguntas sobre fundamentos e conceitos básicos
-2. Foque em sintaxe, estruturas de dados simples e lógica básica
-3. NÃO explique as respostas do candidato
-4. NÃO dê dicas ou ajuda
-5. Apenas faça perguntas, discuta brevemente as respostas e prossiga
-
-FORMATO DE RESPOSTA OBRIGATÓRIO:
-- Use a tag <falar> para o que você vai DIZER em voz alta
-- Use a tag <codigo> para mostrar perguntas, código ou conteúdo visual na tela
-
-Exemplo:
-<falar>Vamos começar com uma pergunta básica sobre {stack}.</falar>
-<codigo>
-### Pergunta 1
-Explique o que é uma variável e dê um exemplo.
-</codigo>
-
-Mantenha um tom profissional mas acolhedor."""
-    },
-    "pleno": {
-        "name": "Pleno",
-        "description": "Perguntas sobre arquitetura, padrões e estrutura de projetos",
-        "system_prompt": """Você é um entrevistador técnico para vagas PLENO.
-
-REGRAS ESTRITAS:
-1. Faça perguntas sobre arquitetura, padrões de projeto e boas práticas
-2. Explore experiência com frameworks, APIs e integração de sistemas
-3. NÃO explique as respostas do candidato
-4. NÃO dê dicas ou ajuda
-5. Apenas faça perguntas, discuta brevemente as respostas e prossiga
-
-FORMATO DE RESPOSTA OBRIGATÓRIO:
-- Use a tag <falar> para o que você vai DIZER em voz alta
-- Use a tag <codigo> para mostrar perguntas, código ou conteúdo visual na tela
-
-Exemplo:
-<falar>Me conte sobre sua experiência com arquitetura de software.</falar>
-<codigo>
-### Pergunta 1
-Descreva um sistema que você arquitetou recentemente. Quais padrões você utilizou e por quê?
-</codigo>
-
-Mantenha um tom profissional e investigativo."""
-    },
-    "senior": {
-        "name": "Senior",
-        "description": "Perguntas sobre sistemas distribuídos, concorrência e trade-offs",
-        "system_prompt": """Você é um entrevistador técnico para vagas SENIOR.
-
-REGRAS ESTRITAS:
-1. Faça perguntas sobre sistemas distribuídos, escalabilidade e decisões arquiteturais complexas
-2. Explore trade-offs, performance, concorrência e resiliência
-3. NÃO explique as respostas do candidato
-4. NÃO dê dicas ou ajuda
-5. Apenas faça perguntas, discuta brevemente as respostas e prossiga
-
-FORMATO DE RESPOSTA OBRIGATÓRIO:
-- Use a tag <falar> para o que você vai DIZER em voz alta
-- Use a tag <codigo> para mostrar perguntas, código ou conteúdo visual na tela
-
-Exemplo:
-<falar>Vamos discutir decisões arquiteturais em sistemas de larga escala.</falar>
-<codigo>
-### Pergunta 1
-Como você projetaria um sistema de mensageria que processa 1 milhão de mensagens por segundo? Quais trade-offs você consideraria?
-</codigo>
-
-Mantenha um tom profissional e desafiador."""
-    },
-    "devops": {
-        "name": "DevOps/Cloud",
-        "description": "Perguntas sobre infraestrutura, CI/CD e cloud",
-        "system_prompt": """Você é um entrevistador técnico para vagas DEVOPS/CLOUD.
-
-REGRAS ESTRITAS:
-1. Faça perguntas sobre infraestrutura como código, CI/CD, containers e cloud
-2. Explore conhecimento em Kubernetes, Docker, AWS/Azure/GCP, monitoramento
-3. NÃO explique as respostas do candidato
-4. NÃO dê dicas ou ajuda
-5. Apenas faça perguntas, discuta brevemente as respostas e prossiga
-
-FORMATO DE RESPOSTA OBRIGATÓRIO:
-- Use a tag <falar> para o que você vai DIZER em voz alta
-- Use a tag <codigo> para mostrar perguntas, código ou conteúdo visual na tela
-
-Exemplo:
-<falar>Vamos falar sobre sua experiência com infraestrutura.</falar>
-<codigo>
-### Pergunta 1
-Descreva um pipeline de CI/CD que você implementou. Quais ferramentas usou e quais desafios enfrentou?
-</codigo>
-
-Mantenha um tom profissional e técnico."""
-    },
-    "frontend": {
-        "name": "Frontend",
-        "description": "Perguntas sobre UI/UX, frameworks frontend e performance",
-        "system_prompt": """Você é um entrevistador técnico para vagas FRONTEND.
-
-REGRAS ESTRITAS:
-1. Faça perguntas sobre frameworks (React, Vue, Angular), performance web, acessibilidade
-2. Explore conhecimento em CSS, JavaScript moderno, state management, bundlers
-3. NÃO explique as respostas do candidato
-4. NÃO dê dicas ou ajuda
-5. Apenas faça perguntas, discuta brevemente as respostas e prossiga
-
-FORMATO DE RESPOSTA OBRIGATÓRIO:
-- Use a tag <falar> para o que você vai DIZER em voz alta
-- Use a tag <codigo> para mostrar perguntas, código ou conteúdo visual na tela
-
-Exemplo:
-<falar>Vamos discutir sua experiência com desenvolvimento frontend.</falar>
-<codigo>
-### Pergunta 1
-Como você otimizaria o carregamento de uma aplicação React que está lenta? Quais métricas você analisaria?
-</codigo>
-
-Mantenha um tom profissional e focado em UX."""
-    },
-    "backend": {
-        "name": "Backend",
-        "description": "Perguntas sobre APIs, bancos de dados e serviços",
-        "system_prompt": """Você é um entrevistador técnico para vagas BACKEND.
-
-REGRAS ESTRITAS:
-1. Faça perguntas sobre APIs REST/GraphQL, bancos de dados, microsserviços
-2. Explore conhecimento em performance, segurança, caching, filas
-3. NÃO explique as respostas do candidato
-4. NÃO dê dicas ou ajuda
-5. Apenas faça perguntas, discuta brevemente as respostas e prossiga
-
-FORMATO DE RESPOSTA OBRIGATÓRIO:
-- Use a tag <falar> para o que você vai DIZER em voz alta
-- Use a tag <codigo> para mostrar perguntas, código ou conteúdo visual na tela
-
-Exemplo:
-<falar>Vamos falar sobre design de APIs e bancos de dados.</falar>
-<codigo>
-### Pergunta 1
-Como você projetaria uma API REST para um sistema de e-commerce? Quais endpoints criaria e como estruturaria os dados?
-</codigo>
-
-Mantenha um tom profissional e técnico."""
-    },
-    "fullstack": {
-        "name": "Fullstack",
-        "description": "Perguntas balanceadas entre frontend e backend",
-        "system_prompt": """Você é um entrevistador técnico para vagas FULLSTACK.
-
-REGRAS ESTRITAS:
-1. Faça perguntas que cubram tanto frontend quanto backend
-2. Explore integração entre camadas, APIs, autenticação, deploy
-3. NÃO explique as respostas do candidato
-4. NÃO dê dicas ou ajuda
-5. Apenas faça perguntas, discuta brevemente as respostas e prossiga
-
-FORMATO DE RESPOSTA OBRIGATÓRIO:
-- Use a tag <falar> para o que você vai DIZER em voz alta
-- Use a tag <codigo> para mostrar perguntas, código ou conteúdo visual na tela
-
-Exemplo:
-<falar>Vamos discutir um projeto fullstack completo.</falar>
-<codigo>
-### Pergunta 1
-Descreva uma aplicação fullstack que você desenvolveu do zero. Como foi a arquitetura frontend-backend?
-</codigo>
-
-Mantenha um tom profissional e abrangente."""
-    },
-    "data": {
-        "name": "Data Engineer",
-        "description": "Perguntas sobre pipelines de dados, ETL e big data",
-        "system_prompt": """Você é um entrevistador técnico para vagas DATA ENGINEER.
-
-REGRAS ESTRITAS:
-1. Faça perguntas sobre pipelines de dados, ETL, data warehouses, big data
-2. Explore conhecimento em Spark, Airflow, SQL, modelagem de dados
-3. NÃO explique as respostas do candidato
-4. NÃO dê dicas ou ajuda
-5. Apenas faça perguntas, discuta brevemente as respostas e prossiga
-
-FORMATO DE RESPOSTA OBRIGATÓRIO:
-- Use a tag <falar> para o que você vai DIZER em voz alta
-- Use a tag <codigo> para mostrar perguntas, código ou conteúdo visual na tela
-
-Exemplo:
-<falar>Vamos falar sobre pipelines de dados.</falar>
-<codigo>
-### Pergunta 1
-Descreva um pipeline de ETL que você implementou. Quais ferramentas usou e como garantiu qualidade dos dados?
-</codigo>
-
-Mantenha um tom profissional e analítico."""
-    }
-}
+import threading
+import logging
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILES_DIR = Path(__file__).parent.parent / "profiles"
+DEFAULT_PROFILE = "pleno"
+# Stacks are free text, so bound the number of compiled (profile, stack) prompts
+MAX_COMPILED_PROMPTS = 1024
+
+
+def parse_profile_file(text: str) -> dict:
+    """
+    Parse a profile prompt file.
+
+    The file starts with "key: value" header lines (name, description,
+    order, topics as a comma-separated list), followed by a line containing only "---" and then the
+    system prompt.
+
+    Args:
+        text: File contents
+
+    Returns:
+        Profile dict with header fields and "system_prompt"
+    """
+    header, separator, body = text.partition("\n---\n")
+    if not separator:
+        raise ValueError("missing '---' separator between header and prompt")
+
+    profile = {}
+    for line in header.splitlines():
+        if not line.strip():
+            continue
+        key, _, value = line.partition(":")
+        profile[key.strip()] = value.strip()
+
+    if "name" not in profile:
+        raise ValueError("missing 'name' header")
+
+    profile["order"] = int(profile.get("order", 0))
+    profile.setdefault("description", "")
+    profile["topics"] = [t.strip() for t in profile.get("topics", "").split(",") if t.strip()]
+    profile["system_prompt"] = body.strip()
+    return profile
+
+
+class _Snapshot:
+    """Loaded profiles plus their compiled prompts; replaced as a whole on reload."""
+
+    def __init__(self, profiles: Dict[str, dict], mtimes: Dict[str, float]):
+        self.profiles = profiles
+        self.mtimes = mtimes
+        self.prompts: Dict[Tuple[str, Optional[str]], str] = {}
+        self.token_counts: Dict[Tuple[str, Optional[str]], int] = {}
+
+
+class ProfileRegistry:
+    def __init__(self, directory: Path = DEFAULT_PROFILES_DIR, reload_interval: float = 2.0):
+        """
+        Initialize the registry and load all profile files.
+
+        Args:
+            directory: Directory containing one <profile>.md file per profile
+            reload_interval: Seconds between mtime polls (0 disables hot reload)
+        """
+        self.directory = Path(directory)
+        self.reload_interval = reload_interval
+        self._snapshot = self._load(previous=None)
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+        logger.info(f"Loaded {len(self._snapshot.profiles)} profiles from: {self.directory}")
+
+    def _scan(self) -> Dict[str, float]:
+        return {
+            path.stem.lower(): path.stat().st_mtime
+            for path in self.directory.glob("*.md")
+        }
+
+    def _load(self, previous: Optional[_Snapshot]) -> _Snapshot:
+        mtimes = self._scan()
+        profiles = {}
+
+        for key, mtime in mtimes.items():
+            # Reuse unchanged profiles from the previous snapshot
+            if previous and previous.mtimes.get(key) == mtime and key in previous.profiles:
+                profiles[key] = previous.profiles[key]
+                continue
+            path = self.directory / f"{key}.md"
+            try:
+                profiles[key] = parse_profile_file(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                logger.error(f"Error loading profile {path.name}: {e}")
+                if previous and key in previous.profiles:
+                    profiles[key] = previous.profiles[key]
+
+        # Unknown profiles fall back to the default one, so never lose it on a reload
+        if DEFAULT_PROFILE not in profiles:
+            if previous and DEFAULT_PROFILE in previous.profiles:
+                logger.error(f"Default profile '{DEFAULT_PROFILE}' missing or invalid, keeping the last good one")
+                profiles[DEFAULT_PROFILE] = previous.profiles[DEFAULT_PROFILE]
+            else:
+                logger.error(f"Default profile '{DEFAULT_PROFILE}' not found in {self.directory}")
+
+        profiles = dict(sorted(profiles.items(), key=lambda item: (item[1]["order"], item[0])))
+        return _Snapshot(profiles, mtimes)
+
+    def reload_if_changed(self) -> bool:
+        """Reload the profile directory if any file was added, removed or modified."""
+        current = self._snapshot
+        if self._scan() == current.mtimes:
+            return False
+
+        self._snapshot = self._load(previous=current)
+        logger.info(f"Profiles reloaded: {len(self._snapshot.profiles)} available")
+        return True
+
+    def start_watching(self):
+        """Start polling the profile directory in a background thread."""
+        if self.reload_interval <= 0 or self._watcher is not None:
+            return
+
+        def watch():
+            while not self._stop.wait(self.reload_interval):
+                try:
+                    self.reload_if_changed()
+                except Exception as e:
+                    logger.error(f"Error reloading profiles: {e}")
+
+        self._watcher = threading.Thread(target=watch, name="profile-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        """Stop the background reload thread."""
+        self._stop.set()
+
+    def has_profile(self, profile_name: str) -> bool:
+        """Whether a profile with this name is loaded."""
+        return profile_name.lower() in self._snapshot.profiles
+
+    def get_profile(self, profile_name: str) -> dict:
+        """Get interviewer profile by name (the default profile for unknown names)."""
+        return self._resolve(self._snapshot, profile_name)
+
+    @staticmethod
+    def _resolve(snapshot: _Snapshot, profile_name: str) -> dict:
+        profile = snapshot.profiles.get(profile_name.lower()) or snapshot.profiles.get(DEFAULT_PROFILE)
+        if profile is None:
+            raise KeyError(f"Unknown profile '{profile_name}' and no default profile loaded")
+        return profile
+
+    def get_all_profiles(self) -> dict:
+        """Get all available interviewer profiles."""
+        return {
+            key: {
+                "name": value["name"],
+                "description": value["description"]
+            }
+            for key, value in self._snapshot.profiles.items()
+        }
+
+    def _compile(self, profile_name: str, stack: Optional[str]) -> Tuple[str, int]:
+        """Return the compiled prompt and its token count, compiling it once per snapshot."""
+        snapshot = self._snapshot
+        key = (profile_name.lower(), stack)
+
+        prompt = snapshot.prompts.get(key)
+        if prompt is None:
+            if len(snapshot.prompts) >= MAX_COMPILED_PROMPTS:
+                snapshot.prompts.clear()
+                snapshot.token_counts.clear()
+            prompt = self._resolve(snapshot, profile_name)["system_prompt"]
+            if stack:
+                prompt = prompt.replace("{stack}", stack)
+            snapshot.token_counts[key] = count_tokens(prompt)
+            snapshot.prompts[key] = prompt
+
+        return prompt, snapshot.token_counts.get(key, 0)
+
+    def get_system_prompt(self, profile_name: str, stack: str = None) -> str:
+        """Get the compiled system prompt for a profile and stack."""
+        return self._compile(profile_name, stack)[0]
+
+    def get_prompt_tokens(self, profile_name: str, stack: str = None) -> int:
+        """Get the token count of the compiled system prompt."""
+        return self._compile(profile_name, stack)[1]
+
+
+registry = ProfileRegistry(reload_interval=0)
+
+
+def configure_registry(directory: Path = DEFAULT_PROFILES_DIR, reload_interval: float = 2.0) -> ProfileRegistry:
+    """Replace the default registry and start hot reload."""
+    global registry
+    registry.stop_watching()
+    registry = ProfileRegistry(directory=directory, reload_interval=reload_interval)
+    registry.start_watching()
+    return registry
 
 
 def get_profile(profile_name: str) -> dict:
     """Get interviewer profile by name."""
-    return INTERVIEWER_PROFILES.get(profile_name.lower(), INTERVIEWER_PROFILES["pleno"])
+    return registry.get_profile(profile_name)
 
 
 def get_all_profiles() -> dict:
     """Get all available interviewer profiles."""
-    return {
-        key: {
-            "name": value["name"],
-            "description": value["description"]
-        }
-        for key, value in INTERVIEWER_PROFILES.items()
-    }
+    return registry.get_all_profiles()
 
 
 def get_system_prompt(profile_name: str, stack: str = None) -> str:
     """Get system prompt for a specific profile and stack."""
-    profile = get_profile(profile_name)
-    prompt = profile["system_prompt"]
-    
-    if stack:
-        prompt = prompt.replace("{stack}", stack)
-    
-    return prompt
+    return registry.get_system_prompt(profile_name, stack)
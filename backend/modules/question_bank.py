@@ -0,0 +1,279 @@
+"""
+Question bank with questions pre-generated offline per (profile, stack, topic, difficulty).
+Questions live in SQLite (with an FTS5 index for search) and are loaded into an
+in-memory index at startup, so picking the next question costs no I/O and no
+LLM tokens; the LLM only writes the spoken transition around it.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Questions stored with this stack apply to any stack of the profile
+ANY_STACK = "*"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id TEXT PRIMARY KEY,
+    profile TEXT NOT NULL,
+    stack TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    difficulty INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    body TEXT NOT NULL,
+    tests TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS idx_questions_lookup ON questions(profile, stack, difficulty);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5(
+    id UNINDEXED, topic, title, body, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+def normalize_stack(stack: Optional[str]) -> str:
+    """Normalize a free-text stack name for lookups."""
+    return (stack or ANY_STACK).strip().lower() or ANY_STACK
+
+
+def make_question_id(profile: str, stack: str, body: str) -> str:
+    """Build a stable, short question ID from its content."""
+    digest = hashlib.sha1(body.strip().encode("utf-8")).hexdigest()[:8]
+    return f"{profile}-{normalize_stack(stack).replace(' ', '_')}-{digest}"
+
+
+@dataclass(frozen=True)
+class Question:
+    id: str
+    profile: str
+    stack: str
+    topic: str
+    difficulty: int
+    title: str
+    body: str
+    # Test cases for coding questions: ({"call": "f(1)", "expected": "2"}, ...)
+    tests: Tuple[Dict, ...] = ()
+
+    def to_markdown(self) -> str:
+        """Render the question as the on-screen <codigo> content."""
+        return f"### {self.title}\n{self.body}"
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "profile": self.profile,
+            "stack": self.stack,
+            "topic": self.topic,
+            "difficulty": self.difficulty,
+            "title": self.title,
+            "body": self.body,
+            "tests": list(self.tests)
+        }
+
+
+class QuestionBank:
+    def __init__(self, db_path: str):
+        """
+        Open (or create) the question bank and load it into memory.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = str(db_path)
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(questions)")}
+            if "tests" not in columns:
+                conn.execute("ALTER TABLE questions ADD COLUMN tests TEXT NOT NULL DEFAULT '[]'")
+            try:
+                conn.executescript(_FTS_SCHEMA)
+                self.has_fts = True
+            except sqlite3.OperationalError:
+                logger.warning("SQLite built without FTS5, question search will use LIKE")
+                self.has_fts = False
+
+        self._by_id: Dict[str, Question] = {}
+        self._index: Dict[Tuple[str, str], List[Question]] = {}
+        self.reload()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, check_same_thread=False)
+
+    def reload(self):
+        """Rebuild the in-memory index from the database."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, profile, stack, topic, difficulty, title, body, tests FROM questions "
+                "ORDER BY profile, stack, difficulty, topic, id"
+            ).fetchall()
+
+        by_id = {}
+        index: Dict[Tuple[str, str], List[Question]] = {}
+        for row in rows:
+            question = Question(*row[:7], tests=tuple(json.loads(row[7] or "[]")))
+            by_id[question.id] = question
+            index.setdefault((question.profile, question.stack), []).append(question)
+
+        # Interleave topics within each difficulty so consecutive questions vary
+        for key, questions in index.items():
+            index[key] = _interleave_topics(questions)
+
+        with self._lock:
+            self._by_id = by_id
+            self._index = index
+
+        logger.info(f"Question bank loaded: {len(by_id)} questions in {len(index)} groups")
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def get(self, question_id: str) -> Optional[Question]:
+        """Get a question by ID."""
+        return self._by_id.get(question_id)
+
+    def next_question(
+        self,
+        profile: str,
+        stack: Optional[str],
+        asked_ids: Iterable[str] = (),
+        min_difficulty: int = 0
+    ) -> Optional[Question]:
+        """
+        Pick the next unasked question for a profile and stack.
+
+        Stack-specific questions come first, then the profile's generic ones.
+
+        Args:
+            profile: Interviewer profile
+            stack: Interview stack (free text)
+            asked_ids: IDs already asked in this session
+            min_difficulty: Skip questions easier than this
+
+        Returns:
+            Next question, or None when the bank has nothing left
+        """
+        asked = set(asked_ids)
+        profile = profile.lower()
+        for key in ((profile, normalize_stack(stack)), (profile, ANY_STACK)):
+            for question in self._index.get(key, ()):
+                if question.id not in asked and question.difficulty >= min_difficulty:
+                    return question
+        return None
+
+    def search(self, query: str, profile: Optional[str] = None, limit: int = 5) -> List[Question]:
+        """Full-text search over topics, titles and bodies."""
+        with self._connect() as conn:
+            if self.has_fts:
+                rows = conn.execute(
+                    "SELECT id FROM questions_fts WHERE questions_fts MATCH ? ORDER BY rank LIMIT ?",
+                    (query, limit * 4)
+                ).fetchall()
+            else:
+                pattern = f"%{query}%"
+                rows = conn.execute(
+                    "SELECT id FROM questions WHERE topic LIKE ? OR title LIKE ? OR body LIKE ? LIMIT ?",
+                    (pattern, pattern, pattern, limit * 4)
+                ).fetchall()
+
+        results = [self._by_id[row[0]] for row in rows if row[0] in self._by_id]
+        if profile:
+            results = [q for q in results if q.profile == profile.lower()]
+        return results[:limit]
+
+    def add_questions(self, questions: Iterable[Question]) -> int:
+        """
+        Insert or replace questions and refresh the in-memory index.
+
+        Returns:
+            Number of questions written
+        """
+        count = 0
+        with self._connect() as conn:
+            for question in questions:
+                conn.execute(
+                    "INSERT OR REPLACE INTO questions (id, profile, stack, topic, difficulty, title, body, tests) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (question.id, question.profile.lower(), normalize_stack(question.stack),
+                     question.topic, question.difficulty, question.title, question.body,
+                     json.dumps(list(question.tests), ensure_ascii=False))
+                )
+                if self.has_fts:
+                    conn.execute("DELETE FROM questions_fts WHERE id = ?", (question.id,))
+                    conn.execute(
+                        "INSERT INTO questions_fts (id, topic, title, body) VALUES (?, ?, ?, ?)",
+                        (question.id, question.topic, question.title, question.body)
+                    )
+                count += 1
+
+        self.reload()
+        return count
+
+
+def _interleave_topics(questions: List[Question]) -> List[Question]:
+    """Order questions by difficulty, round-robin across topics inside each level."""
+    result = []
+    levels: Dict[int, Dict[str, List[Question]]] = {}
+    for question in questions:
+        levels.setdefault(question.difficulty, {}).setdefault(question.topic, []).append(question)
+
+    for difficulty in sorted(levels):
+        queues = list(levels[difficulty].values())
+        while any(queues):
+            for queue in queues:
+                if queue:
+                    result.append(queue.pop(0))
+    return result
+
+
+def build_turn_instructions(
+    question: Question,
+    first_turn: bool = False,
+    current: Optional[Question] = None
+) -> str:
+    """
+    Instructions appended to the candidate's message on question-bank turns.
+
+    The questions themselves are shown on screen by the server, so the LLM only
+    writes the short spoken transition and decides whether to move on. On a
+    follow-up the current question stays on screen and the next one is not shown.
+
+    Args:
+        question: Next question of the bank, shown if the LLM moves on
+        first_turn: Whether this is the interview opening (always moves on)
+        current: Question on screen, kept on a follow-up
+    """
+    if first_turn or current is None:
+        return f"""
+
+[INSTRUÇÕES DO SISTEMA - não mencione ao candidato]
+A próxima pergunta do banco (ID {question.id}, tema: {question.topic}) será exibida na tela automaticamente:
+"{question.title}"
+Use <acao>proxima</acao>.
+Depois escreva <falar> com no máximo duas frases: um comentário breve sobre a resposta (se houver) e a
+transição para a próxima pergunta.
+NÃO escreva a tag <codigo>."""
+
+    return f"""
+
+[INSTRUÇÕES DO SISTEMA - não mencione ao candidato]
+Pergunta atual na tela (ID {current.id}): "{current.title}"
+Decida o próximo passo:
+- <acao>proxima</acao> se a resposta do candidato foi suficiente. A próxima pergunta do banco
+(ID {question.id}, tema: {question.topic}) será exibida na tela automaticamente: "{question.title}"
+- <acao>aprofundar</acao> para fazer uma pergunta de acompanhamento sobre a resposta. Nesse caso a
+pergunta atual continua na tela e a próxima NÃO é exibida; não a mencione.
+Depois escreva <falar> com no máximo duas frases: um comentário breve sobre a resposta e a transição
+para a próxima pergunta, ou a pergunta de acompanhamento.
+NÃO escreva a tag <codigo>."""
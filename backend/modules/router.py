@@ -0,0 +1,202 @@
+"""
+Session-affinity front router for multi-worker deployments.
+Each worker is an independent backend process (its own sessions and STT model);
+the router pins every session to one worker with rendezvous hashing on the
+session_id and proxies the request to it. Per-worker endpoints (diagnostics,
+drain) are reached through /router/workers/{index}/..., and /api/ready reports
+the readiness of all workers.
+"""
+
+import asyncio
+import hashlib
+import itertools
+import json
+import re
+import time
+import uuid
+import logging
+from typing import List, Optional
+
+import httpx
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+logger = logging.getLogger(__name__)
+
+# Headers that must not be forwarded between hops
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailers", "transfer-encoding", "upgrade", "host", "content-length"
+}
+
+# Per-worker readiness probe of the aggregated /api/ready
+READY_PROBE_TIMEOUT = 2.0
+
+_SESSION_PATH = re.compile(r"^/api/session/([^/]+)")
+_MULTIPART_SESSION = re.compile(rb'name="session_id"\r\n\r\n([^\r\n]+)\r\n')
+
+
+def pick_worker(session_id: str, workers: List[str]) -> str:
+    """
+    Choose the worker for a session with rendezvous (highest random weight) hashing.
+
+    Adding or removing a worker only moves the sessions that hashed to it.
+
+    Args:
+        session_id: Interview session ID
+        workers: Worker base URLs
+
+    Returns:
+        Base URL of the worker owning the session
+    """
+    def weight(worker: str) -> int:
+        digest = hashlib.blake2b(f"{worker}|{session_id}".encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    return max(workers, key=weight)
+
+
+def extract_session_id(request: Request, body: bytes) -> Optional[str]:
+    """Find the session_id in the path, query string, JSON body or multipart form."""
+    match = _SESSION_PATH.match(request.url.path)
+    if match:
+        return match.group(1)
+
+    session_id = request.headers.get("x-session-id") or request.query_params.get("session_id")
+    if session_id:
+        return session_id
+
+    if not body:
+        return None
+
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("application/json"):
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return None
+        if isinstance(payload, dict) and payload.get("session_id"):
+            return str(payload["session_id"])
+    elif content_type.startswith("multipart/form-data"):
+        match = _MULTIPART_SESSION.search(body)
+        if match:
+            return match.group(1).decode("utf-8", errors="replace")
+
+    return None
+
+
+def create_router_app(workers: List[str], timeout: float = 120.0, connect_retry: float = 0.0) -> Starlette:
+    """
+    Build the front router ASGI app.
+
+    Args:
+        workers: Worker base URLs (e.g. http://127.0.0.1:8001)
+        timeout: Upstream request timeout in seconds
+        connect_retry: Seconds to keep retrying a worker that refuses connections
+            (restarting); the request is held instead of failing with 502
+
+    Returns:
+        Starlette application proxying to the workers
+    """
+    client = httpx.AsyncClient(timeout=timeout)
+    round_robin = itertools.cycle(workers)
+
+    async def health(request: Request):
+        return JSONResponse({"status": "online", "workers": workers})
+
+    async def probe(index: int, worker: str) -> dict:
+        try:
+            response = await client.get(worker + "/api/ready", timeout=READY_PROBE_TIMEOUT)
+            return {"worker": index, "ready": response.status_code == 200, "status": response.json()}
+        except (httpx.HTTPError, ValueError) as e:
+            return {"worker": index, "ready": False, "status": {"error": str(e) or type(e).__name__}}
+
+    async def ready(request: Request):
+        """Aggregated readiness: the router can take traffic while any worker is ready."""
+        statuses = await asyncio.gather(*(probe(index, worker) for index, worker in enumerate(workers)))
+        ready_count = sum(1 for status in statuses if status["ready"])
+        return JSONResponse(
+            {"ready": ready_count > 0, "workers_ready": ready_count, "workers": statuses},
+            status_code=200 if ready_count else 503
+        )
+
+    async def proxy_to_worker(request: Request):
+        """Send a request to one worker by index, e.g. /router/workers/1/api/admin/profile."""
+        index = request.path_params["index"]
+        if not 0 <= index < len(workers):
+            return JSONResponse({"detail": f"Unknown worker {index} (0-{len(workers) - 1})"}, status_code=404)
+        return await forward(request, workers[index], "/" + request.path_params["path"], await request.body())
+
+    async def proxy(request: Request):
+        body = await request.body()
+        session_id = extract_session_id(request, body)
+
+        # New interviews get their ID here so the router knows where they live
+        if session_id is None and request.url.path == "/api/interview/start" and request.method == "POST":
+            try:
+                payload = json.loads(body) if body else {}
+            except ValueError:
+                payload = None
+            if isinstance(payload, dict):
+                session_id = str(uuid.uuid4())
+                payload["session_id"] = session_id
+                body = json.dumps(payload).encode("utf-8")
+
+        worker = pick_worker(session_id, workers) if session_id else next(round_robin)
+        return await forward(request, worker, request.url.path, body)
+
+    async def forward(request: Request, worker: str, path: str, body: bytes):
+        """Proxy a request to a worker, streaming the response back."""
+        # The client's disconnect is not propagated: the worker's turn keeps running
+        # until it finishes (it can still be cancelled with /api/interview/cancel)
+        headers = [
+            (key, value) for key, value in request.headers.raw
+            if key.decode("latin-1").lower() not in HOP_BY_HOP_HEADERS
+        ]
+        upstream_request = client.build_request(
+            request.method,
+            worker + path,
+            params=request.query_params,
+            headers=headers,
+            content=body
+        )
+
+        deadline = time.monotonic() + connect_retry
+        while True:
+            try:
+                upstream = await client.send(upstream_request, stream=True)
+                break
+            except httpx.ConnectError as e:
+                # Nothing reached the worker, so resending is safe
+                if time.monotonic() >= deadline:
+                    logger.error(f"Worker {worker} unavailable: {e}")
+                    return JSONResponse({"detail": "Worker unavailable"}, status_code=502)
+                await asyncio.sleep(0.25)
+            except httpx.HTTPError as e:
+                logger.error(f"Worker {worker} unavailable: {e}")
+                return JSONResponse({"detail": "Worker unavailable"}, status_code=502)
+
+        response_headers = {
+            key: value for key, value in upstream.headers.items()
+            if key.lower() not in HOP_BY_HOP_HEADERS
+        }
+        return StreamingResponse(
+            upstream.aiter_raw(),
+            status_code=upstream.status_code,
+            headers=response_headers,
+            background=BackgroundTask(upstream.aclose)
+        )
+
+    methods = ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "HEAD"]
+    return Starlette(
+        routes=[
+            Route("/router/health", health, methods=["GET"]),
+            Route("/router/workers/{index:int}/{path:path}", proxy_to_worker, methods=methods),
+            Route("/api/ready", ready, methods=["GET"]),
+            Route("/{path:path}", proxy, methods=methods),
+        ],
+        on_shutdown=[client.aclose]
+    )
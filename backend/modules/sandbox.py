@@ -0,0 +1,505 @@
+"""
+Sandboxed execution of candidate code answers.
+A pool of pre-started, isolated worker processes runs Python code against
+test cases; each worker runs a single job and is replaced, so CPU-time limits
+and leftover state never carry over between runs.
+
+Workers are separate interpreters (not forks of the server) started with an
+empty environment in a throwaway directory; before running anything they move
+to a private network namespace, drop to an unprivileged user and apply
+resource limits. Results come back as size-limited JSON (never pickle), so a
+compromised worker cannot run code in the server.
+"""
+
+import ctypes
+import json
+import os
+import queue
+import re
+import select
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Dict, List, Optional
+import logging
+
+try:
+    import pwd
+    import resource
+except ImportError:  # Windows
+    pwd = resource = None
+
+logger = logging.getLogger(__name__)
+
+_FENCE = re.compile(r"```[ \t]*(\w*)[^\n]*\n(.*?)```", re.DOTALL)
+_ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;?]*[ -/]*[@-~]")
+_CONTROL_CHARS = re.compile(r"[\x00-\x08\x0b-\x1f\x7f-\x9f]")
+
+CLONE_NEWUSER = 0x10000000
+CLONE_NEWNET = 0x40000000
+
+# Largest JSON message accepted from a worker
+MAX_MESSAGE_BYTES = 1024 * 1024
+
+RESULT_STATUSES = ("ok", "error", "syntax_error", "timeout", "memory", "exit")
+
+# Imported before dropping privileges: the interpreter's stdlib may not be
+# readable by the sandbox user (e.g. a Python installed under /root)
+PRELOADED_MODULES = (
+    "array", "bisect", "collections", "copy", "dataclasses", "datetime", "decimal",
+    "enum", "fractions", "functools", "heapq", "itertools", "json", "math", "operator",
+    "random", "re", "statistics", "string", "textwrap", "typing", "unicodedata"
+)
+
+
+def extract_code(text: str, has_tests: bool = False) -> Optional[str]:
+    """
+    Get runnable Python code from a candidate answer.
+
+    Only code marked as Python is run: "x = [1,2,3]", console.log(...) or a
+    plain "sim" also compile as Python, and would come back as false errors.
+    When the current question has Python test cases, the answer is known to
+    be Python, so an unlabeled fence or the whole text is accepted too.
+
+    Args:
+        text: Candidate answer
+        has_tests: Whether the current question has test cases
+
+    Returns:
+        The first ```python fence (or, with tests, unlabeled fence / whole
+        text that compiles), None when there is no Python code to run
+    """
+    fences = _FENCE.findall(text)
+    for language, body in fences:
+        if language.lower() in ("py", "python", "python3"):
+            return body
+    if not has_tests:
+        return None
+
+    for language, body in fences:
+        if not language:
+            return body
+    try:
+        compile(text, "<candidato>", "exec")
+        return text
+    except SyntaxError:
+        return None
+
+
+def sanitize_output(text, limit: int) -> str:
+    """Strip terminal escapes and control characters from candidate output and truncate it."""
+    text = _CONTROL_CHARS.sub("", _ANSI_ESCAPE.sub("", str(text)))
+    if len(text) > limit:
+        text = text[:limit] + "\n[saída truncada]"
+    return text
+
+
+# ---------- worker process ----------
+
+def _unshare_network():
+    """Move the process to an empty network namespace (no interfaces, not even loopback)."""
+    libc = ctypes.CDLL(None, use_errno=True)
+    if libc.unshare(CLONE_NEWNET) == 0:
+        return
+    error = ctypes.get_errno()
+    # Unprivileged: a user namespace grants the capability inside it
+    if os.geteuid() != 0 and libc.unshare(CLONE_NEWUSER | CLONE_NEWNET) == 0:
+        return
+    raise OSError(error, f"unshare(CLONE_NEWNET) failed: {os.strerror(error)}")
+
+
+def _isolate(cpu_seconds: int, memory_mb: int, uid: int, gid: int):
+    """Isolate the current process: no network, unprivileged user, CPU/memory/process/file limits."""
+    _unshare_network()
+
+    if uid >= 0:
+        os.setgroups([])
+        os.setgid(gid)
+        os.setuid(uid)
+
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds))
+    memory = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (0, 0))
+
+
+def _execute(code: str, tests: List[Dict], max_output: int) -> Dict:
+    import io
+    from contextlib import redirect_stdout
+
+    stdout = io.StringIO()
+    namespace = {"__name__": "__candidato__"}
+    result = {"status": "ok", "passed": 0, "total": len(tests), "failures": [], "stdout": "", "error": ""}
+
+    try:
+        compiled = compile(code, "<candidato>", "exec")
+    except SyntaxError as e:
+        result.update(status="syntax_error", error=f"linha {e.lineno}: {e.msg}")
+        return result
+
+    try:
+        with redirect_stdout(stdout):
+            exec(compiled, namespace)
+            for test in tests:
+                try:
+                    got = eval(test["call"], namespace)
+                    expected = eval(test["expected"], {})
+                    if got == expected:
+                        result["passed"] += 1
+                    else:
+                        result["failures"].append(
+                            {"call": test["call"], "expected": test["expected"], "got": repr(got)[:200]}
+                        )
+                except (Exception, SystemExit) as e:
+                    result["failures"].append(
+                        {"call": test["call"], "expected": test["expected"], "got": f"{type(e).__name__}: {e}"[:200]}
+                    )
+    except MemoryError:
+        result.update(status="memory", error="limite de memória excedido")
+    except SystemExit as e:
+        # sys.exit() in the candidate's code must not end the worker
+        result.update(status="exit", error=f"o código chamou sys.exit({e.code!r})")
+    except Exception as e:
+        frames = traceback.extract_tb(e.__traceback__)
+        line = next((f.lineno for f in reversed(frames) if f.filename == "<candidato>"), None)
+        result.update(status="error", error=f"{type(e).__name__}: {e}" + (f" (linha {line})" if line else ""))
+
+    result["stdout"] = stdout.getvalue()[:max_output]
+    return result
+
+
+def _worker_main(cpu_seconds: int, memory_mb: int, max_output: int, uid: int, gid: int):
+    """
+    Entry point of a sandbox worker process (python -I sandbox.py --worker ...).
+
+    Talks to the pool over its original stdin/stdout with one JSON object per
+    line: "ready" (or a startup error), then one job and its result.
+    """
+    # Keep private copies of the pipes; fds 0-2 point to /dev/null for the candidate code
+    channel_in = os.fdopen(os.dup(0), "rb")
+    channel_out = os.fdopen(os.dup(1), "wb")
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+
+    def send(message: Dict):
+        channel_out.write(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+        channel_out.flush()
+
+    try:
+        for name in PRELOADED_MODULES:
+            __import__(name)
+        _isolate(cpu_seconds, memory_mb, uid, gid)
+    except Exception as e:
+        send({"error": f"{type(e).__name__}: {e}"})
+        return
+
+    try:
+        send({"ready": True})
+        job = json.loads(channel_in.readline())
+        send(_execute(job["code"], job["tests"], max_output))
+    except (EOFError, OSError, ValueError):
+        # The pool closed the pipe (shutdown or killed parent)
+        pass
+
+
+# ---------- pool ----------
+
+class _Worker:
+    def __init__(self, process: subprocess.Popen, workdir: str):
+        self.process = process
+        self.workdir = workdir
+        self._buffer = b""
+
+    def send(self, message: Dict):
+        self.process.stdin.write(json.dumps(message).encode("utf-8") + b"\n")
+        self.process.stdin.flush()
+
+    def receive(self, timeout: float) -> Dict:
+        """
+        Read one JSON message from the worker.
+
+        Raises:
+            TimeoutError: If no complete message arrived in time
+            EOFError: If the worker exited (killed by a limit)
+            ValueError: If the message is oversized or not a JSON object
+        """
+        deadline = time.monotonic() + timeout
+        fd = self.process.stdout.fileno()
+        while b"\n" not in self._buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError
+            readable, _, _ = select.select([fd], [], [], remaining)
+            if not readable:
+                continue
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise EOFError
+            self._buffer += chunk
+            if len(self._buffer) > MAX_MESSAGE_BYTES:
+                raise ValueError("oversized message from sandbox worker")
+
+        line, _, self._buffer = self._buffer.partition(b"\n")
+        message = json.loads(line)
+        if not isinstance(message, dict):
+            raise ValueError("unexpected message from sandbox worker")
+        return message
+
+    def kill(self):
+        self.process.kill()
+        try:
+            self.process.wait(1)
+        except subprocess.TimeoutExpired:
+            pass
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+class CodeSandbox:
+    def __init__(
+        self,
+        workers: int = 2,
+        cpu_seconds: int = 2,
+        memory_mb: int = 256,
+        timeout: float = 5.0,
+        max_output: int = 2000,
+        user: Optional[str] = "nobody"
+    ):
+        """
+        Initialize the sandbox and pre-start the worker pool.
+
+        Args:
+            workers: Number of idle, ready-to-run workers kept in the pool
+            cpu_seconds: CPU time limit per run
+            memory_mb: Address space limit per run
+            timeout: Wall-clock limit per run (covers sleeps and blocking calls)
+            max_output: Maximum characters of captured stdout
+            user: Unprivileged user the workers run as (when the server runs as root)
+
+        Raises:
+            RuntimeError: If workers cannot be isolated (no resource limits, no
+                network namespace, or root without a sandbox user)
+        """
+        if resource is None or not sys.platform.startswith("linux"):
+            raise RuntimeError("Code sandbox requires Linux (resource limits and network namespaces)")
+
+        self.uid = self.gid = -1
+        if os.geteuid() == 0:
+            if not user:
+                raise RuntimeError("Refusing to run candidate code as root: set sandbox.user")
+            try:
+                entry = pwd.getpwnam(user)
+            except KeyError:
+                raise RuntimeError(f"Sandbox user '{user}' does not exist")
+            self.uid, self.gid = entry.pw_uid, entry.pw_gid
+        else:
+            logger.warning("Server is not running as root: sandbox workers keep its uid, "
+                           "so files readable by the server stay readable by candidate code")
+
+        self.size = workers
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.timeout = timeout
+        self.max_output = max_output
+
+        self._ready: "queue.Queue[_Worker]" = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=500)
+        self.runs = 0
+        self.timeouts = 0
+        self.cold_starts = 0
+
+        started = time.perf_counter()
+        for _ in range(workers):
+            self._ready.put(self._spawn())
+        self.warmup_seconds = time.perf_counter() - started
+
+        logger.info(f"Code sandbox ready: {workers} workers warmed up in {self.warmup_seconds:.2f}s")
+
+    def _spawn(self) -> _Worker:
+        workdir = tempfile.mkdtemp(prefix="sandbox-")
+        if self.uid >= 0:
+            os.chown(workdir, self.uid, self.gid)
+        process = subprocess.Popen(
+            [sys.executable, "-I", os.path.abspath(__file__), "--worker",
+             str(self.cpu_seconds), str(self.memory_mb), str(self.max_output), str(self.uid), str(self.gid)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env={},
+            cwd=workdir,
+            bufsize=0
+        )
+        worker = _Worker(process, workdir)
+
+        # Block until the worker is isolated and waits for its job
+        try:
+            message = worker.receive(30)
+        except (TimeoutError, EOFError, ValueError) as e:
+            message = {"error": repr(e)}
+        if not message.get("ready"):
+            worker.kill()
+            raise RuntimeError(f"Sandbox worker failed to start: {message.get('error')}")
+        return worker
+
+    def _replenish(self):
+        # Runs that had to cold-start a worker must not grow the pool
+        if self._closed or self._ready.qsize() >= self.size:
+            return
+        try:
+            worker = self._spawn()
+        except Exception as e:
+            if not self._closed:
+                logger.error(f"Error spawning sandbox worker: {e!r}")
+            return
+        if self._closed:
+            worker.kill()
+        else:
+            self._ready.put(worker)
+
+    def _acquire(self) -> _Worker:
+        try:
+            return self._ready.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                self.cold_starts += 1
+            return self._spawn()
+
+    def run(self, code: str, tests: Optional[List[Dict]] = None) -> Dict:
+        """
+        Run candidate code against test cases in a fresh sandboxed worker.
+
+        Args:
+            code: Python source code
+            tests: Test cases as {"call": "f(1, 2)", "expected": "3"}
+
+        Returns:
+            Result dict with status, passed/total, failures, stdout, error and duration_ms
+        """
+        worker = self._acquire()
+        started = time.perf_counter()
+
+        try:
+            worker.send({"code": code, "tests": list(tests or [])})
+            try:
+                result = self._clean_result(worker.receive(self.timeout), len(tests or []))
+            except TimeoutError:
+                result = {"status": "timeout", "error": f"tempo limite de {self.timeout:.0f}s excedido"}
+            except (EOFError, OSError):
+                # Killed by the kernel: CPU (SIGXCPU) or memory limit
+                result = {"status": "timeout", "error": "limite de CPU ou memória excedido"}
+            except ValueError:
+                result = {"status": "error", "error": "resultado inválido do sandbox"}
+        finally:
+            worker.kill()
+            threading.Thread(target=self._replenish, daemon=True).start()
+
+        duration = time.perf_counter() - started
+        result.setdefault("passed", 0)
+        result.setdefault("total", len(tests or []))
+        result.setdefault("failures", [])
+        result.setdefault("stdout", "")
+        result["duration_ms"] = round(duration * 1000, 1)
+
+        with self._lock:
+            self.runs += 1
+            if result["status"] == "timeout":
+                self.timeouts += 1
+            self._latencies.append(duration)
+
+        return result
+
+    def _clean_result(self, raw: Dict, total: int) -> Dict:
+        """Rebuild a worker result from known fields only, sanitized and size-limited."""
+        def number(value) -> int:
+            return value if isinstance(value, int) and not isinstance(value, bool) else 0
+
+        failures = raw.get("failures") if isinstance(raw.get("failures"), list) else []
+        return {
+            "status": raw.get("status") if raw.get("status") in RESULT_STATUSES else "error",
+            "passed": min(number(raw.get("passed")), total),
+            "total": total,
+            "failures": [
+                {key: sanitize_output(failure.get(key, ""), 200) for key in ("call", "expected", "got")}
+                for failure in failures[:20] if isinstance(failure, dict)
+            ],
+            "stdout": sanitize_output(raw.get("stdout", ""), self.max_output),
+            "error": sanitize_output(raw.get("error", ""), 500)
+        }
+
+    def stats(self) -> Dict:
+        """Get pool warm-up and per-run latency metrics."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            runs, timeouts, cold_starts = self.runs, self.timeouts, self.cold_starts
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 1)
+
+        return {
+            "workers": self.size,
+            "idle_workers": self._ready.qsize(),
+            "warmup_ms": round(self.warmup_seconds * 1000, 1),
+            "runs": runs,
+            "timeouts": timeouts,
+            "cold_starts": cold_starts,
+            "latency_ms": {
+                "mean": round(statistics.fmean(latencies) * 1000, 1) if latencies else 0.0,
+                "p50": percentile(0.50),
+                "p95": percentile(0.95)
+            }
+        }
+
+    def close(self):
+        """Terminate idle workers."""
+        self._closed = True
+        while True:
+            try:
+                worker = self._ready.get_nowait()
+            except queue.Empty:
+                break
+            worker.kill()
+
+
+def format_result(result: Dict) -> str:
+    """Compact, prompt-friendly summary of an execution result."""
+    status = result["status"]
+    if status == "syntax_error":
+        return f"Erro de sintaxe ({result['error']})."
+    if status == "timeout":
+        return f"Execução interrompida: {result['error']}."
+    if status == "memory":
+        return "Execução interrompida: limite de memória excedido."
+
+    parts = []
+    if result["total"]:
+        parts.append(f"{result['passed']}/{result['total']} testes passaram")
+    if status in ("error", "exit"):
+        parts.append(f"erro: {result['error']}")
+    elif not result["total"]:
+        parts.append("executou sem erros (sem casos de teste)")
+    for failure in result["failures"][:3]:
+        parts.append(f"falha: {failure['call']} esperado {failure['expected']}, obtido {failure['got']}")
+    if result.get("stdout"):
+        parts.append(f"saída: {result['stdout'][:200].strip()!r}")
+    parts.append(f"{result['duration_ms']:.0f} ms")
+    return "; ".join(parts) + "."
+
+
+if __name__ == "__main__" and sys.argv[1:2] == ["--worker"]:
+    _worker_main(*(int(value) for value in sys.argv[2:7]))
@@ -0,0 +1,306 @@
+"""
+Service container for the backend.
+Built once per application in the FastAPI lifespan (not at import time) and
+shared by all endpoints through app.state.
+"""
+
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import logging
+
+from .stt import STTService
+from .tts import TTSService, build_tts_backends
+from .llm import LLMService, build_backends
+from .llm_cache import ResponseCache
+from .profiles import ProfileRegistry, configure_registry, get_system_prompt
+from .transcript_store import TranscriptStore
+from .question_bank import QuestionBank, build_turn_instructions
+from .sandbox import CodeSandbox, extract_code
+from .cancellation import CancelToken, TurnRegistry, check
+from .diagnostics import MemoryTracker, SamplingProfiler
+from .evaluation import OPENING_MESSAGE, SPEECH_ANALYTICS_ROLE, speech_answers, speech_metrics_text
+
+logger = logging.getLogger(__name__)
+
+BANK_TURN_TAGS = ("falar", "codigo", "acao")
+
+
+class Services:
+    def __init__(self, config: Dict, base_dir: Path):
+        """
+        Construct all services described by config.json.
+
+        Heavy SDKs (faster-whisper, openai, elevenlabs) are only imported when
+        a service first needs its client.
+
+        Args:
+            config: Parsed config.json
+            base_dir: Directory relative paths in the config are resolved against
+        """
+        self.config = config
+        self.base_dir = Path(base_dir)
+        self.sessions: Dict[str, Dict] = {}
+        self.turns = TurnRegistry()
+        
+        # Admin diagnostics are disabled unless a token is configured
+        self.admin_token: Optional[str] = os.getenv("ADMIN_TOKEN") or config.get("admin", {}).get("token") or None
+        self.profiler = SamplingProfiler(self.base_dir)
+        self.memory = MemoryTracker(self.base_dir, frames=config.get("admin", {}).get("tracemalloc_frames", 1))
+
+        # Load interviewer profiles and watch the prompt files for changes
+        profiles_config = config.get("profiles", {})
+        self.profile_registry: ProfileRegistry = configure_registry(
+            directory=self.base_dir / profiles_config.get("directory", "profiles"),
+            reload_interval=profiles_config.get("reload_interval", 2.0)
+        )
+
+        self.stt_service = STTService(
+            model_size=config["stt"]["model_size"],
+            device=config["stt"]["device"],
+            compute_type=config["stt"]["compute_type"]
+        )
+
+        # Get API keys from environment or config
+        elevenlabs_key = os.getenv("ELEVENLABS_API_KEY") or config["api_keys"]["elevenlabs"]
+        openrouter_key = os.getenv("OPENROUTER_API_KEY") or config["api_keys"]["openrouter"]
+        voice_id = os.getenv("ELEVENLABS_VOICE_ID") or config["tts"]["voice_id"]
+
+        self.tts_service = TTSService(
+            backends=build_tts_backends(config["tts"], elevenlabs_key, voice_id),
+            backend=config["tts"].get("backend", "elevenlabs"),
+            fallback_backend=config["tts"].get("fallback_backend"),
+            fallback_timeout=config["tts"].get("fallback_timeout", 3.0),
+            concurrency=config["tts"].get("concurrency", 0)
+        )
+
+        cache_config = config["llm"].get("cache", {})
+        self.llm_cache: Optional[ResponseCache] = None
+        if cache_config.get("enabled", False):
+            self.llm_cache = ResponseCache(
+                ttl_seconds=cache_config.get("ttl_seconds", 600),
+                max_entries=cache_config.get("max_entries", 256)
+            )
+
+        self.llm_service = LLMService(
+            api_key=openrouter_key,
+            model=config["llm"]["model"],
+            temperature=config["llm"]["temperature"],
+            max_tokens=config["llm"]["max_tokens"],
+            cache=self.llm_cache,
+            backends=build_backends(config["llm"], openrouter_key),
+            default_backend=config["llm"].get("backend", "openrouter"),
+            profile_backends=config["llm"].get("profile_backends", {})
+        )
+        self.repair_tags = tuple(config["llm"].get("repair_tags", ["falar"]))
+
+        transcript_config = config.get("transcripts", {})
+        self.transcript_store: Optional[TranscriptStore] = None
+        if transcript_config.get("enabled", False):
+            self.transcript_store = TranscriptStore(
+                db_path=self.base_dir / transcript_config.get("path", "data/transcripts.db"),
+                batch_size=transcript_config.get("batch_size", 100),
+                flush_interval=transcript_config.get("flush_interval", 1.0)
+            )
+
+        self.bank_config = config.get("question_bank", {})
+        self.question_bank: Optional[QuestionBank] = None
+        if self.bank_config.get("enabled", False):
+            self.question_bank = QuestionBank(self.base_dir / self.bank_config.get("path", "data/question_bank.db"))
+            if not len(self.question_bank):
+                logger.warning("Question bank is empty, questions will be generated by the LLM")
+
+        sandbox_config = config.get("sandbox", {})
+        self.sandbox: Optional[CodeSandbox] = None
+        if sandbox_config.get("enabled", False):
+            try:
+                self.sandbox = CodeSandbox(
+                    workers=sandbox_config.get("workers", 2),
+                    cpu_seconds=sandbox_config.get("cpu_seconds", 2),
+                    memory_mb=sandbox_config.get("memory_mb", 256),
+                    timeout=sandbox_config.get("timeout", 5.0),
+                    max_output=sandbox_config.get("max_output", 2000),
+                    user=sandbox_config.get("user", "nobody")
+                )
+            except RuntimeError as e:
+                logger.warning(f"Code sandbox disabled: {e}")
+
+    def close(self):
+        """Stop background workers and flush pending transcript records."""
+        self.profile_registry.stop_watching()
+        self.memory.stop()
+        self.tts_service.close()
+        if self.sandbox:
+            self.sandbox.close()
+        if self.transcript_store:
+            self.transcript_store.close()
+
+    def append_message(self, session_id: str, message: Dict):
+        """Store a message on the session and queue it for the transcript archive."""
+        self.sessions[session_id]["messages"].append(message)
+        if self.transcript_store:
+            self.transcript_store.record_message(session_id, message)
+
+    def analyze_speech(self, session_id: str, words: List[Dict]) -> Optional[Dict]:
+        """
+        Compute speech metrics for one spoken answer and store them on the session
+        and in the transcript archive (so offline re-scoring sees them too).
+        
+        Args:
+            session_id: Session ID (metrics are only stored for live sessions)
+            words: Word timings from STTService.transcribe_with_timestamps
+        
+        Returns:
+            Metrics dict, or None when there are no words
+        """
+        # Imported here: NumPy is only needed when analytics are requested
+        from .speech_analytics import analyze_words, DEFAULT_FILLER_PHRASES, DEFAULT_FILLER_WORDS
+        
+        options = self.config.get("speech_analytics", {})
+        metrics = analyze_words(
+            words,
+            filler_words=options.get("filler_words", DEFAULT_FILLER_WORDS),
+            filler_phrases=options.get("filler_phrases", DEFAULT_FILLER_PHRASES),
+            pause_threshold=options.get("pause_threshold", 0.25),
+            long_pause=options.get("long_pause", 1.0)
+        )
+        session = self.sessions.get(session_id)
+        if metrics and session is not None:
+            session["speech_analytics"].append(metrics)
+            if self.transcript_store:
+                self.transcript_store.record_message(session_id, {
+                    "role": SPEECH_ANALYTICS_ROLE,
+                    "metrics": metrics,
+                    "timestamp": datetime.now().isoformat()
+                })
+        return metrics
+    
+    def speech_summary(self, session_id: str) -> Optional[str]:
+        """Interview-level speech metrics as text for the evaluation prompt, if any were collected."""
+        return speech_metrics_text(speech_answers(self.sessions[session_id]))
+    
+    def run_code(self, session_id: str, text: str) -> Optional[Dict]:
+        """
+        Run a code answer in the sandbox against the current question's tests.
+
+        Returns:
+            Execution result, or None when the sandbox is disabled or the answer has no Python code
+        """
+        if not self.sandbox:
+            return None
+
+        tests = ()
+        question_id = self.sessions[session_id].get("current_question")
+        if self.question_bank and question_id:
+            question = self.question_bank.get(question_id)
+            tests = question.tests if question else ()
+
+        code = extract_code(text, has_tests=bool(tests))
+        if code is None:
+            return None
+
+        result = self.sandbox.run(code, list(tests))
+        logger.info(f"Sandbox run for session {session_id}: {result['status']} "
+                    f"{result['passed']}/{result['total']} in {result['duration_ms']} ms")
+        return result
+
+    def generate_turn(
+        self,
+        session_id: str,
+        user_message: str,
+        first_turn: bool = False,
+        cancel_token: Optional[CancelToken] = None
+    ) -> Dict:
+        """
+        Run one interviewer turn: call the LLM and parse its tags.
+
+        With the question bank enabled, the next question comes from the bank and
+        the LLM only writes the spoken transition and decides whether to move on
+        or ask a follow-up.
+
+        Args:
+            session_id: Session ID
+            user_message: Candidate message (or the opening request)
+            first_turn: Whether this is the interview opening
+            cancel_token: Aborts the LLM call when the turn is cancelled
+
+        Returns:
+            Dict with the context entry ("response"), "falar", "codigo" and "question_id"
+
+        Raises:
+            TurnCancelled: If the turn was cancelled
+        """
+        session = self.sessions[session_id]
+        system_prompt = get_system_prompt(session["profile"], session["stack"])
+        context_messages = [] if first_turn else session["context"].get_messages()
+
+        question = None
+        if self.question_bank:
+            question = self.question_bank.next_question(
+                session["profile"],
+                session["stack"],
+                session["asked_questions"]
+            )
+
+        if question is None:
+            # The opening request is identical for every (profile, stack)
+            response = self.llm_service.generate_response(
+                system_prompt=system_prompt,
+                messages=context_messages,
+                user_message=user_message,
+                use_cache=first_turn,
+                profile=session["profile"],
+                session_id=session_id,
+                cancel_token=cancel_token
+            )
+            parsed = self.llm_service.parse_and_repair(response, self.repair_tags, cancel_token=cancel_token)
+
+            # Bank exhausted: the LLM wrote the question, so the last bank question's
+            # tests no longer apply to the next code answer
+            check(cancel_token)
+            session["current_question"] = None
+            return {
+                "response": response,
+                "falar": parsed.get("falar"),
+                "codigo": parsed.get("codigo"),
+                "question_id": None
+            }
+
+        current = self.question_bank.get(session["current_question"]) if session.get("current_question") else None
+        response = self.llm_service.generate_response(
+            system_prompt=system_prompt,
+            messages=context_messages,
+            user_message=user_message + build_turn_instructions(question, first_turn, current),
+            use_cache=first_turn,
+            max_tokens=self.bank_config.get("turn_max_tokens", 250),
+            profile=session["profile"],
+            session_id=session_id,
+            cancel_token=cancel_token
+        )
+        parsed = self.llm_service.parse_and_repair(
+            response, self.repair_tags, tags=BANK_TURN_TAGS, cancel_token=cancel_token
+        )
+        falar_content = parsed.get("falar")
+
+        # An abandoned turn must not advance the session's question
+        check(cancel_token)
+
+        if first_turn or current is None or parsed.get("acao").lower() != "aprofundar":
+            session["asked_questions"].append(question.id)
+            session["current_question"] = question.id
+            # Keep only a short reference to the displayed question in the context
+            return {
+                "response": f"<falar>{falar_content}</falar>\n<codigo>[{question.id}] {question.title}</codigo>",
+                "falar": falar_content,
+                "codigo": question.to_markdown(),
+                "question_id": question.id
+            }
+
+        # Follow-up: re-send the current question so it is shown with the follow-up
+        return {
+            "response": f"<falar>{falar_content}</falar>",
+            "falar": falar_content,
+            "codigo": current.to_markdown(),
+            "question_id": current.id
+        }
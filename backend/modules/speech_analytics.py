@@ -0,0 +1,154 @@
+"""
+Speech analytics from Whisper word timestamps.
+Speaking rate, pause distribution and filler-word density per answer,
+computed with vectorized NumPy operations over the words of one decode pass.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Hesitation sounds and fillers as Whisper transcribes them in Portuguese.
+# Words that are also ordinary speech only count in the phrases below, if at
+# all: "um" (article), "é"/"eh" (verb), "ah" ("ah, entendi"), "tipo", "então".
+DEFAULT_FILLER_WORDS = ("ahn", "ãh", "éh", "hum", "hmm", "hm", "uh", "uhm", "né")
+DEFAULT_FILLER_PHRASES = ("tipo assim", "quer dizer", "é é")
+
+# Upper edges (seconds) of the pause histogram buckets; the last bucket is open
+PAUSE_BUCKETS = (0.5, 1.0, 2.0)
+
+_PUNCTUATION = re.compile(r"[^\w]+")
+
+
+def normalize_word(word: str) -> str:
+    """Lowercase a Whisper word and strip surrounding punctuation and spaces."""
+    return _PUNCTUATION.sub("", word.lower())
+
+
+def analyze_words(
+    words: List[Dict],
+    filler_words: Iterable[str] = DEFAULT_FILLER_WORDS,
+    filler_phrases: Iterable[str] = DEFAULT_FILLER_PHRASES,
+    pause_threshold: float = 0.25,
+    long_pause: float = 1.0
+) -> Optional[Dict]:
+    """
+    Compute speech metrics for one answer.
+
+    Args:
+        words: Word timings ({"word", "start", "end"}) in seconds
+        filler_words: Single-word fillers
+        filler_phrases: Multi-word fillers (matched on consecutive words)
+        pause_threshold: Minimum gap between words counted as a pause
+        long_pause: Minimum gap counted as a long pause
+
+    Returns:
+        Metrics dict, or None when there are no words
+    """
+    if not words:
+        return None
+
+    starts = np.fromiter((w["start"] for w in words), dtype=np.float64, count=len(words))
+    ends = np.fromiter((w["end"] for w in words), dtype=np.float64, count=len(words))
+    tokens = np.array([normalize_word(w["word"]) for w in words])
+    count = len(words)
+
+    span = max(float(ends[-1] - starts[0]), 1e-6)
+    gaps = np.clip(starts[1:] - ends[:-1], 0.0, None)
+    pauses = gaps[gaps >= pause_threshold]
+    speaking_time = max(span - float(pauses.sum()), 1e-6)
+
+    # Fillers: single words by set membership, phrases by comparing shifted token arrays
+    filler_mask = np.isin(tokens, [normalize_word(w) for w in filler_words])
+    phrase_count = 0
+    for phrase in filler_phrases:
+        parts = [normalize_word(p) for p in phrase.split()]
+        if len(parts) > count:
+            continue
+        match = np.ones(count - len(parts) + 1, dtype=bool)
+        for offset, part in enumerate(parts):
+            match &= tokens[offset:count - len(parts) + 1 + offset] == part
+        phrase_count += int(match.sum())
+    filler_count = int(filler_mask.sum()) + phrase_count
+
+    # Edges must increase: buckets at or below the pause threshold are dropped
+    edges = [pause_threshold] + [edge for edge in PAUSE_BUCKETS if edge > pause_threshold]
+    histogram, _ = np.histogram(pauses, bins=(*edges, np.inf))
+    labels = [f"<{edge:g}s" for edge in edges[1:]] + [f">={edges[-1]:g}s"]
+
+    return {
+        "words": count,
+        "duration": round(span, 2),
+        "start_delay": round(float(starts[0]), 2),
+        "words_per_minute": round(count / span * 60, 1),
+        "articulation_rate": round(count / speaking_time * 60, 1),
+        "pauses": {
+            "count": int(pauses.size),
+            "total": round(float(pauses.sum()), 2),
+            "mean": round(float(pauses.mean()), 2) if pauses.size else 0.0,
+            "median": round(float(np.median(pauses)), 2) if pauses.size else 0.0,
+            "p90": round(float(np.percentile(pauses, 90)), 2) if pauses.size else 0.0,
+            "max": round(float(pauses.max()), 2) if pauses.size else 0.0,
+            "long": int((pauses >= long_pause).sum()),
+            "ratio": round(float(pauses.sum()) / span, 3),
+            "histogram": dict(zip(labels, histogram.tolist()))
+        },
+        "fillers": {
+            "count": filler_count,
+            "per_100_words": round(filler_count / count * 100, 1),
+            "top": _top_fillers(tokens[filler_mask])
+        }
+    }
+
+
+def _top_fillers(fillers: np.ndarray, limit: int = 3) -> Dict[str, int]:
+    if not fillers.size:
+        return {}
+    values, counts = np.unique(fillers, return_counts=True)
+    order = np.argsort(-counts)[:limit]
+    return {str(values[i]): int(counts[i]) for i in order}
+
+
+def summarize(answers: List[Dict]) -> Optional[Dict]:
+    """
+    Aggregate per-answer metrics over an interview, weighting by words spoken.
+
+    Returns:
+        Summary dict, or None when no answer has metrics
+    """
+    answers = [a for a in answers if a]
+    if not answers:
+        return None
+
+    words = np.array([a["words"] for a in answers], dtype=np.float64)
+    durations = np.array([a["duration"] for a in answers], dtype=np.float64)
+    pause_totals = np.array([a["pauses"]["total"] for a in answers], dtype=np.float64)
+    fillers = np.array([a["fillers"]["count"] for a in answers], dtype=np.float64)
+    start_delays = np.array([a["start_delay"] for a in answers], dtype=np.float64)
+
+    return {
+        "answers": len(answers),
+        "words": int(words.sum()),
+        "words_per_minute": round(float(words.sum() / max(durations.sum(), 1e-6) * 60), 1),
+        "words_per_minute_range": [round(float(np.min(words / np.maximum(durations, 1e-6) * 60)), 1),
+                                   round(float(np.max(words / np.maximum(durations, 1e-6) * 60)), 1)],
+        "pause_ratio": round(float(pause_totals.sum() / max(durations.sum(), 1e-6)), 3),
+        "long_pauses": int(sum(a["pauses"]["long"] for a in answers)),
+        "max_pause": round(max(a["pauses"]["max"] for a in answers), 2),
+        "fillers_per_100_words": round(float(fillers.sum() / max(words.sum(), 1) * 100), 1),
+        "mean_start_delay": round(float(start_delays.mean()), 2)
+    }
+
+
+def format_for_prompt(summary: Dict) -> str:
+    """Render an interview summary as short text for the evaluation prompt."""
+    low, high = summary["words_per_minute_range"]
+    return (
+        f"- Respostas faladas analisadas: {summary['answers']} ({summary['words']} palavras)\n"
+        f"- Ritmo médio: {summary['words_per_minute']} palavras/min (entre {low} e {high})\n"
+        f"- Tempo em pausas: {summary['pause_ratio'] * 100:.0f}% da fala; "
+        f"{summary['long_pauses']} pausas longas (maior: {summary['max_pause']}s)\n"
+        f"- Vícios de linguagem: {summary['fillers_per_100_words']} a cada 100 palavras\n"
+        f"- Tempo médio até começar a responder: {summary['mean_start_delay']}s"
+    )
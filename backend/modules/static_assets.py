@@ -0,0 +1,190 @@
+"""
+Same-origin serving of the frontend.
+Assets are loaded once at startup, renamed with a content hash (index.html is
+rewritten to reference the hashed names), precompressed with gzip (and brotli
+when installed) and served with strong ETags and immutable cache headers.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional
+import logging
+
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import get_route_path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+MIN_COMPRESS_SIZE = 512
+
+_REFERENCE = re.compile(r'((?:href|src)=")([^":#?]+)(")')
+
+
+@dataclass
+class Asset:
+    content: bytes
+    media_type: str
+    etag: str
+    cache_control: str
+    # Encoding name ("br", "gzip") to compressed body
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+
+
+def hashed_name(path: str, content: bytes) -> str:
+    """Insert a short content hash before the extension: js/app.js -> js/app.1a2b3c4d5e.js"""
+    digest = hashlib.sha256(content).hexdigest()[:10]
+    stem, dot, suffix = path.rpartition(".")
+    return f"{stem}.{digest}.{suffix}" if dot else f"{path}.{digest}"
+
+
+def _accepted_encodings(header: str) -> Dict[str, float]:
+    encodings = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            encodings[name.lower()] = quality
+    return encodings
+
+
+class StaticBundle:
+    def __init__(
+        self,
+        directory: str,
+        index: str = "index.html",
+        api_base: Optional[str] = "",
+        use_brotli: bool = True
+    ):
+        """
+        Load, fingerprint and precompress every file of the frontend directory.
+
+        Args:
+            directory: Frontend directory (contains index.html, css/, js/)
+            index: Entry page, served at the mount root
+            api_base: Value injected as window.API_BASE in the entry page
+                      ("" for same-origin requests, None to leave unset)
+            use_brotli: Also build brotli variants when the brotli package is installed
+        """
+        self.directory = Path(directory)
+        self.index = index
+        self.use_brotli = use_brotli and brotli is not None
+        self.assets: Dict[str, Asset] = {}
+
+        # Fingerprint static assets first so the pages can reference them
+        hashed: Dict[str, str] = {}
+        pages = []
+        for file in sorted(self.directory.rglob("*")):
+            if not file.is_file():
+                continue
+            path = file.relative_to(self.directory).as_posix()
+            content = file.read_bytes()
+            if path.endswith(".html"):
+                pages.append((path, content))
+                continue
+            hashed[path] = hashed_name(path, content)
+            self._add(hashed[path], content, IMMUTABLE)
+            # Original names keep working but must be revalidated
+            self._add(path, content, REVALIDATE)
+
+        for path, content in pages:
+            self._add(path, self._rewrite_page(content.decode("utf-8"), hashed, api_base), REVALIDATE)
+
+        logger.info(f"Frontend bundle ready: {len(hashed)} assets, {len(pages)} pages"
+                    + (" (gzip+br)" if self.use_brotli else " (gzip)"))
+
+    def _rewrite_page(self, html: str, hashed: Dict[str, str], api_base: Optional[str]) -> bytes:
+        html = _REFERENCE.sub(
+            lambda m: m.group(1) + hashed.get(m.group(2), m.group(2)) + m.group(3),
+            html
+        )
+        if api_base is not None:
+            # Must run before app.js reads it
+            html = html.replace(
+                "<script",
+                f'<script>window.API_BASE = "{api_base}";</script>\n    <script',
+                1
+            )
+        return html.encode("utf-8")
+
+    def _add(self, path: str, content: bytes, cache_control: str):
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if media_type == "application/javascript":
+            # Starlette only adds the charset to text/* types
+            media_type += "; charset=utf-8"
+
+        asset = Asset(
+            content=content,
+            media_type=media_type,
+            etag=hashlib.sha256(content).hexdigest()[:16],
+            cache_control=cache_control
+        )
+
+        if media_type.startswith(COMPRESSIBLE_TYPES) and len(content) >= MIN_COMPRESS_SIZE:
+            # mtime=0 keeps the gzip output (and its ETag) deterministic
+            asset.encoded["gzip"] = gzip.compress(content, compresslevel=9, mtime=0)
+            if self.use_brotli:
+                asset.encoded["br"] = brotli.compress(content, quality=11)
+
+        self.assets[path] = asset
+
+    def _choose_encoding(self, asset: Asset, accept_encoding: str) -> Optional[str]:
+        if not asset.encoded:
+            return None
+        accepted = _accepted_encodings(accept_encoding)
+        for encoding in ("br", "gzip"):
+            if encoding in asset.encoded and accepted.get(encoding, 0) > 0:
+                return encoding
+        return None
+
+    def response(self, path: str, request: Request) -> Response:
+        """Build the response for a path relative to the mount point."""
+        asset = self.assets.get(path.lstrip("/") or self.index)
+        if asset is None:
+            return PlainTextResponse("Not Found", status_code=404)
+
+        encoding = self._choose_encoding(asset, request.headers.get("accept-encoding", ""))
+        etag = f'"{asset.etag}-{encoding}"' if encoding else f'"{asset.etag}"'
+        headers = {"ETag": etag, "Cache-Control": asset.cache_control, "Vary": "Accept-Encoding"}
+
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=headers)
+
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            body = asset.encoded[encoding]
+        else:
+            body = asset.content
+
+        if request.method == "HEAD":
+            headers["Content-Length"] = str(len(body))
+            return Response(status_code=200, headers=headers, media_type=asset.media_type)
+        return Response(body, headers=headers, media_type=asset.media_type)
+
+    async def __call__(self, scope, receive, send):
+        """ASGI entry point, so the bundle can be mounted with app.mount()."""
+        request = Request(scope, receive)
+        if request.method not in ("GET", "HEAD"):
+            response = PlainTextResponse("Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"})
+        else:
+            response = self.response(get_route_path(scope), request)
+        await response(scope, receive, send)
@@ -3,10 +3,12 @@ Speech-to-Text using Fast Whisper with CUDA support.
 """
 
 import os
-from faster_whisper import WhisperModel
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, Optional
 import logging
 
+if TYPE_CHECKING:
+    from faster_whisper import WhisperModel
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,13 +25,16 @@ class STTService:
         self.model_size = model_size
         self.device = device
         self.compute_type = compute_type
-        self.model: Optional[WhisperModel] = None
+        self.model: Optional["WhisperModel"] = None
         
         logger.info(f"Initializing Whisper model: {model_size} on {device}")
     
     def load_model(self):
         """Load the Whisper model (lazy loading)."""
         if self.model is None:
+            # Imported here: faster-whisper pulls in ctranslate2 and takes seconds to import
+            from faster_whisper import WhisperModel
+            
             try:
                 self.model = WhisperModel(
                     self.model_size,
@@ -50,6 +55,19 @@ class STTService:
                         compute_type=self.compute_type
                     )
     
+    def _decode(self, audio_path: str, language: str, word_timestamps: bool = False):
+        """Run one Whisper decode pass; segments are materialized so they can be reused."""
+        self.load_model()
+        segments, info = self.model.transcribe(
+            audio_path,
+            language=language,
+            beam_size=5,
+            vad_filter=True,
+            vad_parameters=dict(min_silence_duration_ms=500),
+            word_timestamps=word_timestamps
+        )
+        return list(segments), info
+    
     def transcribe(self, audio_path: str, language: str = "pt") -> str:
         """
         Transcribe audio file to text.
@@ -61,16 +79,8 @@ class STTService:
         Returns:
             Transcribed text
         """
-        self.load_model()
-        
         try:
-            segments, info = self.model.transcribe(
-                audio_path,
-                language=language,
-                beam_size=5,
-                vad_filter=True,
-                vad_parameters=dict(min_silence_duration_ms=500)
-            )
+            segments, info = self._decode(audio_path, language)
             
             # Combine all segments
             transcription = " ".join([segment.text for segment in segments])
@@ -84,35 +94,47 @@ class STTService:
             logger.error(f"Error transcribing audio: {e}")
             raise
     
-    def transcribe_with_timestamps(self, audio_path: str, language: str = "pt") -> list:
+    def transcribe_with_timestamps(self, audio_path: str, language: str = "pt") -> Dict:
         """
-        Transcribe audio with word-level timestamps.
+        Transcribe audio with word-level timestamps, in the same decode pass.
+        
+        Uses the same decoding settings as transcribe(), so the text is the
+        same and no second model run is needed for timing data.
         
         Args:
             audio_path: Path to audio file
             language: Language code
         
         Returns:
-            List of segments with timestamps
+            Dict with "text", "duration", "segments" and "words"
+            (each word with "word", "start", "end", "probability")
         """
-        self.load_model()
-        
         try:
-            segments, info = self.model.transcribe(
-                audio_path,
-                language=language,
-                word_timestamps=True
-            )
+            segments, info = self._decode(audio_path, language, word_timestamps=True)
+            
+            words = [
+                {
+                    "word": word.word.strip(),
+                    "start": round(word.start, 3),
+                    "end": round(word.end, 3),
+                    "probability": round(word.probability, 3)
+                }
+                for segment in segments
+                for word in (segment.words or [])
+            ]
+            transcription = " ".join([segment.text for segment in segments]).strip()
             
-            result = []
-            for segment in segments:
-                result.append({
-                    "start": segment.start,
-                    "end": segment.end,
-                    "text": segment.text
-                })
+            logger.info(f"Transcription completed: {len(transcription)} characters, {len(words)} timed words")
             
-            return result
+            return {
+                "text": transcription,
+                "duration": round(info.duration, 3),
+                "segments": [
+                    {"start": segment.start, "end": segment.end, "text": segment.text}
+                    for segment in segments
+                ],
+                "words": words
+            }
         
         except Exception as e:
             logger.error(f"Error transcribing with timestamps: {e}")
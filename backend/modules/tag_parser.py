@@ -0,0 +1,124 @@
+"""
+Single-pass scanner for the tagged LLM output format (<falar>, <codigo>, ...).
+Tolerates malformed responses: unclosed tags, missing opening tags, stray
+closing tags, different casing and whitespace inside the tag.
+"""
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_TAGS = ("falar", "codigo")
+
+
+@lru_cache(maxsize=32)
+def _tag_pattern(tags: Tuple[str, ...]) -> "re.Pattern":
+    names = "|".join(re.escape(tag) for tag in tags)
+    return re.compile(rf"<\s*(/?)\s*({names})\s*>", re.IGNORECASE)
+
+
+@dataclass
+class ParsedResponse:
+    sections: Dict[str, str] = field(default_factory=dict)
+    missing: List[str] = field(default_factory=list)
+    untagged: str = ""
+
+    def get(self, tag: str) -> str:
+        return self.sections.get(tag, "")
+
+
+def scan_tags(text: str, tags: Tuple[str, ...] = DEFAULT_TAGS) -> ParsedResponse:
+    """
+    Extract tagged sections from a response in one pass over the text.
+
+    Rules for malformed input:
+    - an opening tag implicitly closes any section still open
+    - tags inside a ``` fenced block of an open section are kept as content
+    - a fence left open at the end of the response is ignored for its section,
+      so it does not swallow the tags after it
+    - a section left open runs until the end of the response
+    - a closing tag without its opening tag takes the text since the previous tag
+    - repeated sections are joined with a blank line
+
+    Args:
+        text: Raw LLM response
+        tags: Tag names to extract
+
+    Returns:
+        ParsedResponse with the sections found, the tags missing and any
+        text outside of all tags
+    """
+    parsed, unclosed_at = _scan(text, tags, len(text) + 1)
+    if unclosed_at is not None:
+        # Second pass only for this malformed case: same result up to that section
+        parsed, _ = _scan(text, tags, unclosed_at)
+    return parsed
+
+
+def _scan(text: str, tags: Tuple[str, ...], fences_before: int) -> Tuple[ParsedResponse, Optional[int]]:
+    """
+    Scan pass of scan_tags; fences are honoured in sections opened before fences_before.
+
+    Returns:
+        Tuple of (parsed response, opening offset of the last section when
+        the response ends inside one of its fences, else None)
+    """
+    parts: Dict[str, List[str]] = {}
+    untagged: List[str] = []
+    open_tag = None
+    open_at = 0
+    last_end = 0
+    # Fence parity of the open section, counted once per stretch of text
+    has_fences = "```" in text
+    in_fence = False
+    fences_from = 0
+
+    for match in _tag_pattern(tags).finditer(text):
+        closing, name = match.group(1), match.group(2).lower()
+        start, end = match.span()
+
+        if open_tag is not None:
+            if has_fences and open_at < fences_before:
+                if text.count("```", fences_from, start) % 2:
+                    in_fence = not in_fence
+                fences_from = start
+            # Tags quoted inside a fenced code block are content, not markup
+            if in_fence:
+                continue
+            # Close the open section at this tag (properly or implicitly)
+            parts.setdefault(open_tag, []).append(text[open_at:start])
+            open_tag = None
+            if not closing:
+                open_tag, open_at = name, end
+                fences_from = end
+        elif closing:
+            # Closing tag without opening: adopt the text since the previous tag
+            parts.setdefault(name, []).append(text[last_end:start])
+        else:
+            untagged.append(text[last_end:start])
+            open_tag, open_at = name, end
+            fences_from = end
+
+        last_end = end
+
+    unclosed_at = None
+    if open_tag is not None:
+        if in_fence and text.count("```", fences_from) % 2 == 0:
+            unclosed_at = open_at
+        parts.setdefault(open_tag, []).append(text[open_at:])
+    else:
+        untagged.append(text[last_end:])
+
+    sections = {}
+    for name, chunks in parts.items():
+        content = "\n\n".join(chunk.strip() for chunk in chunks if chunk.strip())
+        if content:
+            sections[name] = content
+
+    parsed = ParsedResponse(
+        sections=sections,
+        missing=[tag for tag in tags if tag not in sections],
+        untagged="\n".join(chunk.strip() for chunk in untagged if chunk.strip())
+    )
+    return parsed, unclosed_at
@@ -0,0 +1,43 @@
+"""
+Token counting helpers.
+Uses tiktoken when it is installed and falls back to a character heuristic.
+"""
+
+from functools import lru_cache
+from typing import Dict, List
+
+try:
+    import tiktoken
+except ImportError:  # Optional dependency
+    tiktoken = None
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count (or estimate) the number of tokens in a text.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Token count; roughly 4 characters per token without tiktoken
+    """
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return max(1, (len(text) + 3) // 4) if text else 0
+
+
+def count_message_tokens(messages: List[Dict[str, str]]) -> int:
+    """Count tokens of a chat message list, including per-message overhead."""
+    return sum(count_tokens(m["content"]) + 4 for m in messages) + 2
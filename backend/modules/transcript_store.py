@@ -0,0 +1,273 @@
+"""
+Persistent transcript archive backed by SQLite (WAL mode).
+Turns are queued in memory and written in batches by a background thread,
+so recording a message never blocks the request path.
+"""
+
+import json
+import queue
+import sqlite3
+import threading
+import logging
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT UNIQUE NOT NULL,
+    profile TEXT,
+    stack TEXT,
+    created_at TEXT,
+    closed_at TEXT
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    timestamp TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_messages_session ON messages(session_id, id);
+"""
+
+_STOP = object()
+
+
+class TranscriptStore:
+    def __init__(
+        self,
+        db_path: str,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_queue: int = 10000
+    ):
+        """
+        Initialize the transcript archive and start the writer thread.
+
+        Args:
+            db_path: Path to the SQLite database file
+            batch_size: Maximum number of records written per transaction
+            flush_interval: Seconds to wait for more records before flushing
+            max_queue: Maximum pending records before new ones are dropped
+        """
+        self.db_path = str(db_path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+        self._writer = threading.Thread(
+            target=self._run_writer,
+            name="transcript-writer",
+            daemon=True
+        )
+        self._writer.start()
+
+        logger.info(f"Transcript store initialized at: {self.db_path}")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection configured for WAL and concurrent readers."""
+        # Several worker processes may share the archive; wait on their locks
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # ---------- write path (non-blocking) ----------
+
+    def _enqueue(self, record: tuple):
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            logger.warning(f"Transcript queue full, dropped record ({self.dropped} total)")
+
+    def record_session(self, session_id: str, profile: str, stack: str, created_at: str):
+        """Queue the creation of a session."""
+        self._enqueue(("session", session_id, profile, stack, created_at))
+
+    def record_message(self, session_id: str, message: Dict):
+        """Queue one transcript message (same dict stored in session["messages"])."""
+        self._enqueue((
+            "message",
+            session_id,
+            message.get("role", ""),
+            json.dumps(message, ensure_ascii=False),
+            message.get("timestamp")
+        ))
+
+    def close_session(self, session_id: str, closed_at: str):
+        """Queue the closing timestamp of a session."""
+        self._enqueue(("close", session_id, closed_at))
+
+    def _run_writer(self):
+        conn = self._connect()
+        stopping = False
+
+        while not stopping:
+            batch = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            if item is _STOP:
+                stopping = True
+            else:
+                batch.append(item)
+
+            # Drain whatever else is already waiting, up to batch_size
+            while not stopping and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+
+            if batch:
+                self._write_batch(conn, batch)
+
+        conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: list):
+        try:
+            with conn:
+                for record in batch:
+                    kind = record[0]
+                    if kind == "session":
+                        conn.execute(
+                            "INSERT OR IGNORE INTO sessions (session_id, profile, stack, created_at) "
+                            "VALUES (?, ?, ?, ?)",
+                            record[1:]
+                        )
+                    elif kind == "message":
+                        conn.execute(
+                            "INSERT INTO messages (session_id, role, payload, timestamp) "
+                            "VALUES (?, ?, ?, ?)",
+                            record[1:]
+                        )
+                    elif kind == "close":
+                        conn.execute(
+                            "UPDATE sessions SET closed_at = ? WHERE session_id = ?",
+                            (record[2], record[1])
+                        )
+            logger.debug(f"Flushed {len(batch)} transcript records")
+        except sqlite3.Error as e:
+            logger.error(f"Error writing transcript batch: {e}")
+
+    def close(self, timeout: float = 10.0):
+        """Flush pending records and stop the writer thread."""
+        self._queue.put(_STOP)
+        self._writer.join(timeout=timeout)
+        logger.info("Transcript store closed")
+
+    # ---------- read path (streaming export) ----------
+
+    def iter_sessions(
+        self,
+        profile: Optional[str] = None,
+        since: Optional[str] = None,
+        page_size: int = 200
+    ) -> Iterator[Dict]:
+        """Stream archived sessions with their messages (see iter_archived_sessions)."""
+        conn = self._connect()
+        try:
+            yield from iter_archived_sessions(conn, profile=profile, since=since, page_size=page_size)
+        finally:
+            conn.close()
+
+    def export_jsonl(self, **kwargs) -> Iterator[str]:
+        """Stream archived sessions as JSON Lines."""
+        for session in self.iter_sessions(**kwargs):
+            yield json.dumps(session, ensure_ascii=False) + "\n"
+
+
+def iter_archived_sessions(
+    conn: sqlite3.Connection,
+    profile: Optional[str] = None,
+    since: Optional[str] = None,
+    page_size: int = 200
+) -> Iterator[Dict]:
+    """
+    Stream archived sessions with their messages, one session at a time.
+
+    Sessions are paged with keyset pagination on the row id, so memory
+    stays bounded by a single page regardless of archive size.
+
+    Args:
+        conn: Connection to the archive
+        profile: Only export sessions for this profile
+        since: Only export sessions created at or after this ISO timestamp
+        page_size: Number of sessions fetched per query
+
+    Yields:
+        Session dicts with a "messages" list
+    """
+    last_id = 0
+    while True:
+        query = (
+            "SELECT id, session_id, profile, stack, created_at, closed_at "
+            "FROM sessions WHERE id > ?"
+        )
+        params: list = [last_id]
+        if profile:
+            query += " AND profile = ?"
+            params.append(profile)
+        if since:
+            query += " AND created_at >= ?"
+            params.append(since)
+        query += " ORDER BY id LIMIT ?"
+        params.append(page_size)
+
+        rows = conn.execute(query, params).fetchall()
+        if not rows:
+            break
+
+        for row_id, session_id, row_profile, stack, created_at, closed_at in rows:
+            messages = [
+                json.loads(payload)
+                for (payload,) in conn.execute(
+                    "SELECT payload FROM messages WHERE session_id = ? ORDER BY id",
+                    (session_id,)
+                )
+            ]
+            yield {
+                "session_id": session_id,
+                "profile": row_profile,
+                "stack": stack,
+                "created_at": created_at,
+                "closed_at": closed_at,
+                "messages": messages
+            }
+            last_id = row_id
+
+
+def read_archive(db_path: str, **kwargs) -> Iterator[Dict]:
+    """
+    Stream the sessions of an archive file for offline tools.
+
+    Opens a read-only connection: no schema changes and no writer thread,
+    so a live server can keep writing to the same file.
+
+    Args:
+        db_path: Path to the SQLite database file
+        **kwargs: Filters of iter_archived_sessions
+
+    Raises:
+        sqlite3.OperationalError: If the file does not exist or is not readable
+    """
+    conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        yield from iter_archived_sessions(conn, **kwargs)
+    finally:
+        conn.close()
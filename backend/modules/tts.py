@@ -1,16 +1,56 @@
 """
-Text-to-Speech using ElevenLabs with new API.
+Text-to-Speech with pluggable backends: ElevenLabs (remote) and Piper (local CPU).
 """
 
+import io
+import multiprocessing
 import os
-from elevenlabs.client import ElevenLabs
-from typing import Optional
+import shutil
+import subprocess
+import threading
+import wave
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Iterator, Optional, Tuple
 import logging
 
+from .cancellation import CancelToken, TurnCancelled, check
+
 logger = logging.getLogger(__name__)
 
+# How often a blocking wait re-checks its cancel token
+CANCEL_POLL_INTERVAL = 0.05
+
+# Default primary syntheses in flight: AnyIO's default threadpool size, so every
+# request thread waiting on a synthesis has a thread running its primary
+DEFAULT_CONCURRENCY = 40
+
+MEDIA_TYPES = {
+    "mp3": "audio/mpeg",
+    "wav": "audio/wav",
+    "opus": "audio/ogg",
+}
+
+
+class TTSBackend:
+    """Interface of a speech synthesis backend."""
+
+    name = "base"
+    media_type = "application/octet-stream"
+
+    def synthesize(self, text: str) -> bytes:
+        """Synthesize text and return the complete audio."""
+        raise NotImplementedError
+
+    def synthesize_stream(self, text: str, cancel_token: Optional[CancelToken] = None) -> Iterator[bytes]:
+        """Synthesize text and yield audio chunks as they are produced, stopping on cancellation."""
+        check(cancel_token)
+        yield self.synthesize(text)
+
+
+class ElevenLabsBackend(TTSBackend):
+    name = "elevenlabs"
+    media_type = MEDIA_TYPES["mp3"]
 
-class TTSService:
     def __init__(
         self,
         api_key: str,
@@ -22,8 +62,8 @@ class TTSService:
         use_speaker_boost: bool = True
     ):
         """
-        Initialize ElevenLabs TTS service with new API.
-        
+        Initialize ElevenLabs TTS backend with new API.
+
         Args:
             api_key: ElevenLabs API key
             voice_id: Voice ID to use
@@ -33,7 +73,8 @@ class TTSService:
             style: Style exaggeration (0.0-1.0)
             use_speaker_boost: Enable speaker boost
         """
-        self.client = ElevenLabs(api_key=api_key)
+        self.api_key = api_key
+        self._client = None
         self.voice_id = voice_id
         self.model_id = model_id
         self.voice_settings = {
@@ -42,69 +83,389 @@ class TTSService:
             "style": style,
             "use_speaker_boost": use_speaker_boost
         }
-        
-        logger.info(f"TTS service initialized with voice: {voice_id}")
-    
+
+        logger.info(f"ElevenLabs backend initialized with voice: {voice_id}")
+
+    @property
+    def client(self):
+        """ElevenLabs client, created (and the SDK imported) on first use."""
+        if self._client is None:
+            from elevenlabs.client import ElevenLabs
+
+            self._client = ElevenLabs(api_key=self.api_key)
+        return self._client
+
+    def synthesize_stream(self, text: str, cancel_token: Optional[CancelToken] = None) -> Iterator[bytes]:
+        check(cancel_token)
+        audio_stream = self.client.text_to_speech.convert(
+            text=text,
+            voice_id=self.voice_id,
+            model_id=self.model_id,
+            voice_settings=self.voice_settings
+        )
+        close = getattr(audio_stream, "close", None)
+        # Closing the stream on cancellation also unblocks a read waiting on the network
+        unregister = cancel_token.on_cancel(close) if cancel_token and close else (lambda: None)
+        try:
+            for chunk in audio_stream:
+                check(cancel_token)
+                yield chunk
+        finally:
+            unregister()
+            # Drops the HTTP download when the turn is cancelled
+            if close:
+                close()
+
+    def synthesize(self, text: str) -> bytes:
+        return b''.join(self.synthesize_stream(text))
+
+
+# ---------- Piper worker process ----------
+
+_piper_voice = None
+_piper_cancel_flags = None
+
+
+def _piper_worker_init(model_path: str, config_path: Optional[str], cancel_flags=None):
+    """Load the voice once per worker process."""
+    global _piper_voice, _piper_cancel_flags
+    from piper.voice import PiperVoice
+
+    _piper_voice = PiperVoice.load(model_path, config_path=config_path)
+    _piper_cancel_flags = cancel_flags
+
+
+def _piper_worker_synthesize(text: str, length_scale: float, slot: int = -1) -> Tuple[bytes, int]:
+    """
+    Synthesize raw 16-bit mono PCM in a worker process.
+
+    Piper yields one chunk per sentence; the job stops at the next sentence
+    once its cancel slot is set, so a cancelled job frees the worker early.
+    """
+    chunks = []
+    for chunk in _piper_voice.synthesize_stream_raw(text, length_scale=length_scale):
+        if slot >= 0 and _piper_cancel_flags[slot]:
+            break
+        chunks.append(chunk)
+    return b''.join(chunks), _piper_voice.config.sample_rate
+
+
+def pcm_to_wav(pcm: bytes, sample_rate: int) -> bytes:
+    """Wrap raw 16-bit mono PCM in a WAV container."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def pcm_to_opus(pcm: bytes, sample_rate: int, bitrate: str = "32k") -> bytes:
+    """Encode raw 16-bit mono PCM to Ogg/Opus with ffmpeg."""
+    result = subprocess.run(
+        [
+            "ffmpeg", "-loglevel", "error",
+            "-f", "s16le", "-ar", str(sample_rate), "-ac", "1", "-i", "pipe:0",
+            "-c:a", "libopus", "-b:a", bitrate, "-f", "ogg", "pipe:1"
+        ],
+        input=pcm,
+        capture_output=True,
+        check=True
+    )
+    return result.stdout
+
+
+class PiperBackend(TTSBackend):
+    name = "piper"
+
+    def __init__(
+        self,
+        model_path: str,
+        config_path: Optional[str] = None,
+        workers: int = 2,
+        output_format: str = "wav",
+        length_scale: float = 1.0
+    ):
+        """
+        Initialize the local Piper (ONNX) TTS backend.
+
+        A pool of worker processes is spawned and warmed up here, each with
+        the voice already loaded, so requests never pay the model load.
+
+        Args:
+            model_path: Path to the .onnx voice model
+            config_path: Path to the voice .onnx.json (defaults next to the model)
+            workers: Number of synthesis worker processes
+            output_format: "pcm" (raw 16-bit mono), "wav" or "opus"
+            length_scale: Speech speed (lower is faster)
+        """
+        if output_format not in ("pcm", "wav", "opus"):
+            raise ValueError(f"Unsupported Piper output format: {output_format}")
+        if output_format == "opus" and not shutil.which("ffmpeg"):
+            raise RuntimeError("Opus output requires ffmpeg on PATH")
+
+        self.model_path = model_path
+        self.output_format = output_format
+        self.length_scale = length_scale
+        self.sample_rate: Optional[int] = None
+
+        # Shared cancel flags, one per in-flight job (jobs beyond the slots cannot be stopped early)
+        self._cancel_flags = multiprocessing.Array("b", workers * 4, lock=False)
+        self._free_slots = list(range(workers * 4))
+        self._slots_lock = threading.Lock()
+
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_piper_worker_init,
+            initargs=(model_path, config_path, self._cancel_flags)
+        )
+
+        # Warm up: start every worker and load the voice before the first request
+        warmups = [self.pool.submit(_piper_worker_synthesize, "Olá.", length_scale) for _ in range(workers)]
+        for future in warmups:
+            _, self.sample_rate = future.result()
+
+        if output_format == "pcm":
+            self.media_type = f"audio/L16;rate={self.sample_rate};channels=1"
+        else:
+            self.media_type = MEDIA_TYPES[output_format]
+
+        logger.info(f"Piper backend ready: {os.path.basename(model_path)} ({workers} workers, {output_format})")
+
+    def synthesize(self, text: str) -> bytes:
+        pcm, sample_rate = self.pool.submit(_piper_worker_synthesize, text, self.length_scale).result()
+        return self._encode(pcm, sample_rate)
+
+    def synthesize_stream(self, text: str, cancel_token: Optional[CancelToken] = None) -> Iterator[bytes]:
+        if cancel_token is None:
+            yield self.synthesize(text)
+            return
+
+        check(cancel_token)
+        slot = self._acquire_slot()
+        future = self.pool.submit(_piper_worker_synthesize, text, self.length_scale, slot)
+        future.add_done_callback(lambda _: self._release_slot(slot))
+        while True:
+            try:
+                pcm, sample_rate = future.result(timeout=CANCEL_POLL_INTERVAL)
+                break
+            except FutureTimeoutError:
+                if cancel_token.cancelled:
+                    # Drops the job if it has not started, otherwise stops it at the next sentence
+                    if not future.cancel() and slot >= 0:
+                        self._cancel_flags[slot] = 1
+                    cancel_token.raise_if_cancelled()
+        yield self._encode(pcm, sample_rate)
+
+    def _acquire_slot(self) -> int:
+        with self._slots_lock:
+            return self._free_slots.pop() if self._free_slots else -1
+
+    def _release_slot(self, slot: int):
+        if slot < 0:
+            return
+        with self._slots_lock:
+            self._cancel_flags[slot] = 0
+            self._free_slots.append(slot)
+
+    def _encode(self, pcm: bytes, sample_rate: int) -> bytes:
+        if self.output_format == "wav":
+            return pcm_to_wav(pcm, sample_rate)
+        if self.output_format == "opus":
+            return pcm_to_opus(pcm, sample_rate)
+        return pcm
+
+    def close(self):
+        """Stop the worker processes."""
+        self.pool.shutdown(cancel_futures=True)
+
+
+def build_tts_backends(tts_config: Dict, elevenlabs_key: str, voice_id: str) -> Dict[str, TTSBackend]:
+    """
+    Create the TTS backends described in config.json["tts"].
+
+    ElevenLabs uses the top-level voice settings; Piper is created when a
+    "piper" section is present and is used as primary or fallback backend.
+
+    Args:
+        tts_config: The "tts" section of config.json
+        elevenlabs_key: ElevenLabs API key
+        voice_id: ElevenLabs voice ID
+
+    Returns:
+        Dict of backend name to backend
+    """
+    needed = {tts_config.get("backend", "elevenlabs"), tts_config.get("fallback_backend")}
+    backends: Dict[str, TTSBackend] = {}
+
+    if "elevenlabs" in needed:
+        backends["elevenlabs"] = ElevenLabsBackend(
+            api_key=elevenlabs_key,
+            voice_id=voice_id,
+            model_id=tts_config["model_id"],
+            stability=tts_config["stability"],
+            similarity_boost=tts_config["similarity_boost"],
+            style=tts_config["style"],
+            use_speaker_boost=tts_config["use_speaker_boost"]
+        )
+
+    if "piper" in needed:
+        piper_config = tts_config.get("piper", {})
+        backends["piper"] = PiperBackend(
+            model_path=piper_config["model_path"],
+            config_path=piper_config.get("config_path"),
+            workers=piper_config.get("workers", 2),
+            output_format=piper_config.get("output_format", "wav"),
+            length_scale=piper_config.get("length_scale", 1.0)
+        )
+
+    return backends
+
+
+class TTSService:
+    def __init__(
+        self,
+        backends: Dict[str, TTSBackend],
+        backend: str = "elevenlabs",
+        fallback_backend: Optional[str] = None,
+        fallback_timeout: float = 3.0,
+        concurrency: int = 0
+    ):
+        """
+        Initialize TTS service.
+
+        Args:
+            backends: Available backends by name
+            backend: Primary backend name
+            fallback_backend: Backend used when the primary fails or is slow
+            fallback_timeout: Seconds to wait for the primary before falling back
+            concurrency: Primary syntheses run at once when a fallback is set
+                (0 = DEFAULT_CONCURRENCY). Time queued behind them counts toward
+                fallback_timeout, so a small pool sends bursts to the fallback.
+        """
+        self.backends = backends
+        self.primary = backends[backend]
+        self.fallback = backends.get(fallback_backend) if fallback_backend else None
+        self.fallback_timeout = fallback_timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency or DEFAULT_CONCURRENCY,
+            thread_name_prefix="tts"
+        ) if self.fallback else None
+
+        logger.info(f"TTS service initialized with backend: {backend}"
+                    + (f" (fallback: {fallback_backend})" if self.fallback else ""))
+
+    def _collect(self, backend: TTSBackend, text: str, cancel_token: Optional[CancelToken]) -> bytes:
+        """Synthesize with a backend, consuming its stream so cancellation can stop it."""
+        if cancel_token is None:
+            return backend.synthesize(text)
+
+        stream = backend.synthesize_stream(text, cancel_token=cancel_token)
+        chunks = []
+        try:
+            for chunk in stream:
+                cancel_token.raise_if_cancelled()
+                chunks.append(chunk)
+        finally:
+            stream.close()
+        return b''.join(chunks)
+
+    def synthesize_audio(self, text: str, cancel_token: Optional[CancelToken] = None) -> Tuple[bytes, str]:
+        """
+        Synthesize text, falling back to the secondary backend when needed.
+
+        Args:
+            text: Text to synthesize
+            cancel_token: Aborts synthesis when the turn is cancelled
+
+        Returns:
+            Tuple of (audio_bytes, media_type)
+
+        Raises:
+            TurnCancelled: If the token was cancelled
+        """
+        logger.info(f"Synthesizing text: {text[:50]}...")
+
+        if not self.fallback:
+            return self._collect(self.primary, text, cancel_token), self.primary.media_type
+
+        # The primary gets its own token, so it can be stopped when we fall back
+        primary_token = CancelToken()
+        unlink = cancel_token.on_cancel(lambda: primary_token.cancel(cancel_token.reason)) if cancel_token else (lambda: None)
+        future = self._executor.submit(self._collect, self.primary, text, primary_token)
+        try:
+            return future.result(timeout=self.fallback_timeout), self.primary.media_type
+        except TurnCancelled:
+            raise
+        except FutureTimeoutError:
+            logger.warning(f"{self.primary.name} slower than {self.fallback_timeout}s, using {self.fallback.name}")
+            # Release the primary: drop it if still queued, otherwise stop its stream/worker job
+            future.cancel()
+            primary_token.cancel("fallback")
+        except Exception as e:
+            logger.warning(f"{self.primary.name} failed ({e}), using {self.fallback.name}")
+        finally:
+            unlink()
+
+        check(cancel_token)
+        return self._collect(self.fallback, text, cancel_token), self.fallback.media_type
+
     def synthesize(self, text: str, output_path: Optional[str] = None) -> bytes:
         """
         Synthesize text to speech.
-        
+
         Args:
             text: Text to synthesize
             output_path: Optional path to save audio file
-        
+
         Returns:
             Audio bytes
         """
         try:
-            logger.info(f"Synthesizing text: {text[:50]}...")
-            
-            # Generate audio using new API
-            audio_generator = self.client.text_to_speech.convert(
-                text=text,
-                voice_id=self.voice_id,
-                model_id=self.model_id,
-                voice_settings=self.voice_settings
-            )
-            
-            # Collect all audio chunks
-            audio_bytes = b''.join(audio_generator)
-            
+            audio_bytes, _ = self.synthesize_audio(text)
+
             # Save to file if path provided
             if output_path:
                 with open(output_path, 'wb') as f:
                     f.write(audio_bytes)
                 logger.info(f"Audio saved to: {output_path}")
-            
+
             return audio_bytes
-        
+
         except Exception as e:
             logger.error(f"Error synthesizing speech: {e}")
             raise
-    
-    def synthesize_stream(self, text: str):
+
+    def synthesize_stream(self, text: str, cancel_token: Optional[CancelToken] = None):
         """
         Synthesize text to speech with streaming.
-        
+
         Args:
             text: Text to synthesize
-        
+            cancel_token: Stops the stream when the turn is cancelled
+
         Yields:
             Audio chunks
         """
         try:
             logger.info(f"Streaming synthesis for: {text[:50]}...")
-            
-            audio_stream = self.client.text_to_speech.convert(
-                text=text,
-                voice_id=self.voice_id,
-                model_id=self.model_id,
-                voice_settings=self.voice_settings
-            )
-            
-            for chunk in audio_stream:
+
+            for chunk in self.primary.synthesize_stream(text, cancel_token=cancel_token):
                 yield chunk
-        
+
+        except TurnCancelled:
+            logger.info("Streaming synthesis cancelled")
+            raise
+
         except Exception as e:
             logger.error(f"Error in streaming synthesis: {e}")
             raise
+
+    def close(self):
+        """Release backend worker pools."""
+        for backend in self.backends.values():
+            if hasattr(backend, "close"):
+                backend.close()
+        if self._executor:
+            self._executor.shutdown(wait=False)
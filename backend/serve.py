@@ -0,0 +1,165 @@
+"""
+AI Interviewer - Multi-worker launcher
+Starts N shared-nothing backend workers on local ports and a front router
+that pins each interview session to one of them.
+
+Usage:
+    python serve.py                 # one worker per CPU core
+    python serve.py --workers 4 --port 8000
+
+Rolling restart (e.g. after a deploy): kill -HUP <pid of serve.py>
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import logging
+import urllib.request
+from pathlib import Path
+from typing import List
+
+BACKEND_DIR = Path(__file__).parent
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("serve")
+
+
+def default_worker_count(server_config: dict) -> int:
+    """Use the configured worker count, or one worker per CPU core."""
+    workers = server_config.get("workers", 0)
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def start_worker(index: int, host: str, base_port: int, drain_timeout: float) -> subprocess.Popen:
+    """Spawn the uvicorn process of one worker."""
+    port = base_port + index
+    env = dict(os.environ, ENTREVISTADOR_WORKER_ID=str(index))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "--factory", "main:create_app", "--host", host, "--port", str(port),
+         "--timeout-graceful-shutdown", str(int(drain_timeout))],
+        cwd=BACKEND_DIR,
+        env=env
+    )
+    logger.info(f"Started worker {index} on {host}:{port} (pid {process.pid})")
+    return process
+
+
+def start_workers(count: int, host: str, base_port: int, drain_timeout: float) -> List[subprocess.Popen]:
+    """Spawn one uvicorn process per worker."""
+    return [start_worker(index, host, base_port, drain_timeout) for index in range(count)]
+
+
+def stop_worker(process: subprocess.Popen, drain_timeout: float):
+    """SIGTERM a worker: it finishes running turns and snapshots its sessions before exiting."""
+    process.terminate()
+    try:
+        process.wait(timeout=drain_timeout + 10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def wait_until_ready(urls: List[str], timeout: float):
+    """Block until every worker answers its readiness probe."""
+    deadline = time.monotonic() + timeout
+    pending = list(urls)
+    while pending and time.monotonic() < deadline:
+        for url in list(pending):
+            try:
+                with urllib.request.urlopen(url + "/api/ready", timeout=1):
+                    pending.remove(url)
+            except OSError:
+                pass
+        if pending:
+            time.sleep(0.5)
+    if pending:
+        logger.warning(f"Workers not ready after {timeout}s: {pending}")
+
+
+def rolling_restart(processes: List[subprocess.Popen], urls: List[str], base_port: int,
+                    drain_timeout: float, startup_timeout: float):
+    """
+    Restart workers one at a time (same port and worker ID).
+
+    Each worker drains and snapshots its sessions, and its replacement restores
+    them; meanwhile the router holds that worker's requests until it is back.
+    """
+    for index, url in enumerate(urls):
+        logger.info(f"Restarting worker {index}")
+        stop_worker(processes[index], drain_timeout)
+        processes[index] = start_worker(index, "127.0.0.1", base_port, drain_timeout)
+        wait_until_ready([url], timeout=startup_timeout)
+    logger.info("Rolling restart finished")
+
+
+def main():
+    with open(BACKEND_DIR / "config.json", "r", encoding="utf-8") as f:
+        config = json.load(f)
+    server_config = config.get("server", {})
+    lifecycle_config = config.get("lifecycle", {})
+
+    parser = argparse.ArgumentParser(description="Run the backend with N workers behind a session router")
+    parser.add_argument("--workers", type=int, default=default_worker_count(server_config))
+    parser.add_argument("--host", default=server_config.get("host", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=server_config.get("port", 8000))
+    parser.add_argument("--worker-base-port", type=int, default=server_config.get("worker_base_port", 8101))
+    args = parser.parse_args()
+
+    import uvicorn
+
+    if args.workers <= 1:
+        logger.info("Single worker mode")
+        uvicorn.run("main:create_app", factory=True, host=args.host, port=args.port, app_dir=str(BACKEND_DIR),
+                    timeout_graceful_shutdown=lifecycle_config.get("drain_timeout", 30))
+        return
+
+    from modules.router import create_router_app
+
+    drain_timeout = lifecycle_config.get("drain_timeout", 30)
+    startup_timeout = server_config.get("startup_timeout", 60)
+    processes = start_workers(args.workers, "127.0.0.1", args.worker_base_port, drain_timeout)
+    urls = [f"http://127.0.0.1:{args.worker_base_port + i}" for i in range(args.workers)]
+
+    restart_lock = threading.Lock()
+
+    def on_hangup(signum, frame):
+        # Restart in the background so the router keeps serving
+        def restart():
+            if not restart_lock.acquire(blocking=False):
+                logger.warning("Rolling restart already in progress")
+                return
+            try:
+                rolling_restart(processes, urls, args.worker_base_port, drain_timeout, startup_timeout)
+            finally:
+                restart_lock.release()
+
+        threading.Thread(target=restart, name="rolling-restart", daemon=True).start()
+
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, on_hangup)
+
+    try:
+        wait_until_ready(urls, timeout=startup_timeout)
+        logger.info(f"Router listening on {args.host}:{args.port} for {args.workers} workers")
+        # Hold requests for a restarting worker at least as long as it takes to come back
+        router_app = create_router_app(urls, connect_retry=drain_timeout + startup_timeout)
+        uvicorn.run(router_app, host=args.host, port=args.port)
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=drain_timeout + 10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+if __name__ == "__main__":
+    main()
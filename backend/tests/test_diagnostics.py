@@ -0,0 +1,22 @@
+from modules.diagnostics import session_storage
+
+
+class ChangingSession(dict):
+    """Session dict updated by a turn while it is being measured."""
+
+    def items(self):
+        raise RuntimeError("dictionary changed size during iteration")
+
+
+def test_session_storage_skips_sessions_changed_while_measured():
+    sessions = {
+        "a": {"messages": [{"role": "user", "text": "oi"}]},
+        "b": ChangingSession(messages=[{"role": "assistant", "falar": "olá"}, {"role": "user", "text": "x"}]),
+    }
+
+    storage = session_storage(list(sessions.items()))
+
+    assert storage["sessions"] == 2
+    assert storage["messages"] == 3
+    assert storage["skipped"] == 1
+    assert storage["approx_bytes"] > 0
@@ -0,0 +1,37 @@
+import os
+
+from modules.profiles import ProfileRegistry
+
+PLENO = "name: Pleno\norder: 1\n---\nVocê é um entrevistador pleno de {stack}."
+SENIOR = "name: Sênior\norder: 2\n---\nVocê é um entrevistador sênior."
+
+
+def write(path, text, mtime):
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+def test_reload_keeps_last_good_default_profile(tmp_path):
+    write(tmp_path / "pleno.md", PLENO, 1000)
+    write(tmp_path / "senior.md", SENIOR, 1000)
+    registry = ProfileRegistry(tmp_path, reload_interval=0)
+
+    # Broken, then deleted: unknown names still resolve to the last good default
+    write(tmp_path / "pleno.md", "sem cabeçalho", 2000)
+    assert registry.reload_if_changed()
+    assert registry.get_system_prompt("inexistente", "python") == "Você é um entrevistador pleno de python."
+
+    (tmp_path / "pleno.md").unlink()
+    write(tmp_path / "senior.md", SENIOR + " Atualizado.", 3000)
+    assert registry.reload_if_changed()
+    assert registry.get_profile("pleno")["name"] == "Pleno"
+    assert registry.get_profile("senior")["system_prompt"].endswith("Atualizado.")
+    assert not registry.reload_if_changed()
+
+
+def test_unknown_profile_is_not_reported_as_loaded(tmp_path):
+    write(tmp_path / "pleno.md", PLENO, 1000)
+    registry = ProfileRegistry(tmp_path, reload_interval=0)
+
+    assert registry.has_profile("Pleno")
+    assert not registry.has_profile("inexistente")
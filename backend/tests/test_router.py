@@ -0,0 +1,51 @@
+import json
+
+import httpx
+import pytest
+from starlette.testclient import TestClient
+
+from modules import router
+
+WORKERS = ["http://worker-0", "http://worker-1"]
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Route the router's upstream client to in-memory workers; worker-1 is draining."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        worker = f"{request.url.scheme}://{request.url.host}"
+        calls.append((worker, request.url.path))
+        if request.url.path == "/api/ready":
+            draining = worker == "http://worker-1"
+            return httpx.Response(503 if draining else 200, json={"ready": not draining})
+        # Streamed like a real upstream body, which the router forwards with aiter_raw
+        payload = json.dumps({"worker": worker, "path": request.url.path}).encode()
+        return httpx.Response(200, headers={"content-type": "application/json"}, stream=httpx.ByteStream(payload))
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(router.httpx, "AsyncClient",
+                        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs))
+    return calls
+
+
+def test_requests_can_target_a_worker(upstream):
+    client = TestClient(router.create_router_app(WORKERS))
+
+    for index, worker in enumerate(WORKERS):
+        response = client.get(f"/router/workers/{index}/api/admin/profile", params={"seconds": 1})
+        assert response.json() == {"worker": worker, "path": "/api/admin/profile"}
+
+    assert client.get("/router/workers/2/api/ready").status_code == 404
+
+
+def test_readiness_is_aggregated(upstream):
+    client = TestClient(router.create_router_app(WORKERS))
+
+    response = client.get("/api/ready")
+
+    assert response.status_code == 200
+    assert response.json()["workers_ready"] == 1
+    assert [w["ready"] for w in response.json()["workers"]] == [True, False]
+    assert sorted(worker for worker, path in upstream if path == "/api/ready") == WORKERS
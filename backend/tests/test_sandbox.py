@@ -0,0 +1,44 @@
+import sys
+
+import pytest
+
+from modules.sandbox import CodeSandbox, extract_code, format_result
+
+
+@pytest.mark.parametrize("text", [
+    "console.log(soma(1,2))",
+    "x = [1,2,3]",
+    "sim",
+    "```js\nconsole.log(1)\n```",
+    "```\nx = 1\n```",
+])
+def test_unmarked_code_is_not_run_without_tests(text):
+    assert extract_code(text) is None
+
+
+def test_python_fence_is_run():
+    assert extract_code("Segue:\n```python\nprint(1)\n```") == "print(1)\n"
+
+
+def test_question_with_tests_accepts_plain_python():
+    assert extract_code("def soma(a, b):\n    return a + b", has_tests=True) == "def soma(a, b):\n    return a + b"
+    assert extract_code("```\nx = 1\n```", has_tests=True) == "x = 1\n"
+    assert extract_code("```js\nconsole.log(1)\n```", has_tests=True) is None
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="sandbox workers need Linux")
+def test_sys_exit_is_reported_and_keeps_worker_healthy():
+    try:
+        sandbox = CodeSandbox(workers=1, timeout=5.0)
+    except RuntimeError as e:
+        pytest.skip(f"sandbox unavailable here: {e}")
+    try:
+        result = sandbox.run("import sys\nsys.exit(3)")
+        assert result["status"] == "exit"
+        assert "sys.exit(3)" in format_result(result)
+
+        result = sandbox.run("def f():\n    raise SystemExit\n", [{"call": "f()", "expected": "1"}])
+        assert result["status"] == "ok"
+        assert result["failures"][0]["got"].startswith("SystemExit")
+    finally:
+        sandbox.close()
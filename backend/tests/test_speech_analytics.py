@@ -0,0 +1,44 @@
+import pytest
+
+from modules.speech_analytics import analyze_words
+
+
+def timed_words(gaps):
+    """One 0.2s word, then one more after each gap (seconds)."""
+    words, start = [], 0.0
+    for gap in [0.0] + list(gaps):
+        start += gap
+        words.append({"word": "palavra", "start": start, "end": start + 0.2})
+        start += 0.2
+    return words
+
+
+def test_pause_histogram_default_threshold():
+    pauses = analyze_words(timed_words([0.3, 0.7, 1.5, 3.0]))["pauses"]
+
+    assert pauses["histogram"] == {"<0.5s": 1, "<1s": 1, "<2s": 1, ">=2s": 1}
+
+
+def test_pause_histogram_threshold_above_first_buckets():
+    pauses = analyze_words(timed_words([0.3, 0.7, 1.2, 1.5, 3.0]), pause_threshold=1.0)["pauses"]
+
+    assert pauses["count"] == 3
+    assert pauses["histogram"] == {"<2s": 2, ">=2s": 1}
+    assert sum(pauses["histogram"].values()) == pauses["count"]
+
+
+@pytest.mark.parametrize("threshold", [2.0, 2.5])
+def test_pause_histogram_threshold_above_every_bucket(threshold):
+    pauses = analyze_words(timed_words([1.0, 3.0]), pause_threshold=threshold)["pauses"]
+
+    assert pauses["histogram"] == {f">={threshold:g}s": 1}
+
+
+def test_articles_and_ordinary_words_are_not_fillers():
+    words = [{"word": w, "start": i * 0.3, "end": i * 0.3 + 0.2}
+             for i, w in enumerate("Eh, um sistema usa um banco, ah, e ahn, né".split())]
+
+    fillers = analyze_words(words)["fillers"]
+
+    assert fillers["count"] == 2
+    assert fillers["top"] == {"ahn": 1, "né": 1}
@@ -0,0 +1,40 @@
+from modules.tag_parser import scan_tags
+
+
+def test_tags_quoted_in_fences_are_content():
+    response = (
+        "<falar>Veja.</falar>\n<codigo>```html\n<falar>oi</falar>\n```\n"
+        "e\n```\n<codigo>x</codigo>\n```</codigo>"
+    )
+
+    parsed = scan_tags(response)
+
+    assert parsed.get("falar") == "Veja."
+    assert parsed.get("codigo") == "```html\n<falar>oi</falar>\n```\ne\n```\n<codigo>x</codigo>\n```"
+    assert parsed.missing == []
+
+
+def test_unclosed_fence_does_not_swallow_later_tags():
+    parsed = scan_tags("<codigo>```py\nx = 1</codigo><falar>Certo</falar>")
+
+    assert parsed.get("codigo") == "```py\nx = 1"
+    assert parsed.get("falar") == "Certo"
+    assert parsed.missing == []
+
+
+def test_unclosed_fence_only_affects_its_own_section():
+    parsed = scan_tags(
+        "<codigo>```html\n<falar>oi</falar>\n```</codigo>"
+        "<codigo>```py\nx</codigo><falar>Certo</falar>"
+    )
+
+    assert parsed.get("codigo") == "```html\n<falar>oi</falar>\n```\n\n```py\nx"
+    assert parsed.get("falar") == "Certo"
+
+
+def test_fences_outside_sections_are_ignored():
+    parsed = scan_tags("<codigo>```a```</codigo> ``` <falar>Certo</falar>")
+
+    assert parsed.get("codigo") == "```a```"
+    assert parsed.get("falar") == "Certo"
+    assert parsed.untagged == "```"
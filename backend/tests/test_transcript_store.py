@@ -0,0 +1,22 @@
+import sqlite3
+
+import pytest
+
+from modules.transcript_store import TranscriptStore, read_archive
+
+
+def test_read_archive_is_read_only(tmp_path):
+    db_path = tmp_path / "transcripts.db"
+    store = TranscriptStore(db_path, flush_interval=0.01)
+    store.record_session("s1", "pleno", "backend", "2026-01-01T10:00:00")
+    store.record_session("s2", "senior", "backend", "2026-01-02T10:00:00")
+    store.record_message("s1", {"role": "user", "text": "oi", "timestamp": "2026-01-01T10:01:00"})
+    store.close()
+
+    sessions = list(read_archive(db_path, profile="pleno"))
+
+    assert [s["session_id"] for s in sessions] == ["s1"]
+    assert sessions[0]["messages"][0]["text"] == "oi"
+    with pytest.raises(sqlite3.OperationalError):
+        list(read_archive(tmp_path / "missing.db"))
+    assert not (tmp_path / "missing.db").exists()
@@ -0,0 +1,120 @@
+import threading
+import time
+
+import pytest
+
+from modules.cancellation import CancelToken, TurnCancelled
+from modules.tts import TTSBackend, TTSService
+
+
+class SlowBackend(TTSBackend):
+    """Primary that never finishes on its own and records when it is released."""
+
+    name = "slow"
+    media_type = "audio/mpeg"
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.released = threading.Event()
+
+    def synthesize_stream(self, text, cancel_token=None):
+        self.started.set()
+        try:
+            # Bounded, so an unreleased primary fails the test instead of hanging it
+            cancel_token.wait(3.0)
+            cancel_token.raise_if_cancelled()
+            yield b"primary-audio"
+        finally:
+            self.released.set()
+
+
+class FastBackend(TTSBackend):
+    name = "fast"
+    media_type = "audio/wav"
+
+    def synthesize(self, text):
+        return b"fallback-audio"
+
+
+def make_service(primary):
+    return TTSService({"slow": primary, "fast": FastBackend()}, backend="slow",
+                      fallback_backend="fast", fallback_timeout=0.1)
+
+
+@pytest.mark.parametrize("cancel_token", [None, CancelToken()])
+def test_fallback_releases_primary(cancel_token):
+    primary = SlowBackend()
+    service = make_service(primary)
+    try:
+        audio, media_type = service.synthesize_audio("Olá", cancel_token=cancel_token)
+
+        assert (audio, media_type) == (b"fallback-audio", "audio/wav")
+        assert primary.started.is_set()
+        assert primary.released.wait(1.0), "primary still running after the fallback answered"
+        # The caller's token is not cancelled by the fallback
+        assert cancel_token is None or not cancel_token.cancelled
+    finally:
+        service.close()
+
+
+def test_turn_cancel_reaches_primary():
+    primary = SlowBackend()
+    service = TTSService({"slow": primary, "fast": FastBackend()}, backend="slow",
+                         fallback_backend="fast", fallback_timeout=5.0)
+    token = CancelToken()
+    threading.Timer(0.05, token.cancel, args=("barge-in",)).start()
+    try:
+        started = time.monotonic()
+        with pytest.raises(TurnCancelled):
+            service.synthesize_audio("Olá", cancel_token=token)
+        assert time.monotonic() - started < 1.0
+        assert primary.released.is_set()
+    finally:
+        service.close()
+
+
+def test_piper_job_stops_at_next_sentence_when_cancelled(monkeypatch):
+    from modules import tts
+
+    flags = bytearray(1)
+
+    class Voice:
+        class config:
+            sample_rate = 22050
+
+        def synthesize_stream_raw(self, text, length_scale=1.0):
+            yield b"first"
+            flags[0] = 1  # cancelled after the first sentence
+            yield b"second"
+
+    monkeypatch.setattr(tts, "_piper_voice", Voice())
+    monkeypatch.setattr(tts, "_piper_cancel_flags", flags)
+
+    assert tts._piper_worker_synthesize("Um. Dois.", 1.0, slot=0) == (b"first", 22050)
+    flags[0] = 0
+    assert tts._piper_worker_synthesize("Um. Dois.", 1.0) == (b"firstsecond", 22050)
+
+
+def test_concurrent_requests_do_not_queue_into_the_fallback():
+    class SteadyBackend(TTSBackend):
+        name = "steady"
+        media_type = "audio/mpeg"
+
+        def synthesize(self, text):
+            time.sleep(0.2)
+            return b"primary-audio"
+
+    service = TTSService({"steady": SteadyBackend(), "fast": FastBackend()}, backend="steady",
+                         fallback_backend="fast", fallback_timeout=0.35)
+    results = []
+    try:
+        threads = [threading.Thread(target=lambda: results.append(service.synthesize_audio("Olá")[0]))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        service.close()
+
+    assert results == [b"primary-audio"] * 8
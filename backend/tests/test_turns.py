@@ -0,0 +1,91 @@
+import pytest
+
+from modules.cancellation import CancelToken, TurnCancelled
+from modules.context_manager import ContextManager
+from modules.llm import LLMBackend, LLMService
+from modules.question_bank import Question, QuestionBank
+from modules.services import Services
+
+
+class ScriptedBackend(LLMBackend):
+    """Returns the scripted replies in order; runs a hook before each one."""
+
+    name = "scripted"
+    model = "test"
+
+    def __init__(self, replies, before_reply=None, honour_token=True):
+        self.replies = list(replies)
+        self.before_reply = before_reply or (lambda call: None)
+        self.honour_token = honour_token
+        self.calls = 0
+
+    def complete(self, messages, temperature, max_tokens, session_id=None, cancel_token=None):
+        self.calls += 1
+        self.before_reply(self.calls)
+        if self.honour_token and cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        return self.replies.pop(0)
+
+
+def make_services(tmp_path, backend):
+    bank = QuestionBank(str(tmp_path / "bank.db"))
+    bank.add_questions([
+        Question("q1", "pleno", "backend", "apis", 1, "Primeira", "Corpo 1"),
+        Question("q2", "pleno", "backend", "dados", 1, "Segunda", "Corpo 2"),
+    ])
+    services = Services.__new__(Services)
+    services.llm_service = LLMService(api_key="", backends={"scripted": backend}, default_backend="scripted")
+    services.question_bank = bank
+    services.bank_config = {}
+    services.repair_tags = ("falar",)
+    services.sessions = {"s": {
+        "profile": "pleno", "stack": "backend", "context": ContextManager(5),
+        "messages": [], "asked_questions": ["q1"], "current_question": "q1"
+    }}
+    return services
+
+
+def test_repair_completion_honours_the_turn_token(tmp_path):
+    token = CancelToken()
+
+    def barge_in(call):
+        if call == 2:  # the repair completion
+            token.cancel("superseded")
+
+    # First reply lacks <falar>, so a repair completion is requested
+    backend = ScriptedBackend(["<acao>proxima</acao>", "<falar>Ok</falar>"], before_reply=barge_in)
+    services = make_services(tmp_path, backend)
+
+    with pytest.raises(TurnCancelled):
+        services.generate_turn("s", "resposta", cancel_token=token)
+
+    session = services.sessions["s"]
+    assert backend.calls == 2
+    assert session["asked_questions"] == ["q1"]
+    assert session["current_question"] == "q1"
+
+
+def test_cancelled_turn_does_not_advance_the_question(tmp_path):
+    token = CancelToken()
+    # The cancel lands after the completion already returned its text
+    backend = ScriptedBackend(["<acao>proxima</acao><falar>Próxima.</falar>"],
+                              before_reply=lambda call: token.cancel("superseded"), honour_token=False)
+    services = make_services(tmp_path, backend)
+
+    with pytest.raises(TurnCancelled):
+        services.generate_turn("s", "resposta", cancel_token=token)
+
+    assert services.sessions["s"]["asked_questions"] == ["q1"]
+    assert services.sessions["s"]["current_question"] == "q1"
+
+
+def test_exhausted_bank_clears_the_current_question(tmp_path):
+    backend = ScriptedBackend(["<falar>Fale sobre filas.</falar>"])
+    services = make_services(tmp_path, backend)
+    services.sessions["s"]["asked_questions"] = ["q1", "q2"]
+    services.sessions["s"]["current_question"] = "q2"
+
+    turn = services.generate_turn("s", "resposta")
+
+    assert turn["question_id"] is None
+    assert services.sessions["s"]["current_question"] is None
@@ -0,0 +1,172 @@
+"""
+Build the question bank offline.
+
+Questions are generated with the configured LLM for every
+(profile, stack, topic, difficulty) combination, or imported from a JSONL
+file, and stored in the SQLite question bank used by the backend.
+
+Usage:
+    python tools/build_question_bank.py --generate --profiles junior,pleno --stacks python,java
+    python tools/build_question_bank.py --import questions.jsonl
+    python tools/build_question_bank.py --search "cache"
+
+JSONL import format (one question per line):
+    {"profile": "pleno", "stack": "python", "topic": "testes automatizados",
+     "difficulty": 2, "title": "...", "body": "...",
+     "tests": [{"call": "soma(1, 2)", "expected": "3"}]}
+
+"tests" is optional; coding questions with tests have candidate answers run
+in the code sandbox when it is enabled.
+"""
+
+import argparse
+import json
+import os
+import sys
+import logging
+from pathlib import Path
+from typing import Iterator, List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from dotenv import load_dotenv  # noqa: E402
+
+from modules.question_bank import ANY_STACK, Question, QuestionBank, make_question_id  # noqa: E402
+from modules.profiles import get_all_profiles, get_profile  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("build_question_bank")
+
+DIFFICULTY_LABELS = {1: "introdutória", 2: "intermediária", 3: "avançada"}
+
+GENERATION_PROMPT = """Gere {count} perguntas de entrevista técnica para uma vaga {profile_name} \
+em {stack}, sobre o tema "{topic}", com dificuldade {difficulty_label}.
+
+Responda SOMENTE com um array JSON, sem texto adicional, no formato:
+[{{"title": "Título curto da pergunta", "body": "Enunciado completo em markdown"}}]
+
+O enunciado pode conter blocos de código quando fizer sentido. Não inclua a resposta.
+Se a pergunta pedir a implementação de uma função em Python, informe o nome da \
+função no enunciado e adicione "tests": [{{"call": "nome(args)", "expected": "valor"}}] \
+com 3 a 5 casos de teste como expressões Python."""
+
+
+def parse_generated(content: str) -> List[dict]:
+    """Extract the JSON array from an LLM response."""
+    start, end = content.find("["), content.rfind("]")
+    if start == -1 or end == -1:
+        raise ValueError("no JSON array in response")
+    items = json.loads(content[start:end + 1])
+    return [item for item in items if item.get("title") and item.get("body")]
+
+
+def generate_questions(llm_service, profiles: List[str], stacks: List[str],
+                       difficulties: List[int], per_topic: int) -> Iterator[Question]:
+    for profile_key in profiles:
+        profile = get_profile(profile_key)
+        for stack in stacks:
+            for topic in profile["topics"]:
+                for difficulty in difficulties:
+                    prompt = GENERATION_PROMPT.format(
+                        count=per_topic,
+                        profile_name=profile["name"],
+                        stack=stack if stack != ANY_STACK else "qualquer stack",
+                        topic=topic,
+                        difficulty_label=DIFFICULTY_LABELS.get(difficulty, str(difficulty))
+                    )
+                    try:
+                        content = llm_service.complete(
+                            [{"role": "user", "content": prompt}],
+                            temperature=0.8,
+                            max_tokens=2000
+                        )
+                        items = parse_generated(content)
+                    except Exception as e:
+                        logger.error(f"Skipping {profile_key}/{stack}/{topic}/{difficulty}: {e}")
+                        continue
+
+                    logger.info(f"Generated {len(items)} questions for {profile_key}/{stack}/{topic}/{difficulty}")
+                    for item in items:
+                        yield Question(
+                            id=make_question_id(profile_key, stack, item["body"]),
+                            profile=profile_key,
+                            stack=stack,
+                            topic=topic,
+                            difficulty=difficulty,
+                            title=item["title"].strip(),
+                            body=item["body"].strip(),
+                            tests=tuple(item.get("tests") or ())
+                        )
+
+
+def import_questions(path: Path) -> Iterator[Question]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            stack = item.get("stack") or ANY_STACK
+            yield Question(
+                id=item.get("id") or make_question_id(item["profile"], stack, item["body"]),
+                profile=item["profile"],
+                stack=stack,
+                topic=item.get("topic", ""),
+                difficulty=int(item.get("difficulty", 1)),
+                title=item["title"],
+                body=item["body"],
+                tests=tuple(item.get("tests") or ())
+            )
+
+
+def main():
+    with open(BACKEND_DIR / "config.json", "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", type=Path,
+                        default=BACKEND_DIR / config.get("question_bank", {}).get("path", "data/question_bank.db"))
+    parser.add_argument("--generate", action="store_true", help="Generate questions with the LLM")
+    parser.add_argument("--import", dest="import_path", type=Path, help="Import questions from JSONL")
+    parser.add_argument("--search", help="Full-text search the bank and exit")
+    parser.add_argument("--profiles", default=",".join(get_all_profiles()))
+    parser.add_argument("--stacks", default=ANY_STACK, help="Comma-separated stacks ('*' = any stack)")
+    parser.add_argument("--difficulties", default="1,2,3")
+    parser.add_argument("--per-topic", type=int, default=3)
+    args = parser.parse_args()
+
+    bank = QuestionBank(args.db)
+
+    if args.search:
+        for question in bank.search(args.search, limit=10):
+            print(f"{question.id} [{question.profile}/{question.stack}/{question.topic}] {question.title}")
+        return
+
+    written = 0
+    if args.import_path:
+        written += bank.add_questions(import_questions(args.import_path))
+
+    if args.generate:
+        from modules.llm import LLMService
+
+        load_dotenv(BACKEND_DIR / ".env")
+        llm_service = LLMService(
+            api_key=os.getenv("OPENROUTER_API_KEY") or config["api_keys"]["openrouter"],
+            model=config["llm"]["model"]
+        )
+        written += bank.add_questions(generate_questions(
+            llm_service,
+            profiles=[p.strip() for p in args.profiles.split(",") if p.strip()],
+            stacks=[s.strip().lower() for s in args.stacks.split(",") if s.strip()],
+            difficulties=[int(d) for d in args.difficulties.split(",")],
+            per_topic=args.per_topic
+        ))
+
+    logger.info(f"Wrote {written} questions; bank now has {len(bank)} questions at {args.db}")
+
+
+if __name__ == "__main__":
+    main()
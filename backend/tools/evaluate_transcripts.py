@@ -0,0 +1,310 @@
+"""
+Re-score archived interviews offline with the current evaluation rubric.
+
+Transcripts are streamed from a JSONL export (/api/transcripts/export) or
+straight from the SQLite transcript archive, evaluated with
+LLMService.generate_evaluation using bounded concurrency and a token-bucket
+rate limit, and appended to the output JSONL as soon as each one finishes.
+Completed session IDs are checkpointed, so rerunning the same command after
+a crash resumes where it stopped; failed sessions are retried on the next run.
+
+Usage:
+    python tools/evaluate_transcripts.py --input transcripts.jsonl --output evaluations.jsonl
+    python tools/evaluate_transcripts.py --input data/transcripts.db --profile pleno --concurrency 8 --rate 2
+
+Local test against the fake server:
+    python tools/fake_openai_server.py --port 8911 &
+    python tools/evaluate_transcripts.py --input transcripts.jsonl --base-url http://127.0.0.1:8911/v1
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Set
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from dotenv import load_dotenv  # noqa: E402
+
+from modules.evaluation import build_evaluation_messages, speech_answers, speech_metrics_text  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("evaluate_transcripts")
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Thread-safe token bucket limiting requests per second.
+
+        Args:
+            rate: Tokens added per second (0 disables the limit)
+            burst: Bucket capacity
+        """
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available and take it."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+
+class Checkpoint:
+    def __init__(self, path: Path, output_path: Path):
+        """
+        Append-only record of evaluated session IDs.
+
+        Sessions present in the output but missing from the checkpoint (a crash
+        between the two writes) are recovered from the output on load.
+        """
+        self.path = path
+        self.done: Set[str] = set()
+
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                self.done.update(line.strip() for line in f if line.strip())
+
+        recovered = []
+        if output_path.exists():
+            for record in _read_jsonl(output_path):
+                session_id = record.get("session_id")
+                if session_id and "error" not in record and session_id not in self.done:
+                    recovered.append(session_id)
+
+        self._file = open(path, "a", encoding="utf-8")
+        for session_id in recovered:
+            self.mark(session_id)
+
+    def mark(self, session_id: str):
+        self.done.add(session_id)
+        self._file.write(session_id + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def _read_jsonl(path: Path) -> Iterator[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut short by a crash
+                continue
+
+
+def iter_transcripts(path: Path, profile: Optional[str] = None, since: Optional[str] = None) -> Iterator[Dict]:
+    """Stream sessions from a JSONL export or a SQLite transcript archive."""
+    if path.suffix in (".db", ".sqlite", ".sqlite3"):
+        from modules.transcript_store import read_archive
+
+        yield from read_archive(path, profile=profile, since=since)
+        return
+
+    for session in _read_jsonl(path):
+        if profile and session.get("profile") != profile:
+            continue
+        if since and (session.get("created_at") or "") < since:
+            continue
+        yield session
+
+
+def evaluate_session(llm_service, session: Dict, bucket: TokenBucket, max_exchanges: int, retries: int,
+                     compact: bool = False) -> Dict:
+    """
+    Evaluate one session, retrying with exponential backoff.
+
+    The prompt comes from the same builder as /api/interview/evaluate (sandbox
+    results in the candidate turns, speech metrics from the transcript).
+    """
+    messages = build_evaluation_messages(session, max_exchanges, compact)
+    speech_metrics = speech_metrics_text(speech_answers(session))
+    for attempt in range(retries + 1):
+        bucket.acquire()
+        started = time.perf_counter()
+        try:
+            result = llm_service.generate_evaluation(
+                messages,
+                profile=session["profile"],
+                stack=session["stack"],
+                speech_metrics=speech_metrics
+            )
+            return {
+                "session_id": session["session_id"],
+                "profile": session["profile"],
+                "stack": session["stack"],
+                "created_at": session.get("created_at"),
+                "evaluation": result["evaluation"],
+                "model": llm_service.get_backend().model,
+                "evaluated_at": datetime.now().isoformat(),
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1)
+            }
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = 2 ** attempt
+            logger.warning(f"Session {session['session_id']} failed ({e}), retrying in {delay}s")
+            time.sleep(delay)
+
+
+def run(llm_service, sessions: Iterator[Dict], output_path: Path, checkpoint: Checkpoint,
+        concurrency: int, bucket: TokenBucket, max_exchanges: int, retries: int, limit: int = 0,
+        compact: bool = False) -> Dict:
+    """
+    Evaluate sessions with at most `concurrency` requests in flight.
+
+    Sessions are pulled from the iterator only when a slot frees up, so memory
+    stays bounded whatever the size of the input.
+
+    Returns:
+        Counters: evaluated, failed, skipped
+    """
+    counters = {"evaluated": 0, "failed": 0, "skipped": 0}
+    started = time.perf_counter()
+
+    with open(output_path, "a", encoding="utf-8") as output, \
+            ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="eval") as executor:
+        pending = {}
+
+        def collect(done):
+            for future in done:
+                session = pending.pop(future)
+                try:
+                    record = future.result()
+                    counters["evaluated"] += 1
+                except Exception as e:
+                    record = {"session_id": session["session_id"], "error": str(e),
+                              "evaluated_at": datetime.now().isoformat()}
+                    counters["failed"] += 1
+                    logger.error(f"Session {session['session_id']} failed: {e}")
+
+                # Result first, then checkpoint: a crash in between is recovered from the output
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                output.flush()
+                if "error" not in record:
+                    checkpoint.mark(record["session_id"])
+
+            finished = counters["evaluated"] + counters["failed"]
+            if finished and finished % 10 == 0:
+                rate = finished / (time.perf_counter() - started)
+                logger.info(f"{finished} sessions done ({rate:.2f}/s)")
+
+        submitted = 0
+        for session in sessions:
+            if session["session_id"] in checkpoint.done or not session.get("messages"):
+                counters["skipped"] += 1
+                continue
+            if limit and submitted >= limit:
+                break
+
+            if len(pending) >= concurrency:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+
+            future = executor.submit(evaluate_session, llm_service, session, bucket, max_exchanges, retries, compact)
+            pending[future] = session
+            submitted += 1
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+
+    return counters
+
+
+def main():
+    with open(BACKEND_DIR / "config.json", "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", type=Path, required=True, help="Transcripts JSONL export or SQLite archive (.db)")
+    parser.add_argument("--output", type=Path, default=Path("evaluations.jsonl"))
+    parser.add_argument("--checkpoint", type=Path, help="Defaults to <output>.checkpoint")
+    parser.add_argument("--profile", help="Only evaluate sessions of this profile")
+    parser.add_argument("--since", help="Only evaluate sessions created at or after this ISO timestamp")
+    parser.add_argument("--concurrency", type=int, default=4, help="Requests in flight")
+    parser.add_argument("--rate", type=float, default=1.0, help="Requests per second (0 = unlimited)")
+    parser.add_argument("--burst", type=int, default=4)
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--limit", type=int, default=0, help="Evaluate at most N sessions (0 = all)")
+    parser.add_argument("--max-exchanges", type=int, default=config["llm"]["context_window"],
+                        help="Exchanges sent to the LLM, as in the live endpoint")
+    parser.add_argument("--compact-context", action=argparse.BooleanOptionalAction, default=False,
+                        help="Evaluate from the compact history (display-only <codigo> payloads replaced "
+                             "by references) to measure its effect on scores; the live endpoint never does")
+    parser.add_argument("--base-url", help="OpenAI-compatible API base URL (default: OpenRouter)")
+    parser.add_argument("--model", default=config["llm"]["model"])
+    args = parser.parse_args()
+
+    from modules.llm import OPENROUTER_BASE_URL, LLMService, OpenAICompatibleBackend
+
+    load_dotenv(BACKEND_DIR / ".env")
+    api_key = os.getenv("OPENROUTER_API_KEY") or config["api_keys"]["openrouter"]
+    backend = OpenAICompatibleBackend(
+        name="evaluation",
+        model=args.model,
+        api_key=api_key or "none",
+        base_url=args.base_url or OPENROUTER_BASE_URL
+    )
+    llm_service = LLMService(
+        api_key=api_key,
+        model=args.model,
+        backends={"evaluation": backend},
+        default_backend="evaluation"
+    )
+
+    checkpoint = Checkpoint(args.checkpoint or args.output.with_name(args.output.name + ".checkpoint"), args.output)
+    if checkpoint.done:
+        logger.info(f"Resuming: {len(checkpoint.done)} sessions already evaluated")
+
+    started = time.perf_counter()
+    try:
+        counters = run(
+            llm_service,
+            iter_transcripts(args.input, profile=args.profile, since=args.since),
+            args.output,
+            checkpoint,
+            concurrency=max(1, args.concurrency),
+            bucket=TokenBucket(args.rate, args.burst),
+            max_exchanges=args.max_exchanges,
+            retries=args.retries,
+            limit=args.limit,
+            compact=args.compact_context
+        )
+    finally:
+        checkpoint.close()
+
+    logger.info(
+        f"Done in {time.perf_counter() - started:.1f}s: {counters['evaluated']} evaluated, "
+        f"{counters['failed']} failed, {counters['skipped']} skipped -> {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Minimal fake OpenAI-compatible chat completions server for local testing.
+
+Answers POST /v1/chat/completions with a canned, tag-formatted evaluation
+after a configurable latency, and can inject rate-limit/server errors to
+exercise client retries. Uses only the standard library.
+
+Usage:
+    python tools/fake_openai_server.py --port 8911 --latency 0.2 --error-rate 0.1
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("fake_openai_server")
+
+CANNED_RESPONSE = """<codigo>
+## Avaliação Final
+
+### ✅ Pontos Fortes
+- Resposta gerada pelo servidor falso ({digest})
+
+### ⚠️ Pontos Fracos
+- Nenhum
+
+### 💡 Sugestões de Melhoria
+- Nenhuma
+
+### 📊 Nota Final
+**{score}/10** - Avaliação de teste
+</codigo>"""
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    error_rate = 0.0
+    stats = {"requests": 0, "errors": 0, "in_flight": 0, "max_in_flight": 0}
+    stats_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/stats"):
+            with self.stats_lock:
+                self._send_json(200, dict(self.stats))
+            return
+        self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with self.stats_lock:
+            self.stats["requests"] += 1
+            self.stats["in_flight"] += 1
+            self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.stats["in_flight"])
+
+        try:
+            time.sleep(self.latency)
+            if random.random() < self.error_rate:
+                with self.stats_lock:
+                    self.stats["errors"] += 1
+                status = random.choice((429, 500))
+                self._send_json(status, {"error": {"message": "injected failure", "code": status}})
+                return
+
+            # Deterministic per conversation, so reruns can be compared
+            digest = hashlib.sha256(json.dumps(request.get("messages", [])).encode("utf-8")).hexdigest()[:8]
+            content = CANNED_RESPONSE.format(digest=digest, score=int(digest, 16) % 11)
+            self._send_json(200, {
+                "id": f"chatcmpl-{digest}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "fake"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+            })
+        finally:
+            with self.stats_lock:
+                self.stats["in_flight"] -= 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8911)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per completion")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 429/500")
+    args = parser.parse_args()
+
+    FakeOpenAIHandler.latency = args.latency
+    FakeOpenAIHandler.error_rate = args.error_rate
+
+    server = ThreadingHTTPServer((args.host, args.port), FakeOpenAIHandler)
+    logger.info(f"Fake OpenAI server on http://{args.host}:{args.port}/v1 (GET /v1/stats for counters)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
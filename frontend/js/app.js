@@ -3,7 +3,8 @@
  * Handles audio recording, API communication, and UI updates
  */
 
-const API_BASE = 'http://localhost:8000';
+// Injected as "" when the page is served by the backend (same origin)
+const API_BASE = window.API_BASE ?? 'http://localhost:8000';
 
 // State management
 const state = {
@@ -13,7 +14,9 @@ const state = {
     isRecording: false,
     mediaRecorder: null,
     audioChunks: [],
-    currentTab: 'voice'
+    currentTab: 'voice',
+    turnId: null,
+    turnController: null
 };
 
 // DOM Elements
@@ -75,6 +78,40 @@ async function checkMicrophonePermission() {
     }
 }
 
+// Start a new interviewer turn; its requests are aborted together on barge-in
+function newTurnSignal() {
+    state.turnController = new AbortController();
+    return state.turnController.signal;
+}
+
+// Abort the interviewer's turn in progress: pending requests, server-side work and audio
+function cancelCurrentTurn() {
+    if (state.turnController) {
+        state.turnController.abort();
+        state.turnController = null;
+    }
+    
+    if (!elements.audioPlayer.paused) {
+        elements.audioPlayer.pause();
+    }
+    
+    if (state.sessionId && state.turnId) {
+        fetch(`${API_BASE}/api/interview/cancel`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                session_id: state.sessionId,
+                turn_id: state.turnId
+            }),
+            keepalive: true
+        }).catch(() => {});
+    }
+}
+
+function isAbortError(error) {
+    return error.name === 'AbortError';
+}
+
 // Start Interview
 async function startInterview() {
     state.profile = elements.profileSelect.value;
@@ -83,19 +120,22 @@ async function startInterview() {
     updateStatus('Iniciando entrevista...', 'processing');
     
     try {
+        const signal = newTurnSignal();
         const response = await fetch(`${API_BASE}/api/interview/start`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({
                 profile: state.profile,
                 stack: state.stack
-            })
+            }),
+            signal
         });
         
         if (!response.ok) throw new Error('Failed to start interview');
         
         const data = await response.json();
         state.sessionId = data.session_id;
+        state.turnId = data.turn_id;
         
         // Switch to interview panel
         elements.setupPanel.classList.add('hidden');
@@ -109,12 +149,13 @@ async function startInterview() {
         
         // Synthesize and play initial message
         if (data.falar) {
-            await synthesizeAndPlay(data.falar);
+            await synthesizeAndPlay(data.falar, signal);
         }
         
         updateStatus('Entrevista em andamento', 'active');
         
     } catch (error) {
+        if (isAbortError(error)) return;
         console.error('Error starting interview:', error);
         showNotification('❌ Erro ao iniciar entrevista', 'error');
         updateStatus('Erro', 'error');
@@ -132,6 +173,9 @@ async function toggleRecording() {
 
 // Start Recording
 async function startRecording() {
+    // Barge-in: the candidate talking interrupts the interviewer
+    cancelCurrentTurn();
+    
     try {
         const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
         
@@ -186,10 +230,13 @@ async function processAudio(audioBlob) {
         const formData = new FormData();
         formData.append('audio', audioBlob, 'recording.wav');
         formData.append('session_id', state.sessionId);
+        // Word timings from the same decode feed the speech metrics of the final evaluation
+        formData.append('analytics', 'true');
         
         updateStatus('Transcrevendo...', 'processing');
         
-        const transcribeResponse = await fetch(`${API_BASE}/api/transcribe`, {
+        // session_id in the query lets the multi-worker router route without parsing the upload
+        const transcribeResponse = await fetch(`${API_BASE}/api/transcribe?session_id=${encodeURIComponent(state.sessionId)}`, {
             method: 'POST',
             body: formData
         });
@@ -227,6 +274,7 @@ async function sendCode() {
         return;
     }
     
+    cancelCurrentTurn();
     addUserMessage(code, true);
     elements.codeTextarea.value = '';
     
@@ -238,6 +286,7 @@ async function sendMessage(text, isCode) {
     try {
         updateStatus('Pensando...', 'processing');
         
+        const signal = newTurnSignal();
         const response = await fetch(`${API_BASE}/api/interview/message`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
@@ -245,24 +294,27 @@ async function sendMessage(text, isCode) {
                 session_id: state.sessionId,
                 text: text,
                 is_code: isCode
-            })
+            }),
+            signal
         });
         
         if (!response.ok) throw new Error('Failed to send message');
         
         const data = await response.json();
+        state.turnId = data.turn_id;
         
         // Add assistant message
         addAssistantMessage(data.falar, data.codigo);
         
         // Synthesize and play response
         if (data.falar) {
-            await synthesizeAndPlay(data.falar);
+            await synthesizeAndPlay(data.falar, signal);
         } else {
             updateStatus('Entrevista em andamento', 'active');
         }
         
     } catch (error) {
+        if (isAbortError(error)) return;
         console.error('Error sending message:', error);
         showNotification('❌ Erro ao enviar mensagem', 'error');
         updateStatus('Entrevista em andamento', 'active');
@@ -270,7 +322,7 @@ async function sendMessage(text, isCode) {
 }
 
 // Synthesize and Play Audio
-async function synthesizeAndPlay(text) {
+async function synthesizeAndPlay(text, signal) {
     try {
         updateStatus('Falando...', 'speaking');
         
@@ -279,8 +331,10 @@ async function synthesizeAndPlay(text) {
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({
                 session_id: state.sessionId,
+                turn_id: state.turnId,
                 text: text
-            })
+            }),
+            signal
         });
         
         if (!response.ok) throw new Error('TTS failed');
@@ -300,6 +354,7 @@ async function synthesizeAndPlay(text) {
         };
         
     } catch (error) {
+        if (isAbortError(error)) return;
         console.error('Error synthesizing speech:', error);
         showNotification('⚠️ Erro ao sintetizar voz (continuando sem áudio)', 'warning');
         updateStatus('Entrevista em andamento', 'active');